@@ -1,41 +1,47 @@
 """Invest Lab - 메인 애플리케이션"""
 
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
-import json
 
 # 모듈 imports
 from dotenv import load_dotenv
 from db.database import init_database
 from auth.session import (
-    init_session_state, is_authenticated, get_current_user,
-    logout_user, is_admin, reset_backtest_state
+    init_session_state, get_current_user, login_user,
+    logout_user, is_admin, reset_backtest_state, restore_session, sync_session_cookie
 )
 from auth.authentication import change_password
 from ui.login_page import render_login_page
-from ui.admin_panel import render_admin_panel
-from ui.technical_analysis import render_technical_analysis
 from ui.stock_search import render_stock_search, add_to_recent_searches
 from ui.styles import apply_styles
-from db.models import get_user_portfolios, save_portfolio, delete_portfolio, get_user_stock_notes, delete_stock_note
+from db.models import get_user_portfolio_names, get_portfolio, save_portfolio, delete_portfolio, get_user_stock_notes, delete_stock_note
 from core.data_fetcher import search_ticker, fetch_data_robust, fetch_ohlcv_data
 from core.backtest import calculate_portfolio
-from core.metrics import calculate_metrics
-from core.analysis import generate_ai_analysis
+from core.metrics import calculate_metrics, calculate_return_analytics
+from utils.instrumentation import span, increment, collect_timings
+from utils.metrics_exporter import start_metrics_server
+from utils.backup_scheduler import start_backup_scheduler
+from utils.resource_telemetry import start_telemetry_sampler
 from config import (
     BENCHMARK_MAP, ASSET_TYPES, REBALANCE_OPTIONS,
-    DEFAULT_START_YEAR, WEIGHT_TOLERANCE, GEMINI_API_KEY
+    DEFAULT_START_YEAR, WEIGHT_TOLERANCE
 )
 
 # 환경변수 및 DB 초기화
 load_dotenv()
 init_database()
 
+# 메트릭 엔드포인트 (프로세스당 한 번만 시작)
+start_metrics_server()
+
+# 자동 백업 스케줄러 (BACKUP_SCHEDULE, 프로세스당 한 번만 시작)
+start_backup_scheduler()
+
+# 리소스 텔레메트리 샘플링 (Admin Panel 차트용, 프로세스당 한 번만 시작)
+start_telemetry_sampler()
+
 # ---------------------------------------------------------
 # 페이지 설정 및 스타일
 # ---------------------------------------------------------
@@ -45,8 +51,10 @@ apply_styles(st)
 # 세션 상태 초기화
 init_session_state()
 
-# 인증 확인
-if not is_authenticated():
+# 인증 확인 (새로고침이면 세션 쿠키로 로그인 복원)
+authenticated = restore_session()
+sync_session_cookie()
+if not authenticated:
     render_login_page()
     st.stop()
 
@@ -102,6 +110,8 @@ def change_password_dialog():
             success, message = change_password(user['user_id'], current_password, new_password)
 
             if success:
+                # 기존 세션은 모두 폐기되었으므로 현재 브라우저에는 새 토큰 발급
+                login_user(user)
                 st.success(message)
                 # 2초 후 다이얼로그 닫기
                 import time
@@ -115,17 +125,23 @@ def change_password_dialog():
             st.rerun()
 
 
-def load_saved_portfolios():
-    """현재 사용자의 포트폴리오를 DB에서 로드"""
+def load_saved_portfolio_names():
+    """현재 사용자의 포트폴리오 이름 목록을 DB에서 로드"""
+    user = get_current_user()
+    return get_user_portfolio_names(user['user_id'])
+
+
+def load_saved_portfolio(name):
+    """현재 사용자의 포트폴리오 자산 목록을 DB에서 로드 (선택한 전략만)"""
     user = get_current_user()
-    portfolios = get_user_portfolios(user['user_id'])
-    return {p['portfolio_name']: json.loads(p['portfolio_data']) for p in portfolios}
+    portfolio = get_portfolio(user['user_id'], name)
+    return portfolio['assets'] if portfolio else None
 
 
 def save_portfolio_to_file(name, portfolio_data):
     """현재 사용자의 포트폴리오를 DB에 저장"""
     user = get_current_user()
-    save_portfolio(user['user_id'], name, json.dumps(portfolio_data))
+    save_portfolio(user['user_id'], name, portfolio_data)
 
 
 def delete_portfolio_from_file(name):
@@ -156,6 +172,8 @@ def plot_allocation(portfolio):
     if df_alloc.empty:
         return None, None
 
+    import plotly.express as px
+
     colors = px.colors.qualitative.Set2
 
     # 자산 유형 차트
@@ -238,16 +256,18 @@ with st.sidebar:
     if st.session_state.selected_menu == "Portfolio Backtest":
         st.markdown('<div class="sidebar-section-header">STRATEGY LIBRARY</div>', unsafe_allow_html=True)
 
-        saved_portfolios = load_saved_portfolios()
+        saved_names = load_saved_portfolio_names()
         tab_load, tab_save = st.tabs(["Load", "Save"])
 
         with tab_load:
-            if saved_portfolios:
-                sel_name = st.selectbox("Select Strategy", list(saved_portfolios.keys()), label_visibility="collapsed")
+            if saved_names:
+                sel_name = st.selectbox("Select Strategy", saved_names, label_visibility="collapsed")
                 c1, c2 = st.columns(2)
                 if c1.button("Load", use_container_width=True):
-                    st.session_state.portfolio = saved_portfolios[sel_name]
-                    reset_backtest_state()
+                    assets = load_saved_portfolio(sel_name)
+                    if assets is not None:
+                        st.session_state.portfolio = assets
+                        reset_backtest_state()
                     st.rerun()
                 if c2.button("Del", use_container_width=True):
                     delete_portfolio_from_file(sel_name)
@@ -616,162 +636,41 @@ if st.session_state.selected_menu == "Portfolio Backtest":
     # --- 결과 렌더링 ---
     if run_btn:
         reset_backtest_state()
-        with st.spinner("Calculating..."):
-            tickers = [p['ticker'] for p in st.session_state.portfolio]
-            data = fetch_data_robust(tickers, bm_ticker, s_date, e_date)
-            if data is None or data.empty:
-                st.error("데이터를 가져올 수 없습니다. 티커나 기간을 확인해주세요.")
-            else:
-                res = calculate_portfolio(data, st.session_state.portfolio, bm_ticker, rebal_freq, rebal_month, apply_fx)
-                if res.empty:
-                    st.error("계산 실패.")
+        increment("backtest.runs")
+        with st.spinner("Calculating..."), collect_timings() as timings:
+            with span("backtest.total"):
+                tickers = [p['ticker'] for p in st.session_state.portfolio]
+                with span("backtest.fetch_data"):
+                    data = fetch_data_robust(tickers, bm_ticker, s_date, e_date)
+                if data is None or data.empty:
+                    st.error("데이터를 가져올 수 없습니다. 티커나 기간을 확인해주세요.")
                 else:
-                    p_metrics = calculate_metrics(res['Daily_Ret'], res['Portfolio'].iloc[-1], s_date, e_date)
-                    b_metrics = calculate_metrics(res['BM_Daily_Ret'], res['Benchmark'].iloc[-1], s_date, e_date)
-                    st.session_state.sim_result = {
-                        'df': res, 'p_metrics': p_metrics, 'b_metrics': b_metrics, 'bm_label': bm_label
-                    }
-                    st.rerun()
+                    res = calculate_portfolio(data, st.session_state.portfolio, bm_ticker, rebal_freq, rebal_month, apply_fx)
+                    if res.empty:
+                        st.error("계산 실패.")
+                    else:
+                        p_metrics = calculate_metrics(res['Daily_Ret'], res['Portfolio'].iloc[-1], s_date, e_date)
+                        b_metrics = calculate_metrics(res['BM_Daily_Ret'], res['Benchmark'].iloc[-1], s_date, e_date)
+                        st.session_state.sim_result = {
+                            'df': res, 'p_metrics': p_metrics, 'b_metrics': b_metrics, 'bm_label': bm_label,
+                            'analytics': calculate_return_analytics(res)
+                        }
+        # 요청별 구간 소요 시간 (st.rerun()은 예외로 동작하므로 수집 블록 밖에서 호출)
+        if st.session_state.sim_result:
+            st.session_state.sim_result['timings'] = timings
+            st.rerun()
 
     if st.session_state.sim_result:
-        data = st.session_state.sim_result
-        df = data['df']
-        pm = data['p_metrics']
-        bm = data['b_metrics']
-        bm_name = data['bm_label']
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-        st.markdown('<div class="section-label">Simulation Results</div>', unsafe_allow_html=True)
-
-        # 결과 요약 카드
-        with st.container(border=True):
-            col_m = st.columns(5)
-            labels = ["Total Return", "CAGR", "Max Drawdown", "Volatility", "Sharpe Ratio"]
-            formats = ["{:.2f}%", "{:.2f}%", "{:.2f}%", "{:.2f}%", "{:.2f}"]
-            for i, col in enumerate(col_m):
-                val = pm[i]
-                bm_val = bm[i]
-                diff = val - bm_val
-                delta_color = "inverse" if i in [2, 3] else "normal"
-                col.metric(labels[i], formats[i].format(val), f"{diff:.2f} vs BM" if i != 4 else f"{diff:.2f}", delta_color=delta_color)
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-
-        # --- Benchmark Comparison ---
-        st.markdown('<div class="section-label">Benchmark Comparison</div>', unsafe_allow_html=True)
-        with st.container(border=True):
-            fig_bm = go.Figure()
-            fig_bm.add_trace(go.Scatter(x=df.index, y=df['Benchmark'], name=f"Benchmark ({bm_name})", line=dict(width=2, color='#94A3B8', dash='dot')))
-            fig_bm.add_trace(go.Scatter(x=df.index, y=df['Portfolio'], name='Portfolio', line=dict(width=3, color='#0F172A')))
-            fig_bm.update_layout(
-                template='plotly_white',
-                margin=dict(t=20, b=20),
-                hovermode="x unified",
-                legend=dict(orientation="h", y=1.1),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_bm, use_container_width=True)
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-
-        # --- Asset Breakdown ---
-        st.markdown('<div class="section-label">Asset Breakdown</div>', unsafe_allow_html=True)
-        with st.container(border=True):
-            fig_assets = go.Figure()
-            asset_cols = [c for c in df.columns if c not in ['Daily_Ret', 'Portfolio', 'Benchmark', 'BM_Daily_Ret']]
-            palette = px.colors.qualitative.Plotly
-            for i, col in enumerate(asset_cols):
-                fig_assets.add_trace(go.Scatter(x=df.index, y=df[col], name=col, line=dict(width=1.5, color=palette[i % len(palette)]), opacity=0.7))
-            fig_assets.add_trace(go.Scatter(x=df.index, y=df['Portfolio'], name='Portfolio', line=dict(width=4, color='#0F172A'), opacity=1.0))
-            fig_assets.update_layout(
-                template='plotly_white',
-                margin=dict(t=20, b=20),
-                hovermode="x unified",
-                legend=dict(orientation="h", y=1.1),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_assets, use_container_width=True)
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-
-        # --- Yearly Returns ---
-        st.markdown('<div class="section-label">Yearly Returns</div>', unsafe_allow_html=True)
-        with st.container(border=True):
-            target_cols = ['Portfolio'] + asset_cols
-            daily_rets_all = df[target_cols].pct_change().dropna()
-            yearly_rets_all = daily_rets_all.resample('YE').apply(lambda x: (1 + x).prod() - 1) * 100
-            years = yearly_rets_all.index.strftime('%Y').tolist()
-            assets_y = yearly_rets_all.columns.tolist()
-            if 'Portfolio' in assets_y:
-                assets_y.remove('Portfolio')
-                assets_y.append('Portfolio')
-            # 재정렬된 순서에 맞게 데이터 가져오기
-            z_val = yearly_rets_all[assets_y].T.values
-            fig_heat = go.Figure(data=go.Heatmap(z=z_val, x=years, y=assets_y, colorscale='RdYlGn', zmid=0, text=np.round(z_val, 1), texttemplate="%{text}%"))
-            fig_heat.update_layout(
-                template='plotly_white',
-                margin=dict(t=20, b=20),
-                height=100 + (len(assets_y) * 40),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_heat, use_container_width=True)
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-
-        # --- Correlation ---
-        st.markdown('<div class="section-label">Correlation</div>', unsafe_allow_html=True)
-        with st.container(border=True):
-            if len(asset_cols) > 1:
-                # 자산 간 상관관계 계산
-                corr_df = df[asset_cols].pct_change().dropna().corr()
-                # 히트맵 생성 (x축과 y축이 동일한 자산 목록)
-                fig_corr = go.Figure(data=go.Heatmap(
-                    z=corr_df.values,
-                    x=corr_df.columns,
-                    y=corr_df.index,
-                    colorscale='RdBu',
-                    zmin=-1,
-                    zmax=1,
-                    text=np.round(corr_df.values, 2),
-                    texttemplate="%{text}",
-                    hovertemplate='%{y} vs %{x}<br>Correlation: %{z:.2f}<extra></extra>'
-                ))
-                fig_corr.update_layout(
-                    template='plotly_white',
-                    height=max(400, len(asset_cols) * 50),
-                    xaxis={'side': 'bottom'},
-                    yaxis={'autorange': 'reversed'},
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(fig_corr, use_container_width=True)
-            else:
-                st.info("자산이 2개 이상이어야 상관관계를 확인할 수 있습니다.")
-
-        st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
-        with st.container(border=True):
-            st.markdown("#### AI Investment Analyst")
-            api_key = GEMINI_API_KEY
-            if not api_key:
-                api_key = st.text_input("Gemini API Key", type="password", placeholder="API Key 입력")
-            if st.button("Generate Analysis Report", type="secondary", use_container_width=True):
-                if not api_key:
-                    st.warning("API Key가 필요합니다.")
-                else:
-                    with st.spinner("AI analyzing..."):
-                        analysis = generate_ai_analysis(st.session_state.portfolio, pm[0], pm[1], pm[2], pm[4], api_key)
-                        st.session_state.ai_analysis = analysis
-        if st.session_state.ai_analysis:
-            st.markdown(f"""<div class="ai-analysis-box">{st.session_state.ai_analysis}</div>""", unsafe_allow_html=True)
+        from ui.backtest_results import render_backtest_results
+        render_backtest_results()
 
 
 # ---------------------------------------------------------
 # 메인 화면: Technical Analysis
 # ---------------------------------------------------------
 elif st.session_state.selected_menu == "Technical Analysis":
+    # 메뉴별 UI 모듈은 해당 화면을 처음 열 때 불러온다 (콜드 스타트 단축)
+    from ui.technical_analysis import render_technical_analysis
     render_technical_analysis()
 
 
@@ -781,4 +680,5 @@ elif st.session_state.selected_menu == "Technical Analysis":
 elif st.session_state.selected_menu == "Admin Panel":
     st.markdown("<h1 class='page-title'>Admin Panel</h1>", unsafe_allow_html=True)
     st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    from ui.admin_panel import render_admin_panel
     render_admin_panel()
@@ -1,24 +1,146 @@
 import bcrypt
 import os
 import re
-from db.models import get_user_by_username, get_user_by_id, create_user, update_last_login, update_password
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from db.models import (
+    get_user_by_username, get_user_by_id, create_user, update_last_login, update_password,
+    delete_user_sessions
+)
+from auth.session_token import clear_session_cache
+from config import (
+    BCRYPT_ROUNDS, AUTH_WORKERS, AUTH_QUEUE_LIMIT, AUTH_QUEUE_TIMEOUT,
+    LOGIN_FAILURE_WINDOW, LOGIN_MAX_FAILURES_PER_USER, LOGIN_MAX_FAILURES_PER_IP,
+    LOGIN_LOCKOUT_SECONDS
+)
+from utils.instrumentation import span, increment
+
+
+class AuthBusyError(Exception):
+    """bcrypt 작업 대기열이 가득 차 요청을 처리할 수 없음"""
+
+
+# ==================================================
+# bcrypt 작업 풀
+# ==================================================
+
+# bcrypt는 해싱 중 GIL을 놓으므로 전용 스레드 수가 곧 인증에 쓰는 최대 CPU 코어 수가 된다.
+# 실행 중 + 대기 중 작업 수를 세마포어로 제한해 로그인 폭주가 백테스트 CPU를 잠식하지 않게 한다.
+_bcrypt_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_slots = threading.BoundedSemaphore(AUTH_WORKERS + AUTH_QUEUE_LIMIT)
+
+
+def _run_bcrypt(func, *args):
+    """
+    bcrypt 함수를 작업 풀에서 실행하고 결과를 기다림
+
+    Raises:
+        AuthBusyError: AUTH_QUEUE_TIMEOUT 안에 대기열 자리를 얻지 못한 경우
+    """
+    if not _bcrypt_slots.acquire(timeout=AUTH_QUEUE_TIMEOUT):
+        increment("auth.busy")
+        raise AuthBusyError("인증 요청이 많아 잠시 후 다시 시도해주세요.")
+    try:
+        with span("auth.bcrypt"):
+            return _bcrypt_executor.submit(func, *args).result()
+    finally:
+        _bcrypt_slots.release()
 
 
 def hash_password(password):
-    """비밀번호를 bcrypt로 해싱 (work factor 12)"""
-    salt = bcrypt.gensalt(rounds=12)
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
+    """비밀번호를 bcrypt로 해싱 (work factor: BCRYPT_ROUNDS)"""
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    password_hash = _run_bcrypt(bcrypt.hashpw, password.encode('utf-8'), salt)
     return password_hash.decode('utf-8')
 
 
 def verify_password(password, password_hash):
-    """비밀번호 검증"""
+    """비밀번호 검증 (해시에 기록된 work factor로 검증하므로 기존 해시도 그대로 동작)"""
     try:
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+        return _run_bcrypt(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+    except AuthBusyError:
+        raise
     except Exception:
         return False
 
 
+# ==================================================
+# 로그인 실패 제한
+# ==================================================
+
+_throttle_lock = threading.Lock()
+_login_failures = {}   # {('user'|'ip', key): deque[실패 시각]}
+_blocked_until = {}    # {('user'|'ip', key): 차단 해제 시각}
+
+
+def _throttle_keys(username, ip):
+    keys = []
+    if username:
+        keys.append((('user', username.lower()), LOGIN_MAX_FAILURES_PER_USER))
+    if ip:
+        keys.append((('ip', ip), LOGIN_MAX_FAILURES_PER_IP))
+    return keys
+
+
+def _prune_throttle(now):
+    """만료된 실패 기록/차단 정리 (잠금 안에서 호출)"""
+    for key in [k for k, until in _blocked_until.items() if until <= now]:
+        del _blocked_until[key]
+    for key in list(_login_failures):
+        failures = _login_failures[key]
+        while failures and failures[0] <= now - LOGIN_FAILURE_WINDOW:
+            failures.popleft()
+        if not failures:
+            del _login_failures[key]
+
+
+def get_login_block(username, ip=None):
+    """
+    로그인 차단 여부 확인
+
+    Args:
+        username: 사용자명
+        ip: 클라이언트 IP (알 수 없으면 None)
+
+    Returns:
+        int: 남은 차단 시간 (초), 차단되지 않았으면 0
+    """
+    now = time.monotonic()
+    with _throttle_lock:
+        remaining = 0
+        for key, _ in _throttle_keys(username, ip):
+            until = _blocked_until.get(key, 0)
+            if until > now:
+                remaining = max(remaining, int(until - now) + 1)
+        return remaining
+
+
+def record_login_failure(username, ip=None):
+    """로그인 실패 기록 (한도를 넘으면 LOGIN_LOCKOUT_SECONDS 동안 차단)"""
+    now = time.monotonic()
+    increment("auth.failures")
+    with _throttle_lock:
+        if len(_login_failures) > 10000:
+            _prune_throttle(now)
+        for key, limit in _throttle_keys(username, ip):
+            failures = _login_failures.setdefault(key, deque())
+            failures.append(now)
+            while failures[0] <= now - LOGIN_FAILURE_WINDOW:
+                failures.popleft()
+            if len(failures) >= limit:
+                _blocked_until[key] = now + LOGIN_LOCKOUT_SECONDS
+                failures.clear()
+                increment("auth.lockouts")
+
+
+def clear_login_failures(username):
+    """로그인 성공 시 사용자 실패 기록 초기화 (IP 기록은 유지)"""
+    with _throttle_lock:
+        _login_failures.pop(('user', username.lower()), None)
+
+
 def validate_username(username):
     """사용자명 검증
 
@@ -77,7 +199,10 @@ def register_user(username, password):
         return False, error
 
     # 비밀번호 해싱 및 사용자 생성
-    password_hash = hash_password(password)
+    try:
+        password_hash = hash_password(password)
+    except AuthBusyError as e:
+        return False, str(e)
     user_id = create_user(username, password_hash, is_admin=False)
 
     if user_id:
@@ -86,19 +211,37 @@ def register_user(username, password):
         return False, "사용자 등록에 실패했습니다."
 
 
-def authenticate_user(username, password):
+def authenticate_user(username, password, ip=None):
     """사용자 인증 (로그인)
 
+    차단 중인 사용자/IP는 비밀번호를 확인하지 않고 None을 반환한다.
+    (차단 안내는 호출 측에서 get_login_block()으로 확인)
+
+    Args:
+        username: 사용자명
+        password: 비밀번호
+        ip: 클라이언트 IP (실패 제한용, 선택)
+
     Returns:
         dict or None: 사용자 정보 또는 None
+
+    Raises:
+        AuthBusyError: bcrypt 작업 대기열이 가득 찬 경우
     """
+    if get_login_block(username, ip):
+        return None
+
     user = get_user_by_username(username)
     if not user:
+        record_login_failure(username, ip)
         return None
 
     if not verify_password(password, user['password_hash']):
+        record_login_failure(username, ip)
         return None
 
+    clear_login_failures(username)
+
     # 마지막 로그인 시간 업데이트
     update_last_login(user['user_id'])
 
@@ -106,7 +249,7 @@ def authenticate_user(username, password):
 
 
 def change_password(user_id, current_password, new_password):
-    """비밀번호 변경
+    """비밀번호 변경 (성공 시 사용자의 모든 로그인 세션 폐기)
 
     Args:
         user_id: 사용자 ID
@@ -122,8 +265,11 @@ def change_password(user_id, current_password, new_password):
         return False, "사용자를 찾을 수 없습니다."
 
     # 현재 비밀번호 확인
-    if not verify_password(current_password, user['password_hash']):
-        return False, "현재 비밀번호가 일치하지 않습니다."
+    try:
+        if not verify_password(current_password, user['password_hash']):
+            return False, "현재 비밀번호가 일치하지 않습니다."
+    except AuthBusyError as e:
+        return False, str(e)
 
     # 새 비밀번호 검증
     valid, error = validate_password(new_password)
@@ -135,8 +281,14 @@ def change_password(user_id, current_password, new_password):
         return False, "새 비밀번호는 현재 비밀번호와 달라야 합니다."
 
     # 새 비밀번호 해싱 및 업데이트
-    new_password_hash = hash_password(new_password)
+    try:
+        new_password_hash = hash_password(new_password)
+    except AuthBusyError as e:
+        return False, str(e)
     if update_password(user_id, new_password_hash):
+        # 유출된 토큰이 비밀번호 변경 후에도 유효하지 않도록 기존 세션 모두 폐기
+        delete_user_sessions(user_id)
+        clear_session_cache()
         return True, "비밀번호가 성공적으로 변경되었습니다."
     else:
         return False, "비밀번호 변경에 실패했습니다."
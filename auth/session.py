@@ -1,5 +1,8 @@
 """세션 관리 모듈"""
 
+import json
+import ipaddress
+
 import streamlit as st
 
 
@@ -8,6 +11,9 @@ SESSION_DEFAULTS = {
     # 인증 관련
     'authenticated': False,
     'user': None,
+    'session_token': None,
+    'session_cookie_pending': None,   # 브라우저에 쓸 세션 쿠키 (빈 문자열이면 삭제)
+    'revoked_session_token': None,    # 이 연결에서 폐기한 토큰 (연결 시점 쿠키 재사용 방지)
     # 포트폴리오 관련
     'portfolio': [],
     'sim_result': None,
@@ -38,8 +44,50 @@ def reset_backtest_state():
     st.session_state.ai_analysis = None
 
 
+_trusted_networks = None  # TRUSTED_PROXIES 파싱 결과 (처음 사용할 때 계산)
+
+# 로그인 유지 토큰을 담는 쿠키 (URL에 두면 방문 기록/공유 링크/Referer/프록시 로그로 유출됨)
+SESSION_COOKIE = "investlab_session"
+# 예전 버전이 토큰을 넣던 URL 쿼리 파라미터 (남아 있으면 지우기만 하고 사용하지 않음)
+LEGACY_QUERY_PARAM = "sid"
+
+
+def _queue_session_cookie(token):
+    """다음 sync_session_cookie() 호출 때 브라우저에 쓸 쿠키 값 예약 (빈 문자열이면 삭제)"""
+    st.session_state.session_cookie_pending = token
+
+
+def sync_session_cookie():
+    """
+    예약된 세션 쿠키 쓰기/삭제를 브라우저에 반영 (매 실행마다 인증 확인 직후 호출)
+
+    Streamlit은 응답 헤더로 쿠키를 설정할 수 없어 스크립트로 document.cookie를 쓴다.
+    서버는 웹소켓 연결 시점의 쿠키(st.context.cookies)로 다음 새로고침 때 로그인을 복원한다.
+    """
+    pending = st.session_state.get('session_cookie_pending')
+    if pending is None:
+        return
+    st.session_state.session_cookie_pending = None
+
+    from config import SESSION_TTL_DAYS
+
+    max_age = SESSION_TTL_DAYS * 86400 if pending else 0
+    st.html(
+        f"""<script>
+        (function () {{
+            var secure = window.location.protocol === "https:" ? "; Secure" : "";
+            document.cookie = {json.dumps(SESSION_COOKIE)} + "=" + {json.dumps(pending)} +
+                "; Path=/; Max-Age={max_age}; SameSite=Strict" + secure;
+        }})();
+        </script>""",
+        unsafe_allow_javascript=True
+    )
+
+
 def login_user(user):
-    """사용자 로그인 (세션에 저장)"""
+    """사용자 로그인 (세션에 저장하고 로그인 유지 토큰 발급)"""
+    from auth.session_token import issue_session_token
+
     st.session_state.authenticated = True
     st.session_state.user = {
         'user_id': user['user_id'],
@@ -47,11 +95,60 @@ def login_user(user):
         'is_admin': bool(user['is_admin'])
     }
 
+    token = issue_session_token(st.session_state.user)
+    st.session_state.session_token = token
+    _queue_session_cookie(token)
+
+
+def restore_session():
+    """
+    세션 쿠키로 로그인 상태 복원 (브라우저 새로고침 시)
+
+    bcrypt 검증 없이 서명/만료 확인과 세션 PK 조회(캐시 적중 시 생략)만 수행한다.
+
+    Returns:
+        bool: 로그인 상태 여부
+    """
+    if LEGACY_QUERY_PARAM in st.query_params:
+        del st.query_params[LEGACY_QUERY_PARAM]
+
+    if st.session_state.get('authenticated'):
+        return True
+
+    try:
+        token = st.context.cookies.get(SESSION_COOKIE)
+    except Exception:
+        token = None
+    # 로그아웃한 연결은 연결 시점의 (폐기된) 쿠키가 그대로 보이므로 다시 확인하지 않음
+    if not token or token == st.session_state.get('revoked_session_token'):
+        return False
+
+    from auth.session_token import resolve_session_token
+
+    user = resolve_session_token(token)
+    if not user:
+        _queue_session_cookie("")
+        st.session_state.revoked_session_token = token
+        return False
+
+    st.session_state.authenticated = True
+    st.session_state.user = user
+    st.session_state.session_token = token
+    return True
+
 
 def logout_user():
-    """사용자 로그아웃 (세션 초기화)"""
+    """사용자 로그아웃 (세션 초기화 및 토큰 폐기)"""
+    token = st.session_state.get('session_token')
+    if token:
+        from auth.session_token import revoke_session_token
+        revoke_session_token(token)
+        st.session_state.revoked_session_token = token
+    _queue_session_cookie("")
+
     st.session_state.authenticated = False
     st.session_state.user = None
+    st.session_state.session_token = None
     # 포트폴리오 상태도 초기화
     st.session_state.portfolio = []
     st.session_state.sim_result = None
@@ -81,3 +178,57 @@ def get_current_user():
         return None
 
     return st.session_state.get('user')
+
+
+def _trusted_proxy_networks():
+    """TRUSTED_PROXIES를 ip_network 목록으로 (잘못된 항목은 무시)"""
+    global _trusted_networks
+
+    if _trusted_networks is None:
+        from config import TRUSTED_PROXIES
+
+        networks = []
+        for entry in TRUSTED_PROXIES:
+            try:
+                networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                continue
+        _trusted_networks = networks
+    return _trusted_networks
+
+
+def _is_trusted_proxy(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxy_networks())
+
+
+def get_client_ip():
+    """
+    클라이언트 IP 반환 (로그인 실패 제한용)
+
+    X-Forwarded-For는 클라이언트가 임의로 보낼 수 있으므로, 연결 주소가 TRUSTED_PROXIES에 속할 때만
+    헤더를 오른쪽(가까운 프록시)부터 읽어 신뢰하지 않는 첫 주소를 사용한다. 그 외에는 연결 주소를 사용한다.
+
+    Returns:
+        str or None: IP 주소 (localhost 접속 등 알 수 없으면 None)
+    """
+    try:
+        peer = getattr(st.context, "ip_address", None)
+        if not _trusted_proxy_networks():
+            return peer
+
+        # Streamlit은 루프백 연결을 None으로 돌려줌
+        if not _is_trusted_proxy(peer or "127.0.0.1"):
+            return peer
+
+        forwarded = st.context.headers.get("X-Forwarded-For")
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()] if forwarded else []
+        for hop in reversed(hops):
+            if not _is_trusted_proxy(hop):
+                return hop
+        return hops[0] if hops else peer
+    except Exception:
+        return None
@@ -0,0 +1,189 @@
+"""로그인 유지용 세션 토큰
+
+토큰 형식: <session_id>.<expires_at>.<signature>
+- session_id: 임의 생성 ID (sessions 테이블 PK)
+- expires_at: 만료 시각 (Unix time)
+- signature: HMAC-SHA256(secret, session_id.expires_at)
+
+서명과 만료는 DB 없이 검증하고, 세션 존재 여부는 PK 조회 1회로 확인한 뒤 메모리 LRU에 보관한다.
+비밀번호 검증(bcrypt)은 거치지 않는다.
+"""
+
+import os
+import hmac
+import time
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+from config import SESSION_SECRET, SESSION_TTL_DAYS, SESSION_CACHE_SIZE, SESSION_CACHE_TTL
+from db.database import get_db_path
+from db.models import create_session, get_session_user, delete_session, delete_expired_sessions
+from utils.resource_telemetry import register_cache_provider
+
+PURGE_INTERVAL = 3600  # 만료 세션 정리 주기 (초)
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # {session_id: (user dict, expires_at, cached_at)}
+_secret = None
+_last_purge = 0.0
+
+register_cache_provider("session_tokens", lambda: {'entries': len(_cache), 'bytes': 0})
+
+
+def _get_secret() -> bytes:
+    """
+    서명 키 반환
+
+    SESSION_SECRET 환경변수가 없으면 DB 폴더의 .session_secret 파일을 사용하고,
+    파일도 없으면 새로 만든다. (재시작 후에도 기존 토큰이 유효하도록 파일에 보관)
+    """
+    global _secret
+
+    if _secret is not None:
+        return _secret
+
+    with _lock:
+        if _secret is not None:
+            return _secret
+
+        if SESSION_SECRET:
+            _secret = SESSION_SECRET.encode('utf-8')
+            return _secret
+
+        secret_path = os.path.join(os.path.dirname(get_db_path()) or ".", ".session_secret")
+        try:
+            fd = os.open(secret_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+        except FileExistsError:
+            pass
+
+        with open(secret_path, "r") as f:
+            _secret = f.read().strip().encode('utf-8')
+        return _secret
+
+
+def _sign(session_id: str, expires_at: int) -> str:
+    message = f"{session_id}.{expires_at}".encode('utf-8')
+    return hmac.new(_get_secret(), message, hashlib.sha256).hexdigest()
+
+
+def _parse(token: str):
+    """
+    토큰 파싱 및 서명/만료 검증
+
+    Returns:
+        tuple or None: (session_id, expires_at)
+    """
+    if not token or token.count(".") != 2:
+        return None
+    session_id, expires_str, signature = token.split(".")
+    try:
+        expires_at = int(expires_str)
+    except ValueError:
+        return None
+    if expires_at <= time.time():
+        return None
+    if not hmac.compare_digest(signature, _sign(session_id, expires_at)):
+        return None
+    return session_id, expires_at
+
+
+def _cache_put(session_id, user, expires_at):
+    with _lock:
+        _cache[session_id] = (user, expires_at, time.monotonic())
+        _cache.move_to_end(session_id)
+        while len(_cache) > SESSION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _purge_expired():
+    """만료 세션 정리 (PURGE_INTERVAL마다 한 번)"""
+    global _last_purge
+
+    now = time.monotonic()
+    with _lock:
+        if now - _last_purge < PURGE_INTERVAL:
+            return
+        _last_purge = now
+    delete_expired_sessions(int(time.time()))
+
+
+def issue_session_token(user: dict) -> str:
+    """
+    로그인 세션 생성 및 토큰 발급
+
+    Args:
+        user: 사용자 정보 (user_id, username, is_admin)
+
+    Returns:
+        str: 세션 토큰
+    """
+    _purge_expired()
+
+    session_id = secrets.token_urlsafe(24)
+    expires_at = int(time.time()) + SESSION_TTL_DAYS * 86400
+    create_session(session_id, user['user_id'], expires_at)
+
+    _cache_put(session_id, {
+        'user_id': user['user_id'],
+        'username': user['username'],
+        'is_admin': bool(user['is_admin'])
+    }, expires_at)
+
+    return f"{session_id}.{expires_at}.{_sign(session_id, expires_at)}"
+
+
+def resolve_session_token(token: str):
+    """
+    토큰으로 사용자 복원
+
+    Args:
+        token: 세션 토큰
+
+    Returns:
+        dict or None: 사용자 정보 (user_id, username, is_admin), 유효하지 않으면 None
+    """
+    parsed = _parse(token)
+    if not parsed:
+        return None
+    session_id, expires_at = parsed
+
+    with _lock:
+        entry = _cache.get(session_id)
+        if entry and time.monotonic() - entry[2] < SESSION_CACHE_TTL:
+            _cache.move_to_end(session_id)
+            return dict(entry[0])
+
+    row = get_session_user(session_id)
+    if not row or row['expires_at'] != expires_at:
+        with _lock:
+            _cache.pop(session_id, None)
+        return None
+
+    user = {
+        'user_id': row['user_id'],
+        'username': row['username'],
+        'is_admin': bool(row['is_admin'])
+    }
+    _cache_put(session_id, user, expires_at)
+    return dict(user)
+
+
+def revoke_session_token(token: str):
+    """세션 토큰 폐기 (로그아웃)"""
+    parsed = _parse(token)
+    if not parsed:
+        return
+    session_id = parsed[0]
+    with _lock:
+        _cache.pop(session_id, None)
+    delete_session(session_id)
+
+
+def clear_session_cache():
+    """메모리 세션 캐시 초기화 (DB 복원 등으로 sessions 테이블이 바뀐 경우)"""
+    with _lock:
+        _cache.clear()
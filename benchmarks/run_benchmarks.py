@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+core 모듈 핫패스 성능 벤치마크
+
+합성 가격 패널(일수 x 자산 수)로 백테스트, 성과 지표, 기술적 지표, 환율 변환, 패널 생성을 측정한다.
+케이스별 실행 시간(중앙값/최소값)과 최대 메모리(tracemalloc peak)를 출력하고,
+저장된 기준값(baseline)과 비교해 회귀가 있으면 종료 코드 1을 반환한다.
+
+실행 방법:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.run_benchmarks --sizes 252x5,2520x50 --filter backtest
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import date
+
+# 프로젝트 루트 디렉토리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from config import FX_TICKERS
+from core.backtest import calculate_portfolio, _apply_fx_conversion
+from core.panel import PricePanel, PRICE_DTYPE
+from core.metrics import calculate_metrics, calculate_return_analytics
+from core.indicators import (
+    calculate_ema,
+    calculate_bollinger_bands,
+    calculate_rsi,
+    calculate_macd,
+    calculate_vwap
+)
+
+# 기본 패널 크기 (거래일 수 x 자산 수)
+DEFAULT_SIZES = [(252, 5), (1260, 20), (2520, 50), (5040, 100)]
+BENCHMARK_TICKER = "SPY"
+START_DATE = date(2005, 1, 3)
+SEED = 42
+
+
+# ==================================================
+# 합성 데이터 생성
+# ==================================================
+
+def make_price_panel(days, assets, seed=SEED):
+    """
+    합성 종가 패널 생성 (기하 브라운 운동)
+
+    Returns:
+        tuple: (PricePanel, portfolio 리스트)
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(START_DATE, periods=days)
+
+    tickers = []
+    portfolio = []
+    for i in range(assets):
+        # 통화가 섞이도록 일부는 한국/일본 종목 접미사 사용
+        if i % 3 == 1:
+            ticker, currency = f"{i:06d}.KS", "KRW"
+        elif i % 3 == 2:
+            ticker, currency = f"{1000 + i}.T", "JPY"
+        else:
+            ticker, currency = f"A{i:03d}", "USD"
+        tickers.append(ticker)
+        portfolio.append({
+            'ticker': ticker,
+            'name': ticker,
+            'weight': 100.0 / assets,
+            'type': 'Stock',
+            'currency': currency
+        })
+
+    columns = tickers + [BENCHMARK_TICKER, FX_TICKERS["USD_KRW"], FX_TICKERS["JPY_KRW"]]
+    log_rets = rng.normal(0.0003, 0.015, size=(days, len(columns)))
+    prices = 100 * np.exp(np.cumsum(log_rets, axis=0))
+    prices[:, -2] *= 13.0   # USD/KRW 수준
+    prices[:, -1] *= 0.09   # JPY/KRW 수준
+
+    return PricePanel(prices, index.to_numpy(), columns), portfolio
+
+
+def make_ohlcv(days, seed=SEED):
+    """합성 OHLCV 데이터 생성 (fetch_ohlcv_data와 같이 가격 열은 float32)"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(START_DATE, periods=days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, size=days)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.01, size=days)) * close
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 10_000_000, size=days).astype(float)
+    }, index=index).astype({col: PRICE_DTYPE for col in ['Open', 'High', 'Low', 'Close']})
+
+
+# ==================================================
+# 벤치마크 케이스
+# ==================================================
+
+def build_cases(days, assets):
+    """
+    패널 크기별 벤치마크 케이스 생성
+
+    Returns:
+        list: [(case_name, callable), ...]
+    """
+    data, portfolio = make_price_panel(days, assets)
+    ohlcv = make_ohlcv(days)
+    close = ohlcv['Close']
+    end_date = data.index[-1].date()
+    # 티커별로 받은 종가 (fetch_data_robust가 패널로 합치는 입력)
+    series_map = {ticker: pd.Series(data.column(ticker), index=data.index) for ticker in data.tickers}
+
+    result = calculate_portfolio(data, portfolio, BENCHMARK_TICKER, 'Monthly', 1, apply_fx=True)
+
+    return [
+        ("backtest.calculate_portfolio[none]",
+         lambda: calculate_portfolio(data, portfolio, BENCHMARK_TICKER, 'None', 1)),
+        ("backtest.calculate_portfolio[monthly+fx]",
+         lambda: calculate_portfolio(data, portfolio, BENCHMARK_TICKER, 'Monthly', 1, apply_fx=True)),
+        ("backtest._apply_fx_conversion",
+         lambda: _apply_fx_conversion(data, portfolio, BENCHMARK_TICKER)),
+        ("panel.PricePanel.from_series", lambda: PricePanel.from_series(series_map)),
+        ("metrics.calculate_metrics",
+         lambda: calculate_metrics(result['Daily_Ret'], result['Portfolio'].iloc[-1], START_DATE, end_date)),
+        ("metrics.calculate_return_analytics",
+         lambda: calculate_return_analytics(result)),
+        ("indicators.calculate_ema", lambda: calculate_ema(close)),
+        ("indicators.calculate_bollinger_bands", lambda: calculate_bollinger_bands(close)),
+        ("indicators.calculate_rsi", lambda: calculate_rsi(close)),
+        ("indicators.calculate_macd", lambda: calculate_macd(close)),
+        ("indicators.calculate_vwap", lambda: calculate_vwap(ohlcv)),
+    ]
+
+
+def measure(func, repeat):
+    """
+    실행 시간 및 최대 메모리 측정
+
+    시간 측정과 메모리 측정은 tracemalloc 오버헤드가 섞이지 않도록 따로 실행한다.
+
+    Returns:
+        dict: {'median_ms', 'min_ms', 'peak_kb'}
+    """
+    func()  # 워밍업
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(sizes, repeat, name_filter=None):
+    """
+    전체 벤치마크 실행
+
+    Returns:
+        dict: {case_key: 측정 결과}
+    """
+    results = {}
+    for days, assets in sizes:
+        for case_name, func in build_cases(days, assets):
+            if name_filter and name_filter not in case_name:
+                continue
+            key = f"{case_name}@{days}x{assets}"
+            results[key] = measure(func, repeat)
+            print(f"  {key:<60} {results[key]['median_ms']:>10.2f} ms  {results[key]['peak_kb']:>10.1f} KB")
+    return results
+
+
+# ==================================================
+# 기준값 저장 및 비교
+# ==================================================
+
+def get_environment():
+    """측정 환경 정보"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_baseline(path, results):
+    """측정 결과를 기준값 파일로 저장"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'environment': get_environment(), 'results': results}, f, indent=2, sort_keys=True)
+    print(f"\n기준값 저장: {path}")
+
+
+def compare_baseline(path, results, threshold):
+    """
+    기준값과 비교
+
+    Args:
+        path: 기준값 파일 경로
+        results: 현재 측정 결과
+        threshold: 허용 증가율 (0.2 = 20%)
+
+    Returns:
+        list: 회귀 케이스 목록
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if baseline.get('environment') != get_environment():
+        print("[WARNING] 기준값과 측정 환경이 다릅니다. 비교 결과를 참고용으로만 사용하세요.")
+
+    regressions = []
+    print(f"\n기준값 비교 ({path}, 허용 {threshold:.0%})")
+    for key, current in results.items():
+        base = baseline['results'].get(key)
+        if not base:
+            print(f"  {key:<60} (기준값 없음)")
+            continue
+
+        time_ratio = current['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+        mem_ratio = current['peak_kb'] / base['peak_kb'] if base['peak_kb'] else 1.0
+        status = "OK"
+        if time_ratio > 1 + threshold or mem_ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(key)
+        print(f"  {key:<60} time x{time_ratio:5.2f}  mem x{mem_ratio:5.2f}  {status}")
+
+    return regressions
+
+
+def parse_sizes(value):
+    """'252x5,2520x50' 형식의 크기 문자열 파싱"""
+    sizes = []
+    for item in value.split(","):
+        days, assets = item.lower().split("x")
+        sizes.append((int(days), int(assets)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invest Lab core 벤치마크")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES,
+                        help="패널 크기 목록 (예: 252x5,2520x50)")
+    parser.add_argument("--repeat", type=int, default=5, help="케이스별 반복 횟수")
+    parser.add_argument("--filter", default=None, help="케이스 이름 필터 (부분 일치)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="결과를 기준값으로 저장")
+    parser.add_argument("--compare", metavar="PATH", help="기준값 파일과 비교")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀 판정 허용 증가율")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Invest Lab Core Benchmarks")
+    print("=" * 60)
+    print(json.dumps(get_environment()))
+    print()
+
+    results = run_benchmarks(args.sizes, args.repeat, args.filter)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if args.compare:
+        regressions = compare_baseline(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n[ERROR] {len(regressions)}개 케이스에서 성능 회귀 발견")
+            sys.exit(1)
+        print("\n[SUCCESS] 성능 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Streamlit 콜드 스타트 / 첫 화면 측정
+
+각 측정은 새 파이썬 프로세스에서 실행해 모듈 캐시(sys.modules) 영향을 없앤다.
+- imports: 주요 모듈 단독 import 시간 (python -X importtime 누적값)
+- first-render: AppTest로 app.py 첫 실행 시간 (로그인 화면 / 로그인 후 기본 화면)과
+  그 시점에 로드된 무거운 모듈 목록
+- server: streamlit run 프로세스가 /_stcore/health에 응답할 때까지 시간 (--server)
+
+실행 방법:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --server
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+from urllib.request import urlopen
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 단독 import 시간을 측정할 모듈
+IMPORT_TARGETS = [
+    "core.data_fetcher",
+    "core.analysis",
+    "ui.login_page",
+    "ui.stock_search",
+    "ui.backtest_results",
+    "ui.technical_analysis",
+    "ui.admin_panel",
+    "yfinance",
+    "google.genai",
+    "plotly.express",
+    "matplotlib",
+]
+
+# 첫 화면 시점에 로드 여부를 확인할 무거운 모듈
+HEAVY_MODULES = ["yfinance", "google.genai", "plotly.express", "plotly.graph_objects", "matplotlib"]
+
+FIRST_RENDER_SCRIPT = r"""
+import os, sys, json, time
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+if {authenticated!r}:
+    at.session_state["authenticated"] = True
+    at.session_state["user"] = {{"user_id": 1, "username": "admin", "is_admin": True}}
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed_ms": elapsed * 1000,
+    "exception": bool(at.exception),
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def _child_env(db_dir):
+    """측정용 하위 프로세스 환경 (임시 DB, 메트릭 서버 비활성화)"""
+    env = dict(os.environ)
+    env["DATABASE_PATH"] = os.path.join(db_dir, "startup.db")
+    env["METRICS_ENABLED"] = "false"
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import(module, env):
+    """
+    모듈 단독 import 시간 (ms)
+
+    -X importtime 출력에서 대상 모듈 행의 누적(cumulative) 값을 사용한다.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return None
+
+
+def measure_first_render(authenticated, env):
+    """AppTest 첫 실행 시간 및 로드된 무거운 모듈"""
+    script = FIRST_RENDER_SCRIPT.format(root=ROOT_DIR, authenticated=authenticated, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(proc.stderr[-2000:])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_server(env, timeout=120):
+    """
+    streamlit run 콜드 스타트 시간
+
+    Returns:
+        dict: {'health_ms': 헬스체크 응답까지, 'index_ms': 첫 페이지(HTML) 응답까지}
+    """
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless=true",
+         f"--server.port={port}", "--server.address=127.0.0.1", "--browser.gatherUsageStats=false"],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        health_ms = None
+        while time.perf_counter() - start < timeout:
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        health_ms = (time.perf_counter() - start) * 1000
+                        break
+            except OSError:
+                time.sleep(0.05)
+        if health_ms is None:
+            raise RuntimeError("streamlit 서버가 제한 시간 안에 시작되지 않았습니다.")
+
+        with urlopen(f"http://127.0.0.1:{port}/", timeout=10) as response:
+            response.read()
+        index_ms = (time.perf_counter() - start) * 1000
+        return {'health_ms': health_ms, 'index_ms': index_ms}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invest Lab 시작 시간 측정")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--server", action="store_true", help="streamlit 서버 콜드 스타트도 측정")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    results = {'imports': {}, 'first_render': {}}
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        env = _child_env(db_dir)
+
+        print("=" * 60)
+        print("모듈 단독 import 시간 (ms, 중앙값)")
+        print("=" * 60)
+        for module in IMPORT_TARGETS:
+            value = _median([measure_import(module, env) for _ in range(args.repeat)])
+            results['imports'][module] = value
+            print(f"  {module:<30} {'N/A' if value is None else f'{value:10.1f}'}")
+
+        print()
+        print("=" * 60)
+        print("첫 실행 시간 (AppTest, ms, 중앙값)")
+        print("=" * 60)
+        for label, authenticated in (("login", False), ("backtest", True)):
+            runs = [measure_first_render(authenticated, env) for _ in range(args.repeat)]
+            value = _median([r['elapsed_ms'] for r in runs])
+            loaded = runs[-1]['loaded']
+            results['first_render'][label] = {'elapsed_ms': value, 'loaded': loaded,
+                                              'exception': any(r['exception'] for r in runs)}
+            print(f"  {label:<12} {value:10.1f}  로드된 무거운 모듈: {', '.join(loaded) or '없음'}")
+
+        if args.server:
+            print()
+            print("=" * 60)
+            print("서버 콜드 스타트 (ms, 중앙값)")
+            print("=" * 60)
+            runs = [measure_server(env) for _ in range(args.repeat)]
+            results['server'] = {
+                'health_ms': _median([r['health_ms'] for r in runs]),
+                'index_ms': _median([r['index_ms'] for r in runs])
+            }
+            print(f"  /_stcore/health {results['server']['health_ms']:10.1f}")
+            print(f"  / (index)       {results['server']['index_ms']:10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
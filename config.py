@@ -9,6 +9,10 @@ load_dotenv()
 # 데이터베이스 설정
 # ==================================================
 DATABASE_PATH = os.environ.get("DATABASE_PATH", "./data/portfolios.db")
+IMPORT_BATCH_SIZE = 5000  # CSV 가져오기 시 executemany 한 번에 쓰는 행 수
+EXPORT_FETCH_SIZE = 1000  # 내보내기 시 fetchmany 한 번에 읽는 행 수
+EXPORT_FILE_TTL = 3600    # 내보내기 임시 파일 보관 시간 (초)
+STATS_CACHE_TTL = 10      # 관리자 대시보드 통계 캐시 유지 시간 (초, 개수는 트리거로 항상 최신)
 
 # ==================================================
 # 인증 설정
@@ -16,7 +20,26 @@ DATABASE_PATH = os.environ.get("DATABASE_PATH", "./data/portfolios.db")
 ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "admin1234")
 MIN_PASSWORD_LENGTH = int(os.environ.get("MIN_PASSWORD_LENGTH", 8))
-BCRYPT_ROUNDS = 12
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))  # 새로 만드는 해시에만 적용
+# bcrypt 전용 작업 스레드 수 및 대기 한도 (로그인 폭주 시 백테스트 CPU 보호)
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", 2))
+AUTH_QUEUE_LIMIT = int(os.environ.get("AUTH_QUEUE_LIMIT", 8))
+AUTH_QUEUE_TIMEOUT = float(os.environ.get("AUTH_QUEUE_TIMEOUT", 5.0))  # 초
+
+# 로그인 실패 제한
+LOGIN_FAILURE_WINDOW = int(os.environ.get("LOGIN_FAILURE_WINDOW", 900))  # 실패 횟수 집계 구간 (초)
+LOGIN_MAX_FAILURES_PER_USER = int(os.environ.get("LOGIN_MAX_FAILURES_PER_USER", 5))
+LOGIN_MAX_FAILURES_PER_IP = int(os.environ.get("LOGIN_MAX_FAILURES_PER_IP", 20))
+LOGIN_LOCKOUT_SECONDS = int(os.environ.get("LOGIN_LOCKOUT_SECONDS", 300))
+# X-Forwarded-For를 믿을 리버스 프록시 주소/대역 (쉼표 구분, 비어 있으면 헤더를 무시하고 연결 주소 사용)
+TRUSTED_PROXIES = [p.strip() for p in os.environ.get("TRUSTED_PROXIES", "").split(",") if p.strip()]
+
+# 로그인 유지 (서명된 세션 토큰)
+SESSION_SECRET = os.environ.get("SESSION_SECRET")  # 없으면 DB 폴더의 .session_secret 파일 사용
+SESSION_TTL_DAYS = int(os.environ.get("SESSION_TTL_DAYS", 7))
+SESSION_CACHE_SIZE = 1024  # 메모리에 유지할 검증된 세션 수
+SESSION_CACHE_TTL = 60     # 메모리 캐시 재검증 주기 (초) - 삭제된 사용자/세션 반영
+LAST_LOGIN_FLUSH_INTERVAL = 30  # 마지막 로그인 시간 일괄 기록 주기 (초)
 
 # ==================================================
 # 백테스트 설정
@@ -65,6 +88,36 @@ FX_TICKERS = {
 KRW_ASSET_SUFFIXES = (".KS", ".KQ")
 KRW_ASSET_TICKERS = ("^KS11",)
 
+# 가격 데이터 캐시 (티커별 종가, 프로세스 전체)
+PRICE_CACHE_MAX_MB = float(os.environ.get("PRICE_CACHE_MAX_MB", 64))
+PRICE_CACHE_TTL = 300  # 오늘 이후를 포함한 구간의 유지 시간 (초, 과거 구간은 용량 초과 시에만 제거)
+OHLCV_CACHE_ENTRIES = 64  # 기술적 분석용 OHLCV 캐시 최대 개수
+
+# ==================================================
+# 종목 검색 설정
+# ==================================================
+# 검색 응답 대기 한도 (초) - 이 시간 안에 도착한 결과만 반환
+SEARCH_LATENCY_BUDGET = float(os.environ.get("SEARCH_LATENCY_BUDGET", 3.0))
+# 원격 검색(yfinance) 동시 실행 스레드 수
+SEARCH_MAX_WORKERS = int(os.environ.get("SEARCH_MAX_WORKERS", 4))
+
+# ==================================================
+# 성능 계측 설정
+# ==================================================
+# 지연 시간 히스토그램 버킷 상한 (ms)
+METRICS_HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# 백분위 계산에 사용하는 구간별 최근 샘플 수
+METRICS_SAMPLE_SIZE = 512
+# 세션별 히스토그램을 유지할 최대 세션 수
+METRICS_SESSION_LIMIT = int(os.environ.get("METRICS_SESSION_LIMIT", 100))
+# Prometheus 메트릭 엔드포인트 (/metrics)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")  # 인증 없는 엔드포인트라 기본은 로컬만
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9464))
+# 리소스 텔레메트리 샘플링 주기 (초, 0이면 사용 안 함)와 보관할 샘플 수 (기본 10초 x 360 = 1시간)
+TELEMETRY_INTERVAL = float(os.environ.get("TELEMETRY_INTERVAL", 10))
+TELEMETRY_HISTORY_SIZE = int(os.environ.get("TELEMETRY_HISTORY_SIZE", 360))
+
 # ==================================================
 # AI 분석 설정
 # ==================================================
@@ -124,3 +177,13 @@ TA_EMA_COLORS = {
     50: "#F97316",   # Orange
     200: "#EAB308"   # Dark Yellow
 }
+
+# 차트 데이터 축약 설정
+TA_CHART_WIDTH_PX = 1400  # 기준 차트 너비 (캡처 이미지 너비와 동일)
+TA_CHART_POINTS_PER_PIXEL = float(os.environ.get("TA_CHART_POINTS_PER_PIXEL", 1.0))
+# 포인트 예산 직접 지정 (0이면 차트 너비 x 픽셀당 포인트로 계산)
+TA_CHART_MAX_POINTS = int(os.environ.get("TA_CHART_MAX_POINTS", 0))
+# 표시 구간 밖 데이터에 할당할 예산 비율
+TA_CHART_CONTEXT_RATIO = 0.2
+# 캐시할 차트 Figure 최대 개수 (프로세스 전체)
+TA_FIGURE_CACHE_ENTRIES = int(os.environ.get("TA_FIGURE_CACHE_ENTRIES", 32))
@@ -1,14 +1,14 @@
 """AI 분석 모듈"""
 
 import logging
-from google import genai
-from google.genai import types
 
 from config import GEMINI_MODEL
+from utils.instrumentation import timed
 
 logger = logging.getLogger(__name__)
 
 
+@timed("ai.generate_analysis")
 def generate_ai_analysis(portfolio, total_return, cagr, mdd, sharpe, api_key):
     """
     AI를 통한 포트폴리오 분석 보고서 생성
@@ -66,6 +66,10 @@ def generate_ai_analysis(portfolio, total_return, cagr, mdd, sharpe, api_key):
 """
 
     try:
+        # google-genai는 import 비용이 커서 분석 요청 시에만 불러온다
+        from google import genai
+        from google.genai import types
+
         client = genai.Client(api_key=api_key)
 
         # Gemini 3 Flash 설정
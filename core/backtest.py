@@ -8,38 +8,66 @@ from config import (
     KRW_ASSET_SUFFIXES,
     KRW_ASSET_TICKERS
 )
+from core.panel import PricePanel, PRICE_DTYPE
+from utils.instrumentation import span, timed
 
+# 백테스트 결과 DataFrame의 고정 컬럼 (나머지는 개별 자산 가치)
+RESULT_COLUMNS = ['Daily_Ret', 'Portfolio', 'Benchmark', 'BM_Daily_Ret']
 
-def _apply_fx_conversion(df_calc, portfolio, benchmark_ticker):
-    """환율 변환 적용"""
-    usd_krw = df_calc.get(FX_TICKERS["USD_KRW"])
-    jpy_krw = df_calc.get(FX_TICKERS["JPY_KRW"])
 
-    # 포트폴리오 자산에 환율 적용
-    for asset in portfolio:
-        ticker = asset['ticker']
-        currency = asset.get('currency', 'USD')
+def get_asset_columns(result):
+    """백테스트 결과에서 개별 자산 컬럼 목록 반환"""
+    return [c for c in result.columns if c not in RESULT_COLUMNS]
+
+
+def _fx_rate_for(ticker, currency, usd_krw, jpy_krw):
+    """티커에 곱할 환율 열 (KRW 자산이거나 환율 데이터가 없으면 None)"""
+    if currency == 'USD':
+        return usd_krw
+    if currency == 'JPY':
+        return jpy_krw
+    return None
+
+
+def _benchmark_currency(benchmark_ticker):
+    """벤치마크 통화 추정 (KRW 지수/종목, 일본 종목, 그 외 USD)"""
+    if benchmark_ticker.endswith(KRW_ASSET_SUFFIXES) or benchmark_ticker in KRW_ASSET_TICKERS:
+        return 'KRW'
+    if benchmark_ticker.endswith('.T'):
+        return 'JPY'
+    return 'USD'
+
+
+def _apply_fx_conversion(panel, portfolio, benchmark_ticker):
+    """
+    환율 변환 적용
+
+    변환 대상 열에 환율 열을 곱한 새 패널을 반환한다. (날짜 배열은 원본과 공유)
+    벤치마크가 포트폴리오에도 있으면 한 번만 변환한다.
+
+    Args:
+        panel: PricePanel
+        portfolio: 포트폴리오 리스트 [{'ticker', 'currency', ...}, ...]
+        benchmark_ticker: 벤치마크 티커
 
-        if ticker in df_calc.columns:
-            if currency == 'USD' and usd_krw is not None:
-                df_calc[ticker] = df_calc[ticker] * usd_krw
-            elif currency == 'JPY' and jpy_krw is not None:
-                df_calc[ticker] = df_calc[ticker] * jpy_krw
+    Returns:
+        PricePanel: 원화 환산 패널
+    """
+    usd_krw = panel.column(FX_TICKERS["USD_KRW"])
+    jpy_krw = panel.column(FX_TICKERS["JPY_KRW"])
 
-    # 벤치마크에 환율 적용
-    if benchmark_ticker in df_calc.columns:
-        is_krw_asset = (
-            benchmark_ticker.endswith(KRW_ASSET_SUFFIXES) or
-            benchmark_ticker in KRW_ASSET_TICKERS
-        )
+    currencies = {}
+    for asset in portfolio:
+        currencies.setdefault(asset['ticker'], asset.get('currency', 'USD'))
+    currencies.setdefault(benchmark_ticker, _benchmark_currency(benchmark_ticker))
 
-        if not is_krw_asset:
-            if benchmark_ticker.endswith('.T') and jpy_krw is not None:
-                df_calc[benchmark_ticker] = df_calc[benchmark_ticker] * jpy_krw
-            elif usd_krw is not None:
-                df_calc[benchmark_ticker] = df_calc[benchmark_ticker] * usd_krw
+    values = panel.values.copy()
+    for ticker, currency in currencies.items():
+        rate = _fx_rate_for(ticker, currency, usd_krw, jpy_krw)
+        if ticker in panel and rate is not None:
+            values[:, panel.get_loc(ticker)] *= rate
 
-    return df_calc
+    return panel.with_values(values)
 
 
 def _get_rebalance_months(rebalance_type, start_month):
@@ -55,12 +83,53 @@ def _get_rebalance_months(rebalance_type, start_month):
     return []
 
 
+def _rebalance_starts(months, rebalance_type, target_months):
+    """
+    리밸런싱으로 비중을 목표로 되돌리는 행 번호 (첫 행 포함)
+
+    대상 월로 바뀐 첫 거래일에 그날 수익률을 반영하기 전 비중을 되돌린다.
+    """
+    starts = [0]
+    if rebalance_type != 'None' and target_months:
+        month_changed = np.flatnonzero(months[1:] != months[:-1]) + 1
+        starts.extend(int(i) for i in month_changed if months[i] in target_months)
+    return starts
+
+
+def _portfolio_returns(asset_rets, weights, starts):
+    """
+    비중 드리프트를 반영한 포트폴리오 일별 수익률 (리밸런싱 구간별 벡터 연산)
+
+    구간 안에서는 자산별 누적 성장률에 목표 비중을 곱한 합이 구간 시작 대비 포트폴리오 가치이므로
+    날마다 비중을 갱신하는 반복문과 같은 결과를 구간 수만큼의 행렬 연산으로 얻는다.
+
+    Args:
+        asset_rets: (날짜 수, 자산 수) 일별 수익률 (float64)
+        weights: 목표 비중 (합 1)
+        starts: 구간 시작 행 번호 (_rebalance_starts)
+
+    Returns:
+        ndarray: 포트폴리오 일별 수익률
+    """
+    portfolio_rets = np.empty(len(asset_rets))
+    bounds = list(starts) + [len(asset_rets)]
+
+    for seg_start, seg_end in zip(bounds[:-1], bounds[1:]):
+        growth = np.cumprod(1 + asset_rets[seg_start:seg_end], axis=0)
+        value = growth @ weights
+        portfolio_rets[seg_start] = value[0] - 1
+        portfolio_rets[seg_start + 1:seg_end] = value[1:] / value[:-1] - 1
+
+    return portfolio_rets
+
+
+@timed("backtest.calculate_portfolio")
 def calculate_portfolio(data, portfolio, benchmark_ticker, rebalance_type, rebalance_month, apply_fx=False):
     """
     포트폴리오 백테스트 계산
 
     Args:
-        data: 가격 데이터 DataFrame
+        data: 가격 데이터 (PricePanel, DataFrame도 허용)
         portfolio: 포트폴리오 리스트 [{'ticker': str, 'weight': float, ...}, ...]
         benchmark_ticker: 벤치마크 티커
         rebalance_type: 리밸런싱 유형 (None, Yearly, Semi-Annually, Quarterly, Monthly)
@@ -68,70 +137,58 @@ def calculate_portfolio(data, portfolio, benchmark_ticker, rebalance_type, rebal
         apply_fx: KRW 환산 여부
 
     Returns:
-        DataFrame: 백테스트 결과
+        DataFrame: 백테스트 결과 (개별 자산 가치 열은 float32)
     """
-    df_calc = data.copy()
+    panel = data if isinstance(data, PricePanel) else PricePanel.from_frame(data)
 
     # 환율 변환 적용
     if apply_fx:
-        df_calc = _apply_fx_conversion(df_calc, portfolio, benchmark_ticker)
+        with span("backtest.fx_conversion"):
+            panel = _apply_fx_conversion(panel, portfolio, benchmark_ticker)
 
-    # 일별 수익률 계산
-    daily_returns = df_calc.pct_change().dropna()
-    if daily_returns.empty:
+    if len(panel) < 2 or benchmark_ticker not in panel:
         return pd.DataFrame()
 
     # 포트폴리오 티커 및 비중 설정
     port_tickers = [asset['ticker'] for asset in portfolio]
-    if benchmark_ticker not in daily_returns.columns:
-        return pd.DataFrame()
-
     weights_map = {asset['ticker']: asset['weight'] for asset in portfolio}
-    valid_tickers = [t for t in port_tickers if t in daily_returns.columns]
+    valid_tickers = [t for t in port_tickers if t in panel]
     valid_weights = [weights_map.get(t, 0.0) for t in valid_tickers]
 
     if sum(valid_weights) == 0:
         return pd.DataFrame()
 
     # 비중 정규화
-    current_weights = np.array(valid_weights) / sum(valid_weights)
-    target_weights = current_weights.copy()
+    target_weights = np.array(valid_weights) / sum(valid_weights)
+
+    # 일별 수익률 계산 (필요한 열만 float64로)
+    prices = panel.take(valid_tickers + [benchmark_ticker])
+    daily_returns = np.divide(prices[1:], prices[:-1], dtype=np.float64)
+    daily_returns -= 1
+    asset_rets, bm_rets = daily_returns[:, :-1], daily_returns[:, -1]
+    index = panel.index[1:]
 
     # 리밸런싱 월 계산
     target_months = _get_rebalance_months(rebalance_type, rebalance_month)
 
-    # 포트폴리오 수익률 계산
-    portfolio_rets = []
-    prev_month = daily_returns.index[0].month
-    port_returns_df = daily_returns[valid_tickers]
-
-    for date, row in port_returns_df.iterrows():
-        curr_month = date.month
-
-        # 월 변경 시 리밸런싱 체크
-        if curr_month != prev_month:
-            if rebalance_type != 'None' and curr_month in target_months:
-                current_weights = target_weights.copy()
-            prev_month = curr_month
-
-        # 일별 수익률 계산
-        daily_ret = np.dot(row.values, current_weights)
-        portfolio_rets.append(daily_ret)
-
-        # 비중 조정 (드리프트)
-        current_weights = current_weights * (1 + row.values) / (1 + daily_ret)
+    with span("backtest.rebalance_loop"):
+        starts = _rebalance_starts(index.month.to_numpy(), rebalance_type, target_months)
+        portfolio_rets = _portfolio_returns(asset_rets, target_weights, starts)
 
     # 결과 DataFrame 생성
-    result = pd.DataFrame({'Daily_Ret': portfolio_rets}, index=port_returns_df.index)
-    result['Portfolio'] = 100 * (1 + result['Daily_Ret']).cumprod()
-
-    # 벤치마크 추가
-    bm_rets = daily_returns[benchmark_ticker]
-    result['Benchmark'] = 100 * (1 + bm_rets).cumprod()
-    result['BM_Daily_Ret'] = bm_rets
+    result = pd.DataFrame({
+        'Daily_Ret': portfolio_rets,
+        'Portfolio': 100 * np.cumprod(1 + portfolio_rets),
+        'Benchmark': 100 * np.cumprod(1 + bm_rets),
+        'BM_Daily_Ret': bm_rets
+    }, index=index)
 
     # 개별 자산 가치 추가
-    individual_values = (1 + port_returns_df).cumprod() * 100
+    growth = asset_rets + 1
+    np.cumprod(growth, axis=0, out=growth)
+    growth *= 100
+    individual_values = pd.DataFrame(growth.astype(PRICE_DTYPE), index=index, columns=valid_tickers)
+    del growth
     result = pd.concat([result, individual_values], axis=1)
 
     return result
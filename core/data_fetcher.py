@@ -1,11 +1,15 @@
-"""데이터 수집 모듈"""
+"""데이터 수집 모듈
+
+yfinance는 import 비용이 커서 실제로 조회할 때 함수 안에서 불러온다.
+"""
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import logging
 
-from config import FX_TICKERS, MARKET_SUFFIXES, CURRENCY_MAP
+from config import FX_TICKERS, MARKET_SUFFIXES, CURRENCY_MAP, OHLCV_CACHE_ENTRIES
+from core.panel import PricePanel, PRICE_DTYPE
+from utils.instrumentation import span, timed, increment
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,8 @@ def search_ticker(keyword):
             # 일본 시장
             candidates = [keyword + MARKET_SUFFIXES["JP"]]
 
+    import yfinance as yf
+
     for ticker_symbol in candidates:
         try:
             ticker = yf.Ticker(ticker_symbol)
@@ -70,6 +76,8 @@ def search_by_keyword(keyword: str, limit: int = 5) -> list:
     Returns:
         list: [{'ticker': str, 'name': str, 'currency': str}, ...]
     """
+    import yfinance as yf
+
     results = []
 
     try:
@@ -100,11 +108,38 @@ def search_by_keyword(keyword: str, limit: int = 5) -> list:
     return results
 
 
-@st.cache_data(show_spinner=False)
+def _fetch_close(yf, ticker_symbol, start, end):
+    """
+    yfinance에서 한 티커의 [start, end) 종가 조회
+
+    Returns:
+        Series or None: 종가 (데이터가 없으면 빈 Series, 조회 실패 시 None)
+    """
+    try:
+        ticker_obj = yf.Ticker(ticker_symbol)
+        with span("yfinance.history"):
+            df = ticker_obj.history(start=start.date(), end=end.date(), auto_adjust=True)
+
+        if df.empty or 'Close' not in df:
+            return pd.Series(dtype='float64')
+
+        df.index = df.index.tz_localize(None)
+        return df['Close']
+
+    except Exception as e:
+        increment("yfinance.errors")
+        logger.warning(f"Failed to fetch data for {ticker_symbol}: {e}")
+        return None
+
+
+@timed("data.fetch_data_robust")
 def fetch_data_robust(tickers, benchmark_ticker, start_date, end_date):
     """
     여러 티커의 데이터를 가져옴
 
+    티커별 가격 데이터 캐시(core.price_cache)에 있는 구간은 재사용하고 모자란 구간만 조회한다.
+    모자란 구간을 합칠 수 없으면(수정 종가 기준 변경, 캐시 용량 초과) 요청 구간 전체를 다시 조회한다.
+
     Args:
         tickers: 포트폴리오 티커 리스트
         benchmark_ticker: 벤치마크 티커
@@ -112,9 +147,14 @@ def fetch_data_robust(tickers, benchmark_ticker, start_date, end_date):
         end_date: 종료 날짜
 
     Returns:
-        DataFrame: 티커별 종가 데이터
+        PricePanel: 티커별 종가 (날짜 합집합을 앞 값으로 채운 뒤 빈 값이 남은 날짜는 제외), 데이터가 없으면 None
     """
+    from core.price_cache import get_price_cache
+
+    cache = get_price_cache()
+    request_start, request_end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
     data_dict = {}
+    to_fetch = []
 
     # 환율 티커 포함
     unique_tickers = list(set(
@@ -123,39 +163,53 @@ def fetch_data_robust(tickers, benchmark_ticker, start_date, end_date):
         [FX_TICKERS["USD_KRW"], FX_TICKERS["JPY_KRW"]]
     ))
 
-    progress_bar = st.progress(0)
-
-    for i, ticker_symbol in enumerate(unique_tickers):
-        try:
-            ticker_obj = yf.Ticker(ticker_symbol)
-            df = ticker_obj.history(start=start_date, end=end_date, auto_adjust=True)
-
-            if not df.empty:
-                df.index = df.index.tz_localize(None)
-                series = df['Close']
-
-                if isinstance(series, pd.Series) and not series.empty:
-                    data_dict[ticker_symbol] = series
-
-        except Exception as e:
-            logger.warning(f"Failed to fetch data for {ticker_symbol}: {e}")
-
-        progress_bar.progress((i + 1) / len(unique_tickers))
-
-    progress_bar.empty()
+    for ticker_symbol in unique_tickers:
+        series, fetch_range = cache.lookup(ticker_symbol, start_date, end_date)
+        if series is not None:
+            if not series.empty:
+                data_dict[ticker_symbol] = series
+        else:
+            to_fetch.append((ticker_symbol, fetch_range))
+
+    if to_fetch:
+        import yfinance as yf
+
+        progress_bar = st.progress(0)
+
+        for i, (ticker_symbol, (fetch_start, fetch_end)) in enumerate(to_fetch):
+            series = _fetch_close(yf, ticker_symbol, fetch_start, fetch_end)
+            if series is not None:
+                cache.put(ticker_symbol, series, fetch_start, fetch_end)
+                # 모자란 구간만 받은 경우 기존 데이터와 합친 전체 구간
+                cached = cache.get(ticker_symbol, start_date, end_date)
+                if cached is None and (request_start < fetch_start or fetch_end < request_end):
+                    # 합친 구간이 없으면(수정 종가 기준 변경, 캐시 용량 초과) 받은 구간만으로는 모자라 전체를 다시 조회
+                    series = _fetch_close(yf, ticker_symbol, request_start, request_end)
+                    if series is not None:
+                        cache.put(ticker_symbol, series, request_start, request_end)
+                elif cached is not None:
+                    series = cached
+                if series is not None:
+                    series = series[(series.index >= request_start) & (series.index < request_end)]
+                    if not series.empty:
+                        data_dict[ticker_symbol] = series
+
+            progress_bar.progress((i + 1) / len(to_fetch))
+
+        progress_bar.empty()
 
     if not data_dict:
         return None
 
     try:
-        combined_df = pd.DataFrame(data_dict)
-        return combined_df.ffill().dropna()
+        return PricePanel.from_series(data_dict)
     except ValueError as e:
         logger.error(f"Failed to combine data: {e}")
         return None
 
 
-@st.cache_data(show_spinner=False, ttl=300)
+@st.cache_data(show_spinner=False, ttl=300, max_entries=OHLCV_CACHE_ENTRIES)
+@timed("data.fetch_ohlcv_data")
 def fetch_ohlcv_data(ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
     단일 티커의 OHLCV 데이터 수집 (Technical Analysis용)
@@ -168,9 +222,12 @@ def fetch_ohlcv_data(ticker: str, period: str = "1y", interval: str = "1d") -> p
     Returns:
         DataFrame with columns: Open, High, Low, Close, Volume (index: Date)
     """
+    import yfinance as yf
+
     try:
         ticker_obj = yf.Ticker(ticker)
-        df = ticker_obj.history(period=period, interval=interval, auto_adjust=True)
+        with span("yfinance.history"):
+            df = ticker_obj.history(period=period, interval=interval, auto_adjust=True)
 
         if df.empty:
             logger.warning(f"No OHLCV data for {ticker}")
@@ -183,11 +240,13 @@ def fetch_ohlcv_data(ticker: str, period: str = "1y", interval: str = "1d") -> p
         ohlcv_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
         df = df[ohlcv_columns]
 
-        # 결측값 처리
+        # 결측값 처리 (가격 열은 float32, 거래량은 정밀도를 위해 그대로)
         df = df.ffill().dropna()
+        df = df.astype({col: PRICE_DTYPE for col in ['Open', 'High', 'Low', 'Close']})
 
         return df
 
     except Exception as e:
+        increment("yfinance.errors")
         logger.error(f"Failed to fetch OHLCV data for {ticker}: {e}")
         return None
@@ -0,0 +1,243 @@
+"""차트 데이터 축약(decimation) 모듈
+
+긴 기간/분봉 데이터를 차트로 보낼 때 포인트 수를 예산 안으로 줄인다.
+- 라인 지표: LTTB (Largest-Triangle-Three-Buckets) 샘플링
+- 캔들/거래량: 구간별 OHLC 집계 (open=첫값, high=최대, low=최소, close=마지막, volume=합계)
+
+표시 구간(visible_range)이 주어지면 그 구간은 예산 안에서 최대 해상도로 유지하고,
+구간 밖의 데이터는 맥락 표시용으로 더 강하게 축약한다.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    TA_CHART_WIDTH_PX,
+    TA_CHART_POINTS_PER_PIXEL,
+    TA_CHART_MAX_POINTS,
+    TA_CHART_CONTEXT_RATIO
+)
+
+
+def get_point_budget(chart_width: int = None) -> int:
+    """
+    차트 너비 기준 포인트 예산 계산
+
+    Args:
+        chart_width: 차트 너비 (px, 기본: config의 TA_CHART_WIDTH_PX)
+
+    Returns:
+        int: 차트 하나에 보낼 최대 포인트 수
+    """
+    if TA_CHART_MAX_POINTS:
+        return TA_CHART_MAX_POINTS
+    if chart_width is None:
+        chart_width = TA_CHART_WIDTH_PX
+    return max(100, int(chart_width * TA_CHART_POINTS_PER_PIXEL))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    LTTB 알고리즘으로 남길 포인트 인덱스 선택
+
+    Args:
+        x: x 값 배열 (단조 증가)
+        y: y 값 배열 (NaN 없음)
+        n_out: 목표 포인트 수
+
+    Returns:
+        ndarray: 선택된 인덱스 (오름차순, 첫/마지막 포인트 포함)
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 1)]
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    bucket_size = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # 다음 버킷 평균점 (마지막 버킷이면 끝점)
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # 이전 선택점-후보점-다음 평균점 삼각형 면적이 최대인 후보 선택
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def decimate_series(series: pd.Series, n_out: int) -> pd.Series:
+    """
+    라인 시리즈를 LTTB로 축약 (NaN 구간은 제외)
+
+    Args:
+        series: DatetimeIndex 시리즈
+        n_out: 목표 포인트 수
+
+    Returns:
+        Series: 축약된 시리즈
+    """
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+
+    x = series.index.asi8
+    idx = lttb_indices(x, series.to_numpy(), n_out)
+    return series.iloc[idx]
+
+
+def aggregate_ohlcv(df: pd.DataFrame, n_buckets: int) -> pd.DataFrame:
+    """
+    OHLCV 데이터를 연속 구간별로 집계
+
+    Args:
+        df: OHLCV DataFrame (Open, High, Low, Close, Volume)
+        n_buckets: 목표 봉 개수
+
+    Returns:
+        DataFrame: 집계된 OHLCV (인덱스: 각 구간의 첫 시각)
+    """
+    n = len(df)
+    if n <= n_buckets or n_buckets < 1:
+        return df
+
+    starts = (np.arange(n_buckets) * n) // n_buckets
+    ends = np.append(starts[1:], n) - 1
+
+    return pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts),
+    }, index=df.index[starts])
+
+
+def _split_budget(index: pd.DatetimeIndex, max_points: int, visible_range) -> list:
+    """
+    표시 구간 기준으로 (앞, 표시 구간, 뒤) 슬라이스와 각 예산 계산
+
+    Returns:
+        list: [(slice, budget), ...]
+    """
+    n = len(index)
+    if visible_range is None:
+        return [(slice(0, n), max_points)]
+
+    start, end = visible_range
+    lo = int(index.searchsorted(pd.Timestamp(start), side='left'))
+    hi = int(index.searchsorted(pd.Timestamp(end), side='right'))
+    if lo >= hi:
+        return [(slice(0, n), max_points)]
+
+    # 구간 밖은 맥락용으로 예산의 일부만 사용 (앞/뒤 데이터 비율로 분배)
+    context_budget = max(2, int(max_points * TA_CHART_CONTEXT_RATIO))
+    outside = lo + (n - hi)
+    before_budget = max(1, context_budget * lo // outside) if lo else 0
+    after_budget = max(1, context_budget - before_budget) if n - hi else 0
+
+    parts = []
+    if lo:
+        parts.append((slice(0, lo), before_budget))
+    parts.append((slice(lo, hi), max_points))
+    if n - hi:
+        parts.append((slice(hi, n), after_budget))
+    return parts
+
+
+def decimate_ohlcv(df: pd.DataFrame, max_points: int, visible_range=None) -> pd.DataFrame:
+    """
+    캔들/거래량용 OHLCV 축약
+
+    Args:
+        df: OHLCV DataFrame
+        max_points: 표시 구간에 허용할 최대 봉 개수
+        visible_range: (start, end) 표시 구간 (None이면 전체)
+
+    Returns:
+        DataFrame: 축약된 OHLCV
+    """
+    if len(df) <= max_points and visible_range is None:
+        return df
+
+    parts = [
+        aggregate_ohlcv(df.iloc[sl], budget)
+        for sl, budget in _split_budget(df.index, max_points, visible_range)
+    ]
+    return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+
+def decimate_line(series: pd.Series, max_points: int, visible_range=None) -> pd.Series:
+    """
+    라인 지표용 LTTB 축약 (표시 구간 우선)
+
+    Args:
+        series: 지표 시리즈
+        max_points: 표시 구간에 허용할 최대 포인트 수
+        visible_range: (start, end) 표시 구간 (None이면 전체)
+
+    Returns:
+        Series: 축약된 시리즈
+    """
+    if len(series) <= max_points and visible_range is None:
+        return series
+
+    parts = [
+        decimate_series(series.iloc[sl], budget)
+        for sl, budget in _split_budget(series.index, max_points, visible_range)
+    ]
+    return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+
+def decimate_band(upper: pd.Series, lower: pd.Series, max_points: int, visible_range=None) -> pd.DataFrame:
+    """
+    밴드 지표(상단/하단)용 LTTB 축약 (두 선이 같은 날짜를 갖도록 공통 인덱스 사용)
+
+    각 선을 예산의 절반으로 LTTB 축약한 뒤 고른 포인트의 합집합을 남긴다.
+    선마다 따로 축약하면 x가 달라져 fill='tonexty' 영역이 어긋난다.
+
+    Args:
+        upper: 상단 시리즈
+        lower: 하단 시리즈 (upper와 같은 인덱스)
+        max_points: 표시 구간에 허용할 최대 포인트 수
+        visible_range: (start, end) 표시 구간 (None이면 전체)
+
+    Returns:
+        DataFrame: 'upper', 'lower' 열 (NaN 행 제외, 같은 인덱스)
+    """
+    band = pd.DataFrame({'upper': upper, 'lower': lower}).dropna()
+    if len(band) <= max_points and visible_range is None:
+        return band
+
+    parts = []
+    for sl, budget in _split_budget(band.index, max_points, visible_range):
+        part = band.iloc[sl]
+        if len(part) <= budget:
+            parts.append(part)
+            continue
+        x = part.index.asi8
+        half = max(budget // 2, 1)
+        idx = np.union1d(
+            lttb_indices(x, part['upper'].to_numpy(), half),
+            lttb_indices(x, part['lower'].to_numpy(), half)
+        )
+        parts.append(part.iloc[idx])
+    return pd.concat(parts) if len(parts) > 1 else parts[0]
@@ -3,8 +3,11 @@
 import numpy as np
 
 from config import RISK_FREE_RATE, TRADING_DAYS_PER_YEAR
+from core.backtest import get_asset_columns
+from utils.instrumentation import timed
 
 
+@timed("metrics.calculate_metrics")
 def calculate_metrics(daily_ret_series, final_val, start_date, end_date):
     """
     투자 성과 지표 계산
@@ -36,3 +39,52 @@ def calculate_metrics(daily_ret_series, final_val, start_date, end_date):
     sharpe = (cagr - RISK_FREE_RATE) / volatility if volatility > 0 else 0
 
     return total_return, cagr, max_drawdown, volatility, sharpe
+
+
+def calculate_period_returns(daily_returns, freq):
+    """
+    기간별 누적 수익률 계산 (로그 수익률 합산 방식)
+
+    (1 + r)의 곱 대신 log1p(r)을 기간별로 groupby-sum 한 뒤 expm1로 되돌린다.
+    그룹마다 파이썬 함수를 호출하지 않으므로 resample().apply(lambda ...)보다 빠르다.
+
+    Args:
+        daily_returns: 일별 수익률 DataFrame (DatetimeIndex)
+        freq: 기간 단위 ('Y': 연간, 'Q': 분기, 'M': 월간)
+
+    Returns:
+        DataFrame: 기간별 수익률 (%) - 인덱스는 PeriodIndex
+    """
+    periods = daily_returns.index.to_period(freq)
+    log_sums = np.log1p(daily_returns).groupby(periods).sum()
+    return np.expm1(log_sums) * 100
+
+
+@timed("metrics.calculate_return_analytics")
+def calculate_return_analytics(result):
+    """
+    백테스트 결과의 수익률 분석 테이블 계산 (백테스트 실행 시 1회)
+
+    Args:
+        result: calculate_portfolio() 결과 DataFrame
+
+    Returns:
+        dict: {
+            'yearly', 'quarterly', 'monthly': 기간별 수익률 DataFrame (%, Portfolio + 자산),
+            'correlation': 자산 간 일별 수익률 상관계수 (자산 1개면 None),
+            'covariance': 자산 간 연환산 공분산 (자산 1개면 None)
+        }
+    """
+    asset_cols = get_asset_columns(result)
+    daily_rets_all = result[['Portfolio'] + asset_cols].pct_change().dropna()
+    asset_rets = daily_rets_all[asset_cols]
+
+    has_pairs = len(asset_cols) > 1
+
+    return {
+        'yearly': calculate_period_returns(daily_rets_all, 'Y'),
+        'quarterly': calculate_period_returns(daily_rets_all, 'Q'),
+        'monthly': calculate_period_returns(daily_rets_all, 'M'),
+        'correlation': asset_rets.corr() if has_pairs else None,
+        'covariance': asset_rets.cov() * TRADING_DAYS_PER_YEAR if has_pairs else None
+    }
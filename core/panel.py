@@ -0,0 +1,148 @@
+"""가격 패널 (날짜 x 티커 종가 행렬)
+
+fetch_data_robust()가 반환하고 calculate_portfolio()가 받는 내부 표현이다.
+float64 DataFrame 대신 연속된 float32 행렬 하나와 int64 날짜 배열(ns), 티커 목록만 보관해서
+같은 기간의 DataFrame보다 메모리를 절반 이하로 쓰고, 열 조회는 복사 없는 numpy 뷰로 처리한다.
+pandas 변환(to_frame, index)은 화면 표시 등 경계에서만 한다.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PRICE_DTYPE = np.float32
+
+
+class PricePanel:
+    """날짜 x 티커 종가 행렬 (읽기 전용으로 취급)"""
+
+    __slots__ = ('values', 'dates', 'tickers', '_positions')
+
+    def __init__(self, values: np.ndarray, dates: np.ndarray, tickers: Sequence[str]):
+        """
+        Args:
+            values: (날짜 수, 티커 수) 종가 행렬 (float32 C-contiguous로 변환)
+            dates: 날짜 배열 (datetime64[ns] 또는 int64 ns)
+            tickers: 열 순서대로 티커
+        """
+        dates = np.asarray(dates)
+        if dates.dtype != np.int64:
+            dates = dates.astype('datetime64[ns]').view('int64')
+        self.values = np.ascontiguousarray(values, dtype=PRICE_DTYPE)
+        self.dates = dates
+        self.tickers = tuple(tickers)
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+        if self.values.shape != (len(self.dates), len(self.tickers)):
+            raise ValueError(
+                f"Panel shape {self.values.shape} does not match {len(self.dates)} dates x {len(self.tickers)} tickers"
+            )
+
+    # ==================================================
+    # 생성 / 변환
+    # ==================================================
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "PricePanel":
+        """DatetimeIndex를 가진 종가 DataFrame에서 생성"""
+        return cls(df.to_numpy(dtype=PRICE_DTYPE), df.index.to_numpy(dtype='datetime64[ns]'), list(df.columns))
+
+    @classmethod
+    def from_series(cls, series_map: Dict[str, pd.Series]) -> Optional["PricePanel"]:
+        """
+        티커별 종가를 날짜 합집합으로 맞춰 생성 (앞 값으로 채운 뒤 빈 값이 남은 날짜는 제외)
+
+        Args:
+            series_map: {티커: 종가 Series}
+
+        Returns:
+            PricePanel or None: 남은 날짜가 없으면 빈 패널, 티커가 없으면 None
+        """
+        if not series_map:
+            return None
+
+        tickers = list(series_map)
+        all_dates = [series_map[t].index.to_numpy(dtype='datetime64[ns]').view('int64') for t in tickers]
+        # 대부분 같은 거래소 달력이라 다른 날짜 배열만 합침
+        dates = np.unique(all_dates[0])
+        for series_dates in all_dates[1:]:
+            if not np.array_equal(series_dates, dates):
+                dates = np.union1d(dates, series_dates)
+
+        # 열 단위로 채우므로 열 우선(F) 배열에 쓰고 생성자에서 행 우선으로 바꿈
+        values = np.full((len(dates), len(tickers)), np.nan, dtype=PRICE_DTYPE, order='F')
+        for j, (ticker, series_dates) in enumerate(zip(tickers, all_dates)):
+            column = series_map[ticker].to_numpy(dtype=PRICE_DTYPE)
+            if len(series_dates) == len(dates) and np.array_equal(series_dates, dates):
+                values[:, j] = column
+            else:
+                values[np.searchsorted(dates, series_dates), j] = column
+
+        # ffill: 열마다 마지막으로 값이 있던 행 번호를 누적 최대값으로 구해 그 행의 값을 가져옴
+        missing = np.isnan(values)
+        if missing.any():
+            rows = np.where(missing, 0, np.arange(len(dates), dtype=np.int32)[:, None])
+            np.maximum.accumulate(rows, axis=0, out=rows)
+            values = values[rows, np.arange(len(tickers))]
+            missing = np.isnan(values)
+
+        complete = ~missing.any(axis=1)
+        return cls(values[complete], dates[complete], tickers)
+
+    def to_frame(self, tickers: Iterable[str] = None) -> pd.DataFrame:
+        """pandas DataFrame으로 변환 (float32 유지, tickers로 열 제한 가능)"""
+        if tickers is None:
+            return pd.DataFrame(self.values, index=self.index, columns=list(self.tickers))
+        tickers = list(tickers)
+        return pd.DataFrame(self.take(tickers), index=self.index, columns=tickers)
+
+    # ==================================================
+    # 조회
+    # ==================================================
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates.view('datetime64[ns]'))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.tickers)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.dates.nbytes
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._positions
+
+    def get_loc(self, ticker: str) -> int:
+        """티커의 열 번호 (없으면 KeyError)"""
+        return self._positions[ticker]
+
+    def column(self, ticker: str) -> Optional[np.ndarray]:
+        """티커의 종가 열 (복사 없는 뷰, 없으면 None)"""
+        position = self._positions.get(ticker)
+        return None if position is None else self.values[:, position]
+
+    def take(self, tickers: Sequence[str]) -> np.ndarray:
+        """티커 순서대로 열을 모은 행렬 (복사본)"""
+        return self.values[:, [self._positions[t] for t in tickers]]
+
+    def with_values(self, values: np.ndarray) -> "PricePanel":
+        """같은 날짜/티커에 값만 바꾼 패널 (날짜 배열은 공유)"""
+        return PricePanel(values, self.dates, self.tickers)
+
+    def __repr__(self) -> str:
+        return f"PricePanel({len(self.dates)} dates x {len(self.tickers)} tickers, {self.nbytes / 1024:.1f} KB)"
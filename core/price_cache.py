@@ -0,0 +1,248 @@
+"""가격 데이터 캐시 (티커별 종가, 바이트 예산 LRU)
+
+fetch_data_robust()가 조회한 종가를 (티커 조합, 기간)이 아니라 티커 단위로 보관한다.
+포트폴리오 구성이나 기간이 달라도 같은 티커의 겹치는 구간은 다시 받지 않고,
+보관 구간의 앞/뒤만 벗어난 요청은 모자란 구간만 조회해 기존 데이터에 합친다.
+
+- 용량: 항목별 바이트(memory_usage(deep=True)) 합계가 PRICE_CACHE_MAX_MB를 넘으면 가장 오래 쓰지 않은 티커부터 제거
+- 만료: 오늘 이후까지 포함한 구간만 PRICE_CACHE_TTL초 뒤 만료되며, 만료 시 오늘 이전 데이터는 남기고 오늘 이후만 버림
+- 수정 종가 기준: 모자란 구간은 보관 데이터와 한 행이 겹치게 조회하고, 겹친 종가가 다르면(분할/배당으로 수정 종가가 바뀜)
+  기존 데이터와 합치지 않고 버림 (호출 측은 get()이 None이면 전체 구간을 다시 조회)
+- 통계: 적중/부분 적중/실패/제거/만료 횟수 (메트릭과 Admin Panel 표시용)
+- 종가는 PricePanel과 같은 float32로 보관
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import PRICE_CACHE_MAX_MB, PRICE_CACHE_TTL
+from core.panel import PRICE_DTYPE
+from utils.resource_telemetry import register_cache_provider
+
+# 겹친 행의 종가가 이 상대 오차 안이면 같은 수정 종가 기준으로 봄 (float32 보관 오차 허용)
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+class _Entry:
+    """티커 하나의 보관 구간 [start, end)와 종가"""
+
+    __slots__ = ('series', 'start', 'end', 'nbytes', 'expires_at')
+
+    def __init__(self, series: pd.Series, start: pd.Timestamp, end: pd.Timestamp, expires_at: Optional[float]):
+        self.series = series
+        self.start = start
+        self.end = end
+        self.nbytes = int(series.memory_usage(deep=True))
+        self.expires_at = expires_at
+
+
+def _to_day(value) -> pd.Timestamp:
+    """날짜(문자열/date/datetime)를 자정 Timestamp로"""
+    return pd.Timestamp(value).normalize()
+
+
+class PriceCache:
+    """티커별 종가 캐시 (바이트 예산 LRU, 스레드 안전)"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        """
+        Args:
+            max_bytes: 보관할 종가 데이터 최대 바이트
+            ttl: 오늘 이후를 포함한 구간의 유지 시간 (초)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    # ==================================================
+    # 조회
+    # ==================================================
+
+    def lookup(self, ticker: str, start_date, end_date) -> Tuple[Optional[pd.Series], Optional[Tuple[pd.Timestamp, pd.Timestamp]]]:
+        """
+        캐시 조회
+
+        Args:
+            ticker: 티커 심볼
+            start_date: 시작 날짜 (포함)
+            end_date: 종료 날짜 (미포함, yfinance history와 동일)
+
+        Returns:
+            tuple: (series, fetch_range)
+                - 적중: (요청 구간 종가, None)
+                - 부분 적중: (None, 모자란 구간 (start, end)) - 보관 데이터와 한 행이 겹치는 구간이며,
+                  조회 후 put()하면 get()으로 전체 구간을 얻음 (수정 종가 기준이 바뀌었으면 get()은 None)
+                - 실패: (None, 요청 구간 (start, end))
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+
+        with self._lock:
+            entry = self._get_entry(ticker)
+            if entry is not None:
+                if entry.start <= start and end <= entry.end:
+                    self._stats['hits'] += 1
+                    return self._slice(entry, start, end), None
+                # 앞이나 뒤 한쪽만 모자라면 그 구간만 조회 (수정 종가 기준 확인용으로 보관된 끝 행 하나를 겹침)
+                index = entry.series.index
+                if entry.start <= start < entry.end < end:
+                    self._stats['partial_hits'] += 1
+                    return None, (index[-1] if len(index) else entry.end, end)
+                if start < entry.start < end <= entry.end:
+                    self._stats['partial_hits'] += 1
+                    return None, (start, index[0] + pd.Timedelta(days=1) if len(index) else entry.start)
+
+            self._stats['misses'] += 1
+            return None, (start, end)
+
+    def get(self, ticker: str, start_date, end_date) -> Optional[pd.Series]:
+        """보관 구간이 요청 구간을 포함하면 해당 구간 종가 (통계에 반영하지 않음)"""
+        start, end = _to_day(start_date), _to_day(end_date)
+        with self._lock:
+            entry = self._get_entry(ticker)
+            if entry is None or not (entry.start <= start and end <= entry.end):
+                return None
+            return self._slice(entry, start, end)
+
+    def _get_entry(self, ticker: str) -> Optional[_Entry]:
+        """항목 조회 및 LRU 순서 갱신 (만료된 항목은 오늘 이전 구간만 남김, 락 안에서 호출)"""
+        entry = self._entries.get(ticker)
+        if entry is None:
+            return None
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._stats['expirations'] += 1
+            today = _to_day(pd.Timestamp.today())
+            self._remove(ticker)
+            if entry.start >= today:
+                return None
+            entry = _Entry(entry.series[entry.series.index < today], entry.start, today, None)
+            self._add(ticker, entry)
+
+        self._entries.move_to_end(ticker)
+        return entry
+
+    @staticmethod
+    def _slice(entry: _Entry, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        index = entry.series.index
+        return entry.series[(index >= start) & (index < end)].copy()
+
+    # ==================================================
+    # 저장
+    # ==================================================
+
+    def put(self, ticker: str, series: Optional[pd.Series], start_date, end_date):
+        """
+        조회 결과 저장 (기존 보관 구간과 겹치거나 맞닿으면 합침)
+
+        겹친 날짜의 종가가 기존 데이터와 다르면 수정 종가 기준이 바뀐 것이므로 합치지 않고
+        기존 데이터를 버린 뒤 이번 조회 구간만 보관한다.
+
+        Args:
+            ticker: 티커 심볼
+            series: [start_date, end_date) 구간을 조회한 종가 (데이터가 없었으면 빈 Series 또는 None)
+            start_date: 조회 시작 날짜
+            end_date: 조회 종료 날짜 (미포함)
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+        series = pd.Series(dtype=PRICE_DTYPE) if series is None else series.astype(PRICE_DTYPE)
+
+        with self._lock:
+            existing = self._entries.get(ticker)
+            if existing is not None and start <= existing.end and existing.start <= end and (
+                series.empty or self._same_basis(existing.series, series)
+            ):
+                merged = series.combine_first(existing.series) if not series.empty else existing.series
+                start, end = min(start, existing.start), max(end, existing.end)
+                series = merged
+            elif series.empty:
+                # 새 티커의 빈 결과는 잘못된 티커이거나 일시적 실패일 수 있어 보관하지 않음
+                return
+
+            entry = _Entry(series, start, end, self._expiry(end))
+            if existing is not None:
+                self._remove(ticker)
+            if entry.nbytes > self.max_bytes:
+                return
+            self._add(ticker, entry)
+            self._evict()
+
+    @staticmethod
+    def _same_basis(old: pd.Series, new: pd.Series) -> bool:
+        """겹친 날짜(오늘 이전)의 종가가 같으면 True (겹친 날짜가 없으면 확인할 수 없어 False)"""
+        common = old.index.intersection(new.index)
+        common = common[common < _to_day(pd.Timestamp.today())]
+        if common.empty:
+            return False
+        return bool(np.allclose(
+            new.loc[common].to_numpy(dtype=np.float64), old.loc[common].to_numpy(dtype=np.float64),
+            rtol=ADJUSTMENT_TOLERANCE, atol=0, equal_nan=True
+        ))
+
+    def _expiry(self, end: pd.Timestamp) -> Optional[float]:
+        """오늘 이후까지 포함한 구간은 당일 종가가 바뀌므로 TTL 적용"""
+        if end > _to_day(pd.Timestamp.today()):
+            return time.monotonic() + self.ttl
+        return None
+
+    def _add(self, ticker: str, entry: _Entry):
+        self._entries[ticker] = entry
+        self._bytes += entry.nbytes
+
+    def _remove(self, ticker: str):
+        entry = self._entries.pop(ticker)
+        self._bytes -= entry.nbytes
+
+    def _evict(self):
+        """바이트 예산을 넘으면 가장 오래 쓰지 않은 티커부터 제거 (락 안에서 호출)"""
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        """전체 비우기 (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ==================================================
+    # 통계
+    # ==================================================
+
+    def stats(self) -> Dict[str, int]:
+        """
+        캐시 통계
+
+        Returns:
+            dict: {'hits', 'partial_hits', 'misses', 'evictions', 'expirations', 'entries', 'bytes', 'max_bytes'}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+_price_cache = PriceCache(int(PRICE_CACHE_MAX_MB * 1024 * 1024), PRICE_CACHE_TTL)
+
+
+def get_price_cache() -> PriceCache:
+    """프로세스 전역 가격 데이터 캐시"""
+    return _price_cache
+
+
+def get_price_cache_stats() -> Dict[str, int]:
+    """프로세스 전역 가격 데이터 캐시 통계 (PriceCache.stats() 형식)"""
+    return _price_cache.stats()
+
+
+register_cache_provider("price_cache", lambda: {k: v for k, v in _price_cache.stats().items() if k in ('entries', 'bytes')})
@@ -1,11 +1,28 @@
+"""데이터베이스 연결 및 스키마 관리
+
+스키마는 MIGRATIONS에 버전 순서대로 정의하고, 적용된 버전은 schema_version 테이블에 기록한다.
+init_database()는 프로세스당 DB 경로별로 한 번만 마이그레이션과 관리자 계정 생성을 수행하므로
+Streamlit 재실행(rerun)마다 호출해도 비용이 없다.
+"""
+
 import sqlite3
 import os
+import json
+import threading
 from pathlib import Path
 
+_bootstrap_lock = threading.Lock()
+_initialized_paths = set()
+
+
+def get_db_path():
+    """데이터베이스 파일 경로 반환"""
+    return os.environ.get("DATABASE_PATH", "./data/portfolios.db")
+
 
 def get_db_connection():
     """SQLite 데이터베이스 연결 반환"""
-    db_path = os.environ.get("DATABASE_PATH", "./data/portfolios.db")
+    db_path = get_db_path()
 
     # 데이터베이스 디렉토리 생성
     db_dir = os.path.dirname(db_path)
@@ -21,11 +38,12 @@ def get_db_connection():
     return conn
 
 
-def init_database():
-    """데이터베이스 테이블 및 인덱스 생성"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# ==================================================
+# 스키마 마이그레이션
+# ==================================================
 
+def _migration_v1_initial_schema(cursor):
+    """v1: 기본 테이블 및 인덱스 (기존 DB와 호환되도록 IF NOT EXISTS 사용)"""
     # users 테이블 생성
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -82,27 +100,355 @@ def init_database():
     """)
 
     # 인덱스 생성
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_user_id ON watchlist(user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_notes_user_id ON stock_notes(user_id)")
+
+
+def _migration_v2_sessions(cursor):
+    """v2: 로그인 유지용 세션 토큰 테이블"""
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+
+
+def _migration_v3_portfolio_assets(cursor):
+    """
+    v3: portfolio_data(JSON 문자열)를 portfolio_assets 테이블로 정규화
+
+    기존 JSON을 읽어 자산 행으로 옮긴 뒤 portfolios 테이블을 portfolio_data 없이 재생성한다.
+    (SQLite 테이블 재생성 절차 - foreign_keys는 apply_migrations에서 꺼진 상태)
+    """
+    cursor.execute("SELECT portfolio_id, portfolio_data FROM portfolios")
+    asset_rows = []
+    for portfolio_id, portfolio_data in cursor.fetchall():
+        try:
+            assets = json.loads(portfolio_data) if portfolio_data else []
+        except (TypeError, ValueError):
+            assets = []
+        asset_rows.extend(
+            (portfolio_id, position) + portfolio_asset_to_row(asset)
+            for position, asset in enumerate(assets)
+            if isinstance(asset, dict) and asset.get('ticker')
+        )
 
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id)
+        CREATE TABLE portfolios_new (
+            portfolio_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            portfolio_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            UNIQUE(user_id, portfolio_name)
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO portfolios_new (portfolio_id, user_id, portfolio_name, created_at, updated_at)
+        SELECT portfolio_id, user_id, portfolio_name, created_at, updated_at FROM portfolios
     """)
+    cursor.execute("DROP TABLE portfolios")
+    cursor.execute("ALTER TABLE portfolios_new RENAME TO portfolios")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id)")
 
+    # 포트폴리오별로 모여 저장되도록 (portfolio_id, position)을 PK로 사용
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_watchlist_user_id ON watchlist(user_id)
+        CREATE TABLE IF NOT EXISTS portfolio_assets (
+            portfolio_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            ticker TEXT NOT NULL,
+            name TEXT,
+            weight REAL NOT NULL DEFAULT 0,
+            asset_type TEXT DEFAULT 'Stock',
+            currency TEXT DEFAULT 'USD',
+            PRIMARY KEY (portfolio_id, position),
+            FOREIGN KEY (portfolio_id) REFERENCES portfolios(portfolio_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
     """)
+    cursor.executemany("""
+        INSERT INTO portfolio_assets (portfolio_id, position, ticker, name, weight, asset_type, currency)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, asset_rows)
+
+
+def _migration_v4_stats(cursor):
+    """
+    v4: 관리자 통계용 인덱스와 집계 테이블
+
+    - stats_counters: 테이블별 행 수 / 데이터를 가진 사용자 수 (COUNT(*) 대신 PK 조회)
+    - ticker_stats: 관심종목/전략에 담긴 종목별 횟수 (GROUP BY 대신 인덱스 순서 조회)
+    두 테이블은 트리거로 쓰기 시점에 갱신되며, 여기서는 기존 데이터로 한 번 채운다.
+    """
+    # 최근 가입/로그인/수정 조회 및 종목별 조회용 인덱스
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_last_login ON users(last_login)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolios_updated_at ON portfolios(updated_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_notes_updated_at ON stock_notes(updated_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_ticker ON watchlist(ticker, name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_assets_ticker ON portfolio_assets(ticker, weight)")
 
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_stock_notes_user_id ON stock_notes(user_id)
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
     """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ticker_stats (
+            source TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            name TEXT,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            weight_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, ticker)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticker_stats_rank ON ticker_stats(source, ref_count DESC, ticker)")
 
-    conn.commit()
-    conn.close()
+    # users: 전체 / 관리자 수
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_users_insert AFTER INSERT ON users
+        BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE key = 'users';
+            UPDATE stats_counters SET value = value + 1 WHERE key = 'admins' AND NEW.is_admin;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_users_delete AFTER DELETE ON users
+        BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE key = 'users';
+            UPDATE stats_counters SET value = value - 1 WHERE key = 'admins' AND OLD.is_admin;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stats_users_admin AFTER UPDATE OF is_admin ON users
+        WHEN (NEW.is_admin != 0) != (OLD.is_admin != 0)
+        BEGIN
+            UPDATE stats_counters SET value = value + (CASE WHEN NEW.is_admin THEN 1 ELSE -1 END)
+            WHERE key = 'admins';
+        END
+    """)
 
-    # 관리자 계정 생성
-    create_admin_user()
+    # 사용자 소유 테이블: 행 수 / 데이터를 가진 사용자 수 (사용자 삭제 시 CASCADE 삭제에도 동작)
+    for table, pk, owners in (
+        ("portfolios", "portfolio_id", "portfolio_owners"),
+        ("watchlist", "watchlist_id", "watchlist_owners"),
+        ("stock_notes", "note_id", "stock_notes_owners"),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_stats_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE stats_counters SET value = value + 1 WHERE key = '{table}';
+                UPDATE stats_counters SET value = value + 1 WHERE key = '{owners}'
+                    AND NOT EXISTS (SELECT 1 FROM {table} WHERE user_id = NEW.user_id AND {pk} != NEW.{pk});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_stats_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE stats_counters SET value = value - 1 WHERE key = '{table}';
+                UPDATE stats_counters SET value = value - 1 WHERE key = '{owners}'
+                    AND NOT EXISTS (SELECT 1 FROM {table} WHERE user_id = OLD.user_id);
+            END
+        """)
+
+    # 종목별 집계 (portfolio_assets는 저장 시 삭제 후 재삽입되므로 개수/비중은 INSERT/DELETE만 처리,
+    # 가져오기의 ON CONFLICT DO UPDATE로 바뀌는 이름은 UPDATE 트리거로 반영)
+    for table, source, weight in (
+        ("watchlist", "watchlist", "0"),
+        ("portfolio_assets", "portfolio", "NEW.weight"),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticker_stats_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO ticker_stats (source, ticker, name, ref_count, weight_sum)
+                VALUES ('{source}', NEW.ticker, NEW.name, 1, {weight})
+                ON CONFLICT (source, ticker) DO UPDATE SET
+                    ref_count = ref_count + 1,
+                    weight_sum = weight_sum + excluded.weight_sum,
+                    name = COALESCE(NULLIF(excluded.name, ''), name);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticker_stats_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE ticker_stats
+                SET ref_count = ref_count - 1, weight_sum = weight_sum - {weight.replace('NEW.', 'OLD.')}
+                WHERE source = '{source}' AND ticker = OLD.ticker;
+                DELETE FROM ticker_stats
+                WHERE source = '{source}' AND ticker = OLD.ticker AND ref_count <= 0;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticker_stats_{table}_name AFTER UPDATE OF name ON {table}
+            WHEN COALESCE(NEW.name, '') != '' AND NEW.name IS NOT OLD.name
+            BEGIN
+                UPDATE ticker_stats SET name = NEW.name
+                WHERE source = '{source}' AND ticker = NEW.ticker;
+            END
+        """)
+
+    # 기존 데이터로 초기값 채우기
+    cursor.execute("DELETE FROM stats_counters")
+    cursor.execute("""
+        INSERT INTO stats_counters (key, value)
+        SELECT 'users', COUNT(*) FROM users
+        UNION ALL SELECT 'admins', COUNT(*) FROM users WHERE is_admin
+        UNION ALL SELECT 'portfolios', COUNT(*) FROM portfolios
+        UNION ALL SELECT 'portfolio_owners', COUNT(DISTINCT user_id) FROM portfolios
+        UNION ALL SELECT 'watchlist', COUNT(*) FROM watchlist
+        UNION ALL SELECT 'watchlist_owners', COUNT(DISTINCT user_id) FROM watchlist
+        UNION ALL SELECT 'stock_notes', COUNT(*) FROM stock_notes
+        UNION ALL SELECT 'stock_notes_owners', COUNT(DISTINCT user_id) FROM stock_notes
+    """)
+    cursor.execute("DELETE FROM ticker_stats")
+    cursor.execute("""
+        INSERT INTO ticker_stats (source, ticker, name, ref_count, weight_sum)
+        SELECT 'watchlist', ticker, MAX(name), COUNT(*), 0 FROM watchlist GROUP BY ticker
+        UNION ALL
+        SELECT 'portfolio', ticker, MAX(name), COUNT(*), SUM(weight) FROM portfolio_assets GROUP BY ticker
+    """)
+
+
+def portfolio_asset_to_row(asset: dict) -> tuple:
+    """포트폴리오 자산 dict -> portfolio_assets 컬럼 값 (ticker, name, weight, asset_type, currency)"""
+    try:
+        weight = float(asset.get('weight') or 0)
+    except (TypeError, ValueError):
+        weight = 0.0
+    return (
+        asset['ticker'],
+        asset.get('name'),
+        weight,
+        asset.get('type') or 'Stock',
+        asset.get('currency') or 'USD'
+    )
+
+
+# (버전, 설명, 적용 함수) - 새 스키마 변경은 끝에 추가하고 기존 항목은 수정하지 않는다
+MIGRATIONS = [
+    (1, "initial schema", _migration_v1_initial_schema),
+    (2, "sessions", _migration_v2_sessions),
+    (3, "portfolio_assets", _migration_v3_portfolio_assets),
+    (4, "stats", _migration_v4_stats),
+]
+
+
+def get_schema_version(conn) -> int:
+    """현재 적용된 스키마 버전 (schema_version 테이블이 없으면 0)"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not row:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def apply_migrations(conn) -> list:
+    """
+    미적용 마이그레이션을 버전 순서대로 적용
+
+    각 마이그레이션은 BEGIN IMMEDIATE 트랜잭션 안에서 실행되므로 여러 프로세스가 동시에
+    시작해도 한 곳에서만 적용되고, 실패하면 해당 버전 전체가 롤백된다.
+    테이블 재생성이 가능하도록 적용 중에는 foreign_keys를 끄고, 커밋 전에
+    foreign_key_check로 이번 마이그레이션이 만든 참조 오류가 없는지 확인한다.
+
+    Args:
+        conn: DB 연결
+
+    Returns:
+        list: 이번에 적용된 버전 목록
+    """
+    applied = []
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None  # 트랜잭션을 직접 관리
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        pending = [m for m in MIGRATIONS if m[0] > get_schema_version(conn)]
+        if not pending:
+            return applied
+
+        # PRAGMA foreign_keys는 트랜잭션 밖에서만 바꿀 수 있다
+        conn.execute("PRAGMA foreign_keys = OFF")
+
+        for version, description, migrate in pending:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 잠금을 잡은 뒤 다시 확인 (다른 프로세스가 먼저 적용했을 수 있음)
+                if get_schema_version(conn) >= version:
+                    conn.execute("COMMIT")
+                    continue
+                # 마이그레이션 전부터 있던 위반(과거 데이터)은 제외하고 새로 생긴 위반만 실패 처리
+                existing_violations = {tuple(row) for row in conn.execute("PRAGMA foreign_key_check")}
+                migrate(conn.cursor())
+                violations = [
+                    row for row in conn.execute("PRAGMA foreign_key_check")
+                    if tuple(row) not in existing_violations
+                ]
+                if violations:
+                    raise sqlite3.IntegrityError(
+                        f"schema v{version}: foreign key violations in {sorted({row[0] for row in violations})}"
+                    )
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                conn.execute("COMMIT")
+                applied.append(version)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.isolation_level = previous_isolation
+
+    return applied
+
+
+def init_database(force: bool = False):
+    """
+    스키마 부트스트랩 (프로세스당 DB 경로별 1회)
+
+    마이그레이션 적용과 관리자 계정 생성은 처음 호출될 때만 수행하고,
+    이후 호출(스크립트 재실행)은 바로 반환한다.
+
+    Args:
+        force: True면 이미 초기화된 경로라도 다시 수행 (복원 등으로 DB 파일이 바뀐 경우)
+    """
+    db_key = os.path.abspath(get_db_path())
+    if not force and db_key in _initialized_paths:
+        return
+
+    with _bootstrap_lock:
+        if not force and db_key in _initialized_paths:
+            return
+
+        conn = get_db_connection()
+        try:
+            apply_migrations(conn)
+        finally:
+            conn.close()
+
+        # 관리자 계정 생성
+        create_admin_user()
+
+        _initialized_paths.add(db_key)
 
 
 def create_admin_user():
@@ -1,32 +1,57 @@
 """데이터베이스 모델 및 쿼리 함수"""
 
 import sqlite3
+import json
+import atexit
+import threading
+from itertools import groupby
+from datetime import datetime, timezone
 from contextlib import contextmanager
-from db.database import get_db_connection
+from db.database import get_db_connection, portfolio_asset_to_row
+from config import LAST_LOGIN_FLUSH_INTERVAL, EXPORT_FETCH_SIZE
+from utils.instrumentation import span
 
 
 @contextmanager
 def db_transaction():
     """데이터베이스 트랜잭션 컨텍스트 매니저"""
-    conn = get_db_connection()
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    with span("db.transaction"):
+        conn = get_db_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
 
 @contextmanager
 def db_query():
     """데이터베이스 조회용 컨텍스트 매니저"""
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
+    with span("db.query"):
+        conn = get_db_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def db_iter(sql, params=(), batch_size=EXPORT_FETCH_SIZE):
+    """
+    조회 결과를 fetchmany로 batch_size개씩 읽어 한 행씩 반환하는 제너레이터
+
+    전체 결과를 메모리에 올리지 않으므로 내보내기처럼 행이 많은 조회에 사용한다.
+    (연결은 제너레이터가 끝나거나 닫힐 때 반환된다)
+    """
+    with db_query() as conn:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
 
 
 # ==================================================
@@ -101,16 +126,64 @@ def get_all_users():
         return [dict(row) for row in cursor.fetchall()]
 
 
+_last_login_lock = threading.Lock()
+_pending_last_logins = {}  # {user_id: 'YYYY-MM-DD HH:MM:SS' (UTC, CURRENT_TIMESTAMP 형식)}
+_last_login_timer = None
+
+
 def update_last_login(user_id):
-    """마지막 로그인 시간 업데이트"""
-    with db_transaction() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE users
-            SET last_login = CURRENT_TIMESTAMP
-            WHERE user_id = ?
-        """, (user_id,))
-        return cursor.rowcount > 0
+    """
+    마지막 로그인 시간 업데이트 (일괄 기록)
+
+    로그인마다 커밋하지 않고 메모리에 모았다가 LAST_LOGIN_FLUSH_INTERVAL초 뒤
+    한 번의 트랜잭션으로 기록한다. 프로세스 종료 시에도 남은 값을 기록한다.
+    """
+    global _last_login_timer
+
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    with _last_login_lock:
+        _pending_last_logins[user_id] = timestamp
+        if _last_login_timer is None:
+            _last_login_timer = threading.Timer(LAST_LOGIN_FLUSH_INTERVAL, flush_last_logins)
+            _last_login_timer.daemon = True
+            _last_login_timer.start()
+    return True
+
+
+def flush_last_logins():
+    """
+    대기 중인 마지막 로그인 시간을 DB에 기록
+
+    Returns:
+        int: 기록한 사용자 수
+    """
+    global _last_login_timer
+
+    with _last_login_lock:
+        pending = list(_pending_last_logins.items())
+        _pending_last_logins.clear()
+        _last_login_timer = None
+
+    if not pending:
+        return 0
+
+    try:
+        with db_transaction() as conn:
+            conn.executemany("""
+                UPDATE users
+                SET last_login = ?
+                WHERE user_id = ?
+            """, [(timestamp, user_id) for user_id, timestamp in pending])
+    except sqlite3.Error:
+        # 기록 실패 시 다음 로그인 때 다시 시도 (그 사이 더 최근 값이 들어왔으면 그 값 유지)
+        with _last_login_lock:
+            for user_id, timestamp in pending:
+                _pending_last_logins.setdefault(user_id, timestamp)
+        return 0
+    return len(pending)
+
+
+atexit.register(flush_last_logins)
 
 
 def update_password(user_id, new_password_hash):
@@ -125,12 +198,103 @@ def update_password(user_id, new_password_hash):
         return cursor.rowcount > 0
 
 
+# ==================================================
+# Session 관련 함수
+# ==================================================
+
+def create_session(session_id, user_id, expires_at):
+    """
+    로그인 세션 생성
+
+    Args:
+        session_id: 세션 ID (토큰의 식별 부분)
+        user_id: 사용자 ID
+        expires_at: 만료 시각 (Unix time)
+    """
+    with db_transaction() as conn:
+        conn.execute("""
+            INSERT INTO sessions (session_id, user_id, expires_at)
+            VALUES (?, ?, ?)
+        """, (session_id, user_id, expires_at))
+
+
+def get_session_user(session_id):
+    """
+    세션 ID로 사용자 조회 (PK 조회 1회)
+
+    Returns:
+        dict or None: user_id, username, is_admin, expires_at
+    """
+    with db_query() as conn:
+        row = conn.execute("""
+            SELECT u.user_id, u.username, u.is_admin, s.expires_at
+            FROM sessions s
+            JOIN users u ON s.user_id = u.user_id
+            WHERE s.session_id = ?
+        """, (session_id,)).fetchone()
+        return dict(row) if row else None
+
+
+def delete_session(session_id):
+    """세션 삭제 (로그아웃)"""
+    with db_transaction() as conn:
+        cursor = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+
+def delete_user_sessions(user_id):
+    """
+    사용자의 모든 세션 삭제 (비밀번호 변경 시 다른 기기 로그인 해제)
+
+    Returns:
+        int: 삭제된 세션 수
+    """
+    with db_transaction() as conn:
+        cursor = conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+        return cursor.rowcount
+
+
+def delete_expired_sessions(now):
+    """
+    만료된 세션 정리
+
+    Args:
+        now: 기준 시각 (Unix time)
+
+    Returns:
+        int: 삭제된 세션 수
+    """
+    with db_transaction() as conn:
+        cursor = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        return cursor.rowcount
+
+
 # ==================================================
 # Portfolio 관련 함수
 # ==================================================
 
 def save_portfolio(user_id, portfolio_name, portfolio_data):
-    """포트폴리오 저장 (없으면 INSERT, 있으면 UPDATE)"""
+    """
+    포트폴리오 저장 (없으면 INSERT, 있으면 UPDATE)
+
+    Args:
+        user_id: 사용자 ID
+        portfolio_name: 포트폴리오 이름
+        portfolio_data: 자산 리스트 [{'ticker', 'name', 'weight', 'type', 'currency'}, ...]
+                        (이전 형식인 JSON 문자열도 허용)
+
+    Returns:
+        int: portfolio_id
+    """
+    if isinstance(portfolio_data, str):
+        portfolio_data = json.loads(portfolio_data)
+
+    asset_rows = [
+        portfolio_asset_to_row(asset)
+        for asset in portfolio_data
+        if isinstance(asset, dict) and asset.get('ticker')
+    ]
+
     with db_transaction() as conn:
         cursor = conn.cursor()
 
@@ -143,28 +307,47 @@ def save_portfolio(user_id, portfolio_name, portfolio_data):
         existing = cursor.fetchone()
 
         if existing:
-            # UPDATE
+            # UPDATE (자산 목록은 통째로 교체)
+            portfolio_id = existing['portfolio_id']
             cursor.execute("""
                 UPDATE portfolios
-                SET portfolio_data = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE user_id = ? AND portfolio_name = ?
-            """, (portfolio_data, user_id, portfolio_name))
-            return existing['portfolio_id']
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE portfolio_id = ?
+            """, (portfolio_id,))
+            cursor.execute("DELETE FROM portfolio_assets WHERE portfolio_id = ?", (portfolio_id,))
         else:
             # INSERT
             cursor.execute("""
-                INSERT INTO portfolios (user_id, portfolio_name, portfolio_data)
-                VALUES (?, ?, ?)
-            """, (user_id, portfolio_name, portfolio_data))
-            return cursor.lastrowid
+                INSERT INTO portfolios (user_id, portfolio_name)
+                VALUES (?, ?)
+            """, (user_id, portfolio_name))
+            portfolio_id = cursor.lastrowid
+
+        cursor.executemany("""
+            INSERT INTO portfolio_assets (portfolio_id, position, ticker, name, weight, asset_type, currency)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(portfolio_id, position) + row for position, row in enumerate(asset_rows)])
+
+        return portfolio_id
+
+
+def _row_to_asset(row):
+    """portfolio_assets 행 -> 앱에서 쓰는 자산 dict"""
+    return {
+        'ticker': row['ticker'],
+        'name': row['name'],
+        'weight': row['weight'],
+        'type': row['asset_type'],
+        'currency': row['currency']
+    }
 
 
 def get_user_portfolios(user_id):
-    """사용자의 모든 포트폴리오 조회"""
+    """사용자의 모든 포트폴리오 목록 조회 (자산 제외, 최근 수정 순)"""
     with db_query() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT portfolio_id, portfolio_name, portfolio_data, created_at, updated_at
+            SELECT portfolio_id, portfolio_name, created_at, updated_at
             FROM portfolios
             WHERE user_id = ?
             ORDER BY updated_at DESC
@@ -172,17 +355,46 @@ def get_user_portfolios(user_id):
         return [dict(row) for row in cursor.fetchall()]
 
 
+def get_user_portfolio_names(user_id):
+    """사용자의 포트폴리오 이름 목록 (최근 수정 순)"""
+    with db_query() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT portfolio_name
+            FROM portfolios
+            WHERE user_id = ?
+            ORDER BY updated_at DESC
+        """, (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+
 def get_portfolio(user_id, portfolio_name):
-    """특정 포트폴리오 조회"""
+    """
+    특정 포트폴리오 조회 (자산 포함)
+
+    Returns:
+        dict or None: portfolio_id, portfolio_name, created_at, updated_at, assets
+    """
     with db_query() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT portfolio_id, portfolio_name, portfolio_data, created_at, updated_at
+            SELECT portfolio_id, portfolio_name, created_at, updated_at
             FROM portfolios
             WHERE user_id = ? AND portfolio_name = ?
         """, (user_id, portfolio_name))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        if not row:
+            return None
+
+        portfolio = dict(row)
+        cursor.execute("""
+            SELECT ticker, name, weight, asset_type, currency
+            FROM portfolio_assets
+            WHERE portfolio_id = ?
+            ORDER BY position
+        """, (portfolio['portfolio_id'],))
+        portfolio['assets'] = [_row_to_asset(asset) for asset in cursor.fetchall()]
+        return portfolio
 
 
 def delete_portfolio(user_id=None, portfolio_name=None, portfolio_id=None):
@@ -232,6 +444,40 @@ def get_all_portfolios():
         return [dict(row) for row in cursor.fetchall()]
 
 
+def iter_all_portfolios_with_data():
+    """
+    모든 포트폴리오와 자산 목록을 한 건씩 반환 (내보내기용 제너레이터)
+
+    자산은 이전 내보내기 형식과 같도록 portfolio_data(JSON 문자열)로 다시 만든다.
+    포트폴리오와 자산을 한 번의 정렬된 조회로 읽으므로 메모리에는 포트폴리오 하나만 유지된다.
+
+    Yields:
+        dict: {'username', 'portfolio_name', 'portfolio_data', 'created_at', 'updated_at'}
+              (username, portfolio_name 순)
+    """
+    rows = db_iter("""
+        SELECT p.portfolio_id, u.username, p.portfolio_name, p.created_at, p.updated_at,
+               pa.ticker, pa.name, pa.weight, pa.asset_type, pa.currency
+        FROM portfolios p
+        JOIN users u ON p.user_id = u.user_id
+        LEFT JOIN portfolio_assets pa ON pa.portfolio_id = p.portfolio_id
+        ORDER BY u.username, p.portfolio_name, p.portfolio_id, pa.position
+    """)
+    for _, group in groupby(rows, key=lambda row: row['portfolio_id']):
+        group = list(group)
+        first = group[0]
+        yield {
+            'username': first['username'],
+            'portfolio_name': first['portfolio_name'],
+            'portfolio_data': json.dumps(
+                [_row_to_asset(row) for row in group if row['ticker'] is not None],
+                ensure_ascii=False
+            ),
+            'created_at': first['created_at'],
+            'updated_at': first['updated_at']
+        }
+
+
 # ==================================================
 # Watchlist 관련 함수
 # ==================================================
@@ -1,14 +1,19 @@
+import io
+import pandas as pd
 import streamlit as st
+from functools import partial
 from datetime import datetime
 from db.models import get_all_users, get_all_portfolios, delete_user, delete_portfolio_by_id
 from utils.backup_manager import (
-    create_backup, list_backups, restore_backup, delete_backup,
-    save_uploaded_backup, format_file_size
+    list_backups, restore_backup, delete_backup,
+    save_uploaded_backup, format_file_size,
+    start_backup_job, get_backup_job, BACKUP_PHASE_LABELS
 )
+from utils.backup_store import read_snapshot_bytes
+from utils.backup_catalog import STATUS_OK, STATUS_VERIFYING, STATUS_INVALID
+from utils.backup_scheduler import get_scheduler_status
 from utils.system_monitor import (
-    get_database_stats, get_user_stats, get_portfolio_stats,
-    get_watchlist_stats, get_stock_notes_stats, get_backup_stats,
-    format_bytes
+    get_dashboard_stats, get_backup_stats, invalidate_stats_cache, format_bytes
 )
 from utils.data_exporter import (
     export_portfolios_to_csv, export_portfolios_to_json,
@@ -17,6 +22,12 @@ from utils.data_exporter import (
     import_portfolios_from_csv, import_watchlist_from_csv,
     import_stock_notes_from_csv, validate_csv_format
 )
+from utils.instrumentation import (
+    get_histograms, get_counters, get_session_id, get_session_count,
+    reset_metrics, summarize_histograms
+)
+from utils.resource_telemetry import get_resource_history, get_latest_sample, record_sample
+from core.price_cache import get_price_cache_stats
 
 
 def render_admin_panel():
@@ -31,7 +42,8 @@ def render_admin_panel():
         "백업 및 복원",
         "데이터 관리",
         "사용자 관리",
-        "전략 관리"
+        "전략 관리",
+        "성능"
     ])
 
     # 각 탭 렌더링
@@ -50,6 +62,9 @@ def render_admin_panel():
     with tabs[4]:
         render_portfolio_management()
 
+    with tabs[5]:
+        render_performance()
+
 
 # ==================================================
 # 대시보드
@@ -60,12 +75,13 @@ def render_dashboard():
 
     st.markdown("### 시스템 개요")
 
-    # 통계 수집
-    db_stats = get_database_stats()
-    user_stats = get_user_stats()
-    portfolio_stats = get_portfolio_stats()
-    watchlist_stats = get_watchlist_stats()
-    notes_stats = get_stock_notes_stats()
+    # 통계 수집 (DB 조회 1회)
+    stats = get_dashboard_stats()
+    db_stats = stats['database']
+    user_stats = stats['users']
+    portfolio_stats = stats['portfolios']
+    watchlist_stats = stats['watchlist']
+    notes_stats = stats['stock_notes']
     backup_stats = get_backup_stats()
 
     # 주요 지표 카드 (4열)
@@ -134,11 +150,80 @@ def render_dashboard():
         else:
             st.markdown(f"- **최근 수정 전략**: 없음")
 
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if portfolio_stats['popular_tickers']:
+            st.markdown("#### 전략에 많이 담긴 종목")
+            st.dataframe(
+                [
+                    {
+                        '종목': t['ticker'],
+                        '이름': t['name'] or '',
+                        '전략 수': t['count'],
+                        '평균 비중 (%)': round(t['avg_weight'], 1)
+                    }
+                    for t in portfolio_stats['popular_tickers']
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+    with col2:
+        if watchlist_stats['popular_tickers']:
+            st.markdown("#### 관심종목에 많이 담긴 종목")
+            st.dataframe(
+                [
+                    {
+                        '종목': t['ticker'],
+                        '이름': t['name'] or '',
+                        '사용자 수': t['count']
+                    }
+                    for t in watchlist_stats['popular_tickers']
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
 
 # ==================================================
 # 백업 및 복원
 # ==================================================
 
+@st.fragment(run_every=1.0)
+def render_backup_job_status():
+    """백그라운드 백업 진행률 (1초마다 갱신, 끝나면 전체 화면을 다시 그려 목록 갱신)
+
+    결과 메시지는 이 세션에서 시작한 작업만 표시한다 (자동 백업/다른 관리자의 작업은 목록만 갱신).
+    """
+    job = get_backup_job()
+    if job is None:
+        return
+
+    if job['status'] == 'running':
+        ratio = min(job['done'] / job['total'], 1.0) if job['total'] else 0.0
+        label = BACKUP_PHASE_LABELS.get(job['phase'], job['phase'])
+        st.progress(ratio, text=f"백업 {label} ({ratio:.0%})")
+        return
+
+    if job['job_id'] == st.session_state.get('backup_job_started'):
+        del st.session_state['backup_job_started']
+        st.session_state['backup_job_result'] = {
+            'success': job['status'] == 'done',
+            'message': job['message']
+        }
+    st.rerun(scope="app")
+
+
+@st.fragment(run_every=2.0)
+def render_backup_verification_status():
+    """업로드 백업 무결성 검사 진행 표시 (모두 끝나면 전체 화면을 다시 그려 상태 갱신)"""
+    verifying = [backup['filename'] for backup in list_backups() if backup['status'] == STATUS_VERIFYING]
+    if not verifying:
+        st.rerun(scope="app")
+    st.caption(f"업로드한 백업 {len(verifying)}개의 무결성 검사가 진행 중입니다. 검사가 끝나면 복원할 수 있습니다.")
+
+
 def render_backup_section():
     """백업 및 복원 섹션"""
 
@@ -148,13 +233,34 @@ def render_backup_section():
     col1, col2 = st.columns([1, 3])
     with col1:
         if st.button("지금 백업 생성", type="primary", use_container_width=True):
-            with st.spinner("백업 생성 중..."):
-                result = create_backup()
-                if result['success']:
-                    st.success(result['message'])
-                    st.rerun()
-                else:
-                    st.error(result['message'])
+            result = start_backup_job()
+            if result['success']:
+                st.session_state['backup_job_started'] = result['job']['job_id']
+            else:
+                st.warning(result['message'])
+    with col2:
+        schedule = get_scheduler_status()
+        policy = schedule['policy']
+        schedule_text = f"자동 백업: {schedule['label']}"
+        if schedule['next_run']:
+            schedule_text += f" · 다음 예정 {schedule['next_run']:%Y-%m-%d %H:%M}"
+            schedule_text += (
+                f" · 보관: 시간별 {policy['hourly']} / 일별 {policy['daily']} / "
+                f"주별 {policy['weekly']} / 월별 {policy['monthly']}"
+            )
+        st.caption(schedule_text)
+
+    # 백그라운드 백업 진행 상황 (진행 중이거나 이 세션에서 시작한 작업의 결과를 아직 표시하지 않은 경우만 폴링)
+    job = get_backup_job()
+    if job and (job['status'] == 'running' or job['job_id'] == st.session_state.get('backup_job_started')):
+        render_backup_job_status()
+
+    job_result = st.session_state.pop('backup_job_result', None)
+    if job_result:
+        if job_result['success']:
+            st.success(job_result['message'])
+        else:
+            st.error(job_result['message'])
 
     st.markdown("---")
 
@@ -168,6 +274,10 @@ def render_backup_section():
     else:
         st.markdown(f"**총 {len(backups)}개의 백업 파일**")
 
+        # 업로드한 백업의 백그라운드 무결성 검사가 끝나면 목록 갱신
+        if any(backup['status'] == STATUS_VERIFYING for backup in backups):
+            render_backup_verification_status()
+
         # 테이블 헤더
         header_cols = st.columns([3, 2, 1, 1, 1, 1])
         with header_cols[0]:
@@ -190,7 +300,12 @@ def render_backup_section():
             cols = st.columns([3, 2, 1, 1, 1, 1])
 
             with cols[0]:
-                st.text(backup['filename'])
+                if backup['status'] == STATUS_VERIFYING:
+                    st.text(f"{backup['filename']} (검사 중)")
+                elif backup['status'] == STATUS_INVALID:
+                    st.text(f"{backup['filename']} (손상됨)")
+                else:
+                    st.text(backup['filename'])
 
             with cols[1]:
                 st.text(backup['created_at'].strftime('%Y-%m-%d %H:%M'))
@@ -200,19 +315,31 @@ def render_backup_section():
 
             with cols[3]:
                 # 다운로드 버튼
-                with open(backup['filepath'], 'rb') as f:
+                if backup['kind'] == 'snapshot':
+                    # 스냅샷은 클릭했을 때 청크를 모아 .db 파일로 만든다
                     st.download_button(
                         label="⬇",
-                        data=f.read(),
-                        file_name=backup['filename'],
+                        data=partial(read_snapshot_bytes, backup['filename']),
+                        file_name=backup['filename'].replace(".snap", ".db"),
                         mime="application/octet-stream",
                         key=f"download_{backup['filename']}",
                         use_container_width=True
                     )
+                else:
+                    with open(backup['filepath'], 'rb') as f:
+                        st.download_button(
+                            label="⬇",
+                            data=f.read(),
+                            file_name=backup['filename'],
+                            mime="application/octet-stream",
+                            key=f"download_{backup['filename']}",
+                            use_container_width=True
+                        )
 
             with cols[4]:
                 # 복원 버튼
-                if st.button("♻", key=f"restore_{backup['filename']}", use_container_width=True):
+                if st.button("♻", key=f"restore_{backup['filename']}", use_container_width=True,
+                             disabled=backup['status'] != STATUS_OK):
                     # 확인 대화상자
                     st.session_state[f'confirm_restore_{backup["filename"]}'] = True
 
@@ -341,23 +468,24 @@ def render_data_export():
             if result and result['success']:
                 st.success(result['message'])
 
-                # 다운로드 버튼
-                if export_type == "전체 데이터 (ZIP)":
-                    st.download_button(
-                        label="ZIP 파일 다운로드",
-                        data=result['data'],
-                        file_name=result['filename'],
-                        mime="application/zip",
-                        key='download_zip'
-                    )
-                else:
-                    st.download_button(
-                        label="파일 다운로드",
-                        data=result['data'],
-                        file_name=result['filename'],
-                        mime="text/csv" if export_type.endswith("CSV)") else "application/json",
-                        key='download_export'
-                    )
+                # 다운로드 버튼 (임시 파일을 그대로 전달)
+                with open(result['filepath'], 'rb') as export_file:
+                    if export_type == "전체 데이터 (ZIP)":
+                        st.download_button(
+                            label="ZIP 파일 다운로드",
+                            data=export_file,
+                            file_name=result['filename'],
+                            mime="application/zip",
+                            key='download_zip'
+                        )
+                    else:
+                        st.download_button(
+                            label="파일 다운로드",
+                            data=export_file,
+                            file_name=result['filename'],
+                            mime="text/csv" if export_type.endswith("CSV)") else "application/json",
+                            key='download_export'
+                        )
             else:
                 st.error(result['message'] if result else "내보내기 실패")
 
@@ -400,10 +528,10 @@ def render_data_import():
     if uploaded_file:
         if st.button("가져오기", type="primary", use_container_width=True, key='import_btn'):
             with st.spinner("가져오는 중..."):
+                # CSV 데이터 읽기 (문자열로 복사하지 않고 행 단위로 읽음)
+                uploaded_file.seek(0)
+                csv_data = io.TextIOWrapper(uploaded_file, encoding='utf-8', newline='')
                 try:
-                    # CSV 데이터 읽기
-                    csv_data = uploaded_file.getvalue().decode('utf-8')
-
                     result = None
 
                     if import_type == "포트폴리오 (CSV)":
@@ -430,12 +558,16 @@ def render_data_import():
 
                     if result:
                         if result['success']:
+                            invalidate_stats_cache()
                             st.success(result['message'])
                         else:
                             st.error(result['message'])
 
                 except Exception as e:
                     st.error(f"가져오기 중 오류 발생: {str(e)}")
+                finally:
+                    # 래퍼가 정리될 때 업로드 버퍼까지 닫지 않도록 분리
+                    csv_data.detach()
 
 
 # ==================================================
@@ -473,6 +605,7 @@ def render_user_management():
                 if not user['is_admin']:
                     if st.button("Del", key=f"del_user_{user['user_id']}", use_container_width=True):
                         if delete_user(user['user_id']):
+                            invalidate_stats_cache()
                             st.success(f"사용자 '{user['username']}'이(가) 삭제되었습니다.")
                             st.rerun()
                         else:
@@ -512,6 +645,7 @@ def render_portfolio_management():
             with col4:
                 if st.button("Del", key=f"del_portfolio_{portfolio['portfolio_id']}", use_container_width=True):
                     if delete_portfolio_by_id(portfolio['portfolio_id']):
+                        invalidate_stats_cache()
                         st.success(f"전략 '{portfolio['portfolio_name']}'이(가) 삭제되었습니다.")
                         st.rerun()
                     else:
@@ -520,3 +654,116 @@ def render_portfolio_management():
         st.markdown("---")
     else:
         st.caption("저장된 전략이 없습니다.")
+
+
+# ==================================================
+# 성능
+# ==================================================
+
+def render_performance():
+    """구간별 지연 시간 히스토그램 (전역 / 현재 세션)"""
+
+    st.markdown("### 성능 계측")
+    st.caption("프로세스 시작(또는 초기화) 이후 누적된 값입니다. p50/p95는 구간별 최근 샘플 기준입니다.")
+
+    counters = get_counters()
+    global_hist = get_histograms()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("백테스트 실행", f"{int(counters.get('backtest.runs', 0))}회")
+    with col2:
+        price_cache = get_price_cache_stats()
+        lookups = price_cache['hits'] + price_cache['partial_hits'] + price_cache['misses']
+        st.metric(
+            "가격 데이터 캐시 적중률",
+            f"{price_cache['hits'] / lookups * 100:.0f}%" if lookups else "N/A",
+            help=f"티커별 조회 기준 (부분 적중 {price_cache['partial_hits']}회, 용량 초과 제거 {price_cache['evictions']}회) · "
+                 f"{price_cache['bytes'] / 1024 / 1024:.1f} / {price_cache['max_bytes'] / 1024 / 1024:.0f} MB"
+        )
+    with col3:
+        st.metric("계측 세션", f"{get_session_count()}개")
+
+    st.markdown("#### 전체")
+    if global_hist:
+        st.dataframe(summarize_histograms(global_hist), hide_index=True, use_container_width=True)
+    else:
+        st.info("아직 측정된 구간이 없습니다.")
+
+    st.markdown("#### 현재 세션")
+    session_hist = get_histograms(get_session_id())
+    if session_hist:
+        st.dataframe(summarize_histograms(session_hist), hide_index=True, use_container_width=True)
+    else:
+        st.info("현재 세션에서 측정된 구간이 없습니다.")
+
+    if counters:
+        with st.expander("카운터"):
+            st.json(counters)
+
+    if st.button("계측 데이터 초기화", key="reset_metrics"):
+        reset_metrics()
+        st.success("계측 데이터를 초기화했습니다.")
+        st.rerun()
+
+    st.markdown("---")
+    render_resource_usage()
+
+
+def render_resource_usage():
+    """프로세스 리소스 사용량 (텔레메트리 샘플 시계열)"""
+
+    st.markdown("### 리소스 사용량")
+
+    # 샘플링 스레드가 꺼져 있거나 아직 첫 샘플 전이면 현재 값을 한 번 기록
+    latest = get_latest_sample() or record_sample()
+    history = get_resource_history()
+    st.caption(f"최근 {len(history)}개 샘플 ({history[0]['timestamp']:%H:%M:%S} ~ {latest['timestamp']:%H:%M:%S})")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("메모리 (RSS)", format_bytes(latest['rss_bytes']))
+    with col2:
+        st.metric("CPU", f"{latest['cpu_percent']:.1f}%")
+    with col3:
+        st.metric("스레드", f"{latest['threads']}개")
+    with col4:
+        st.metric("DB 연결", f"{latest['db_connections']}개", delta=f"열린 파일 {latest['open_fds']}개", delta_color="off")
+
+    if len(history) > 1:
+        index = pd.DatetimeIndex([sample['timestamp'] for sample in history], name="시각")
+        cache_names = sorted({name for sample in history for name in sample['caches']})
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 메모리 (MB)")
+            st.line_chart(pd.DataFrame({
+                'RSS': [sample['rss_bytes'] / (1024 * 1024) for sample in history]
+            }, index=index))
+        with col2:
+            st.markdown("#### CPU (%)")
+            st.line_chart(pd.DataFrame({
+                'CPU': [sample['cpu_percent'] for sample in history]
+            }, index=index))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 스레드 / DB 연결")
+            st.line_chart(pd.DataFrame({
+                '스레드': [sample['threads'] for sample in history],
+                'DB 연결': [sample['db_connections'] for sample in history]
+            }, index=index))
+        with col2:
+            st.markdown("#### 캐시 크기 (MB)")
+            if cache_names:
+                st.line_chart(pd.DataFrame({
+                    name: [sample['caches'].get(name, {}).get('bytes', 0) / (1024 * 1024) for sample in history]
+                    for name in cache_names
+                }, index=index))
+
+    if latest['caches']:
+        st.markdown("#### 캐시")
+        st.dataframe(pd.DataFrame([
+            {'캐시': name, '항목 수': "-" if stats['entries'] is None else stats['entries'], '크기': format_bytes(stats['bytes']) if stats['bytes'] else "-"}
+            for name, stats in sorted(latest['caches'].items())
+        ]), hide_index=True, use_container_width=True)
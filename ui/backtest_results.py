@@ -0,0 +1,291 @@
+"""Portfolio Backtest 결과 UI 모듈
+
+결과 섹션은 각각 st.fragment로 분리하고, Figure는 결과(sim_result)마다 한 번만 만들어
+sim_result['figures']에 보관한다. 사이드바나 AI 패널 조작으로 스크립트가 다시 실행되어도
+차트를 다시 계산하지 않으며, AI 패널 조작은 해당 fragment만 다시 실행한다.
+"""
+
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+
+from core.backtest import get_asset_columns
+from core.metrics import calculate_return_analytics
+from core.analysis import generate_ai_analysis
+from config import GEMINI_API_KEY
+from utils.instrumentation import span
+
+
+def _get_figure(result: dict, name: str, builder):
+    """
+    결과별 Figure 메모이제이션
+
+    Figure는 sim_result 딕셔너리 안에 저장되므로 새 백테스트를 실행하거나
+    reset_backtest_state()로 결과가 초기화되면 함께 폐기된다.
+
+    Args:
+        result: st.session_state.sim_result
+        name: Figure 이름
+        builder: result를 받아 Figure를 반환하는 함수
+
+    Returns:
+        Figure
+    """
+    figures = result.setdefault('figures', {})
+    if name not in figures:
+        with span(f"chart.backtest.{name}"):
+            figures[name] = builder(result)
+    return figures[name]
+
+
+def _get_analytics(result: dict) -> dict:
+    """백테스트 시 계산된 수익률 분석 테이블 반환 (이전 세션 결과면 여기서 1회 계산)"""
+    if 'analytics' not in result:
+        result['analytics'] = calculate_return_analytics(result['df'])
+    return result['analytics']
+
+
+# ==================================================
+# Figure 생성
+# ==================================================
+
+def _build_benchmark_figure(result: dict):
+    """벤치마크 비교 차트 생성"""
+    df = result['df']
+    fig_bm = go.Figure()
+    fig_bm.add_trace(go.Scatter(x=df.index, y=df['Benchmark'], name=f"Benchmark ({result['bm_label']})", line=dict(width=2, color='#94A3B8', dash='dot')))
+    fig_bm.add_trace(go.Scatter(x=df.index, y=df['Portfolio'], name='Portfolio', line=dict(width=3, color='#0F172A')))
+    fig_bm.update_layout(
+        template='plotly_white',
+        margin=dict(t=20, b=20),
+        hovermode="x unified",
+        legend=dict(orientation="h", y=1.1),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_bm
+
+
+def _build_assets_figure(result: dict):
+    """자산별 가치 추이 차트 생성"""
+    from plotly.colors import qualitative
+
+    df = result['df']
+    fig_assets = go.Figure()
+    palette = qualitative.Plotly
+    for i, col in enumerate(get_asset_columns(df)):
+        fig_assets.add_trace(go.Scatter(x=df.index, y=df[col], name=col, line=dict(width=1.5, color=palette[i % len(palette)]), opacity=0.7))
+    fig_assets.add_trace(go.Scatter(x=df.index, y=df['Portfolio'], name='Portfolio', line=dict(width=4, color='#0F172A'), opacity=1.0))
+    fig_assets.update_layout(
+        template='plotly_white',
+        margin=dict(t=20, b=20),
+        hovermode="x unified",
+        legend=dict(orientation="h", y=1.1),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_assets
+
+
+def _build_yearly_figure(result: dict):
+    """연도별 수익률 히트맵 생성"""
+    yearly_rets_all = _get_analytics(result)['yearly']
+    years = yearly_rets_all.index.strftime('%Y').tolist()
+    assets_y = yearly_rets_all.columns.tolist()
+    if 'Portfolio' in assets_y:
+        assets_y.remove('Portfolio')
+        assets_y.append('Portfolio')
+    # 재정렬된 순서에 맞게 데이터 가져오기
+    z_val = yearly_rets_all[assets_y].T.values
+    fig_heat = go.Figure(data=go.Heatmap(z=z_val, x=years, y=assets_y, colorscale='RdYlGn', zmid=0, text=np.round(z_val, 1), texttemplate="%{text}%"))
+    fig_heat.update_layout(
+        template='plotly_white',
+        margin=dict(t=20, b=20),
+        height=100 + (len(assets_y) * 40),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_heat
+
+
+def _build_monthly_figure(result: dict):
+    """포트폴리오 월별 수익률 캘린더 히트맵 생성 (연도 x 월)"""
+    monthly = _get_analytics(result)['monthly']['Portfolio']
+    calendar = (
+        monthly.to_frame('ret')
+        .assign(year=monthly.index.year, month=monthly.index.month)
+        .pivot(index='year', columns='month', values='ret')
+        .reindex(columns=range(1, 13))
+    )
+    z_val = calendar.values
+    month_labels = [f"{m}월" for m in calendar.columns]
+    year_labels = [str(y) for y in calendar.index]
+    fig_month = go.Figure(data=go.Heatmap(
+        z=z_val,
+        x=month_labels,
+        y=year_labels,
+        colorscale='RdYlGn',
+        zmid=0,
+        text=np.round(z_val, 1),
+        texttemplate="%{text}",
+        hovertemplate='%{y} %{x}: %{z:.2f}%<extra></extra>'
+    ))
+    fig_month.update_layout(
+        template='plotly_white',
+        margin=dict(t=20, b=20),
+        height=100 + (len(year_labels) * 35),
+        yaxis={'autorange': 'reversed', 'type': 'category'},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_month
+
+
+def _build_correlation_figure(result: dict):
+    """자산 간 상관관계 히트맵 생성"""
+    corr_df = _get_analytics(result)['correlation']
+    asset_cols = corr_df.columns
+    # 히트맵 생성 (x축과 y축이 동일한 자산 목록)
+    fig_corr = go.Figure(data=go.Heatmap(
+        z=corr_df.values,
+        x=corr_df.columns,
+        y=corr_df.index,
+        colorscale='RdBu',
+        zmin=-1,
+        zmax=1,
+        text=np.round(corr_df.values, 2),
+        texttemplate="%{text}",
+        hovertemplate='%{y} vs %{x}<br>Correlation: %{z:.2f}<extra></extra>'
+    ))
+    fig_corr.update_layout(
+        template='plotly_white',
+        height=max(400, len(asset_cols) * 50),
+        xaxis={'side': 'bottom'},
+        yaxis={'autorange': 'reversed'},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_corr
+
+
+# ==================================================
+# 결과 섹션 (fragment)
+# ==================================================
+
+@st.fragment
+def _render_benchmark_section(result: dict):
+    """Benchmark Comparison 섹션"""
+    st.markdown('<div class="section-label">Benchmark Comparison</div>', unsafe_allow_html=True)
+    with st.container(border=True):
+        st.plotly_chart(_get_figure(result, 'benchmark', _build_benchmark_figure), use_container_width=True)
+
+
+@st.fragment
+def _render_assets_section(result: dict):
+    """Asset Breakdown 섹션"""
+    st.markdown('<div class="section-label">Asset Breakdown</div>', unsafe_allow_html=True)
+    with st.container(border=True):
+        st.plotly_chart(_get_figure(result, 'assets', _build_assets_figure), use_container_width=True)
+
+
+@st.fragment
+def _render_yearly_section(result: dict):
+    """Yearly Returns 섹션"""
+    st.markdown('<div class="section-label">Yearly Returns</div>', unsafe_allow_html=True)
+    with st.container(border=True):
+        st.plotly_chart(_get_figure(result, 'yearly', _build_yearly_figure), use_container_width=True)
+
+
+@st.fragment
+def _render_monthly_section(result: dict):
+    """Monthly Returns 섹션"""
+    st.markdown('<div class="section-label">Monthly Returns (Portfolio)</div>', unsafe_allow_html=True)
+    with st.container(border=True):
+        st.plotly_chart(_get_figure(result, 'monthly', _build_monthly_figure), use_container_width=True)
+
+
+@st.fragment
+def _render_correlation_section(result: dict):
+    """Correlation 섹션"""
+    st.markdown('<div class="section-label">Correlation</div>', unsafe_allow_html=True)
+    with st.container(border=True):
+        if _get_analytics(result)['correlation'] is not None:
+            st.plotly_chart(_get_figure(result, 'correlation', _build_correlation_figure), use_container_width=True)
+        else:
+            st.info("자산이 2개 이상이어야 상관관계를 확인할 수 있습니다.")
+
+
+@st.fragment
+def _render_ai_section(pm):
+    """AI Investment Analyst 섹션 (입력/버튼 조작 시 이 fragment만 다시 실행)"""
+    with st.container(border=True):
+        st.markdown("#### AI Investment Analyst")
+        api_key = GEMINI_API_KEY
+        if not api_key:
+            api_key = st.text_input("Gemini API Key", type="password", placeholder="API Key 입력")
+        if st.button("Generate Analysis Report", type="secondary", use_container_width=True):
+            if not api_key:
+                st.warning("API Key가 필요합니다.")
+            else:
+                with st.spinner("AI analyzing..."):
+                    analysis = generate_ai_analysis(st.session_state.portfolio, pm[0], pm[1], pm[2], pm[4], api_key)
+                    st.session_state.ai_analysis = analysis
+    if st.session_state.ai_analysis:
+        st.markdown(f"""<div class="ai-analysis-box">{st.session_state.ai_analysis}</div>""", unsafe_allow_html=True)
+
+
+def _render_timings(result: dict):
+    """백테스트 1회 실행의 구간별 소요 시간"""
+    timings = result.get('timings')
+    if not timings:
+        return
+    total = timings.get('backtest.total', 0.0)
+    with st.expander(f"실행 시간 상세 (총 {total / 1000:.2f}초)"):
+        rows = [
+            {'구간': name, '소요 시간 (ms)': round(ms, 1), '비율 (%)': round(ms / total * 100, 1) if total else 0.0}
+            for name, ms in sorted(timings.items(), key=lambda item: -item[1])
+            if name != 'backtest.total'
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption("구간은 중첩될 수 있습니다. 예를 들어 backtest.fetch_data에는 yfinance.history가 포함됩니다.")
+
+
+def render_backtest_results():
+    """백테스트 결과 렌더링 (st.session_state.sim_result 기준)"""
+    result = st.session_state.sim_result
+    pm = result['p_metrics']
+    bm = result['b_metrics']
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    st.markdown('<div class="section-label">Simulation Results</div>', unsafe_allow_html=True)
+
+    # 결과 요약 카드
+    with st.container(border=True):
+        col_m = st.columns(5)
+        labels = ["Total Return", "CAGR", "Max Drawdown", "Volatility", "Sharpe Ratio"]
+        formats = ["{:.2f}%", "{:.2f}%", "{:.2f}%", "{:.2f}%", "{:.2f}"]
+        for i, col in enumerate(col_m):
+            val = pm[i]
+            bm_val = bm[i]
+            diff = val - bm_val
+            delta_color = "inverse" if i in [2, 3] else "normal"
+            col.metric(labels[i], formats[i].format(val), f"{diff:.2f} vs BM" if i != 4 else f"{diff:.2f}", delta_color=delta_color)
+    _render_timings(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_benchmark_section(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_assets_section(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_yearly_section(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_monthly_section(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_correlation_section(result)
+
+    st.markdown('<div class="spacer-lg"></div>', unsafe_allow_html=True)
+    _render_ai_section(pm)
@@ -1,6 +1,6 @@
 import streamlit as st
-from auth.authentication import authenticate_user, register_user
-from auth.session import login_user
+from auth.authentication import authenticate_user, register_user, get_login_block, AuthBusyError
+from auth.session import login_user, get_client_ip
 
 
 def render_login_page():
@@ -40,16 +40,25 @@ def render_login_form():
         submit_button = st.form_submit_button("Login", use_container_width=True)
 
         if submit_button:
+            client_ip = get_client_ip()
+            wait = get_login_block(username, client_ip) if username else 0
             if not username or not password:
                 st.error("사용자명과 비밀번호를 입력하세요.")
+            elif wait:
+                st.error(f"로그인 시도가 너무 많습니다. {(wait + 59) // 60}분 후 다시 시도해주세요.")
             else:
-                user = authenticate_user(username, password)
-                if user:
-                    login_user(user)
-                    st.success("로그인 성공!")
-                    st.rerun()
+                try:
+                    user = authenticate_user(username, password, client_ip)
+                except AuthBusyError as e:
+                    user = None
+                    st.warning(str(e))
                 else:
-                    st.error("사용자명 또는 비밀번호가 올바르지 않습니다.")
+                    if user:
+                        login_user(user)
+                        st.success("로그인 성공!")
+                        st.rerun()
+                    else:
+                        st.error("사용자명 또는 비밀번호가 올바르지 않습니다.")
 
 
 def render_signup_form():
@@ -75,7 +84,11 @@ def render_signup_form():
                 if success:
                     st.success("회원가입 성공! 자동으로 로그인됩니다.")
                     # 자동 로그인
-                    user = authenticate_user(username, password)
+                    try:
+                        user = authenticate_user(username, password, get_client_ip())
+                    except AuthBusyError as e:
+                        user = None
+                        st.info(f"{e} (로그인 탭에서 로그인할 수 있습니다.)")
                     if user:
                         login_user(user)
                         st.rerun()
@@ -1,7 +1,11 @@
 """통합 종목 검색 컴포넌트"""
 
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
 import streamlit as st
-import yfinance as yf
 
 from auth.session import get_current_user
 from db.models import (
@@ -11,10 +15,24 @@ from db.models import (
     is_in_watchlist
 )
 from core.data_fetcher import search_ticker, search_by_keyword
+from config import SEARCH_LATENCY_BUDGET, SEARCH_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
 
 # 최근 검색 최대 개수
 MAX_RECENT_SEARCHES = 5
 
+# 검색 소스 우선순위 (낮을수록 먼저 표시)
+SOURCE_LOCAL = 0      # POPULAR_STOCKS 로컬 인덱스
+SOURCE_TICKER = 1     # yfinance 직접 티커 조회
+SOURCE_KEYWORD = 2    # yfinance Search
+
+# 원격 검색용 스레드 풀 (프로세스 공유, 세션 간 재사용)
+_search_executor = ThreadPoolExecutor(
+    max_workers=SEARCH_MAX_WORKERS,
+    thread_name_prefix="stock-search"
+)
+
 # 주요 종목 리스트 (종목명 검색용) - 한글 키워드 강화
 POPULAR_STOCKS = [
     # 미국 주요 종목
@@ -202,50 +220,101 @@ def search_by_name(query: str, limit: int = 5) -> list:
     return results[:limit]
 
 
-def search_stocks(query: str, limit: int = 5) -> list:
+def _search_ticker_results(query: str) -> list:
+    """search_ticker 결과를 검색 결과 리스트 형식으로 변환"""
+    found, ticker, name, currency = search_ticker(query)
+    if not found:
+        return []
+    return [{'ticker': ticker, 'name': name, 'currency': currency}]
+
+
+def _merge_search_results(source_results: dict, limit: int) -> list:
     """
-    종목 검색 (티커 또는 종목명)
+    소스별 검색 결과를 우선순위 순서로 병합 (티커 중복 제거)
 
     Args:
-        query: 검색어
+        source_results: {소스 우선순위: 결과 리스트}
         limit: 최대 결과 수
 
     Returns:
-        list: [{'ticker': str, 'name': str, 'currency': str}, ...]
+        list: 병합된 결과
     """
-    if not query or len(query) < 1:
-        return []
-
     results = []
     added_tickers = set()
 
-    # 1. 종목명/키워드로 검색 (POPULAR_STOCKS에서)
-    name_results = search_by_name(query, limit)
-    for stock in name_results:
-        if stock['ticker'] not in added_tickers:
+    for source in sorted(source_results):
+        for stock in source_results[source]:
+            if stock['ticker'] in added_tickers:
+                continue
             results.append(stock)
             added_tickers.add(stock['ticker'])
+            if len(results) >= limit:
+                return results
 
-    # 2. 직접 티커 검색 (yfinance)
-    if len(results) < limit:
-        found, ticker, name, currency = search_ticker(query)
-        if found and ticker not in added_tickers:
-            results.append({
-                'ticker': ticker,
-                'name': name,
-                'currency': currency
-            })
-            added_tickers.add(ticker)
+    return results
 
-    # 3. yfinance Search로 종목명 검색 (POPULAR_STOCKS에 없는 종목도 검색)
-    if len(results) < limit:
-        yf_results = search_by_keyword(query, limit - len(results))
-        for stock in yf_results:
-            if stock['ticker'] not in added_tickers:
-                results.append(stock)
-                added_tickers.add(stock['ticker'])
 
-    return results[:limit]
+def _has_enough_results(source_results: dict, limit: int) -> bool:
+    """우선순위가 연속으로 완료된 소스만으로 limit를 채웠는지 확인"""
+    completed_prefix = {}
+    for source in (SOURCE_LOCAL, SOURCE_TICKER, SOURCE_KEYWORD):
+        if source not in source_results:
+            break
+        completed_prefix[source] = source_results[source]
+    return len(_merge_search_results(completed_prefix, limit)) >= limit
+
+
+def search_stocks(query: str, limit: int = 5, latency_budget: float = None) -> list:
+    """
+    종목 검색 (티커 또는 종목명)
+
+    로컬 인덱스(POPULAR_STOCKS) 결과가 부족하면 yfinance 티커 조회와
+    키워드 검색을 동시에 실행하고, 도착하는 순서대로 병합한다.
+    latency_budget 안에 도착하지 않은 원격 결과는 버린다.
+
+    Args:
+        query: 검색어
+        limit: 최대 결과 수
+        latency_budget: 최대 대기 시간 (초, 기본: config의 SEARCH_LATENCY_BUDGET)
+
+    Returns:
+        list: [{'ticker': str, 'name': str, 'currency': str}, ...]
+    """
+    if not query or len(query) < 1:
+        return []
+
+    if latency_budget is None:
+        latency_budget = SEARCH_LATENCY_BUDGET
+    deadline = time.monotonic() + latency_budget
+
+    # 1. 종목명/키워드로 검색 (POPULAR_STOCKS에서) - 네트워크 없음
+    source_results = {SOURCE_LOCAL: search_by_name(query, limit)}
+    if len(source_results[SOURCE_LOCAL]) >= limit:
+        return _merge_search_results(source_results, limit)
+
+    # 2. 직접 티커 검색 + 3. yfinance Search를 동시에 실행
+    futures = {
+        _search_executor.submit(_search_ticker_results, query): SOURCE_TICKER,
+        _search_executor.submit(search_by_keyword, query, limit): SOURCE_KEYWORD,
+    }
+
+    try:
+        for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+            source = futures[future]
+            try:
+                source_results[source] = future.result()
+            except Exception as e:
+                logger.debug(f"Search source {source} failed for '{query}': {e}")
+                source_results[source] = []
+
+            # 상위 우선순위 결과만으로 충분하면 나머지는 기다리지 않음
+            if _has_enough_results(source_results, limit):
+                break
+    except FuturesTimeoutError:
+        pending = [futures[f] for f in futures if not f.done()]
+        logger.info(f"Search latency budget exceeded for '{query}', pending sources: {pending}")
+
+    return _merge_search_results(source_results, limit)
 
 
 def render_stock_search(
@@ -1,5 +1,6 @@
 """Technical Analysis UI 모듈"""
 
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -13,10 +14,15 @@ from core.indicators import (
     calculate_macd,
     calculate_vwap
 )
-from config import TA_TIMEFRAME_MAP, TA_PERIOD_MAP, TA_EMA_COLORS
+from core.decimation import get_point_budget, decimate_ohlcv, decimate_line, decimate_band
+from config import (
+    TA_TIMEFRAME_MAP, TA_PERIOD_MAP, TA_EMA_COLORS,
+    TA_CHART_WIDTH_PX, TA_FIGURE_CACHE_ENTRIES
+)
 from ui.stock_search import add_to_recent_searches
 from db.models import get_stock_note, save_stock_note, delete_stock_note
 from auth.session import get_current_user
+from utils.instrumentation import timed
 
 
 def render_technical_analysis():
@@ -312,6 +318,40 @@ def _reload_chart_with_interval(interval: str):
         st.rerun()
 
 
+def _render_zoom_control(df, max_points: int):
+    """
+    표시 구간 선택 슬라이더 (데이터가 포인트 예산보다 많을 때만 표시)
+
+    Returns:
+        tuple or None: (start, end) 표시 구간
+    """
+    if len(df) <= max_points:
+        return None
+
+    st.markdown('<div class="section-label">Zoom Range</div>', unsafe_allow_html=True)
+    first = df.index[0].to_pydatetime()
+    last = df.index[-1].to_pydatetime()
+
+    # 종목/기간/간격이 바뀌면 슬라이더도 새로 생성 (이전 구간 초기화)
+    ticker = st.session_state.get('ta_ticker', '')
+    period = st.session_state.get('ta_period', '1y')
+    interval = st.session_state.get('ta_interval', '1d')
+    visible_range = st.slider(
+        "Zoom Range",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY-MM-DD",
+        label_visibility="collapsed",
+        key=f"ta_zoom_{ticker}_{period}_{interval}"
+    )
+    st.caption(f"{len(df):,}개 봉 중 선택 구간은 최대 {max_points:,}개까지 원본 해상도로 표시되고, 나머지는 축약됩니다.")
+
+    if visible_range == (first, last):
+        return None
+    return visible_range
+
+
 def _render_charts():
     """차트 렌더링"""
     df = st.session_state.ta_data
@@ -400,8 +440,101 @@ def _render_charts():
     if st.session_state.get('ta_show_vwap', False):
         indicators.append("VWAP")
 
+    # 차트 너비 기준 포인트 예산 및 표시 구간
+    max_points = get_point_budget(TA_CHART_WIDTH_PX)
+    visible_range = _render_zoom_control(df, max_points)
+
     st.markdown('<div class="spacer-md"></div>', unsafe_allow_html=True)
 
+    # 차트 생성 (동일 종목/기간/간격/지표/표시 구간이면 캐시된 Figure 재사용, 전송은 매번 발생)
+    current_interval = st.session_state.get('ta_interval', '1d')
+    fig, chart_height = _build_chart_figure(
+        ticker,
+        st.session_state.get('ta_period', '1y'),
+        current_interval,
+        tuple(indicators),
+        max_points,
+        visible_range,
+        _data_signature(df),
+        df
+    )
+
+    # 파일명 생성: {ticker}_{timeframe}_{YYYYMMDD}.png
+    timeframe_label = next((k for k, v in TA_TIMEFRAME_MAP.items() if v == current_interval), "Daily")
+    today = datetime.now().strftime("%Y%m%d")
+    filename = f"{ticker}_{timeframe_label}_{today}"
+
+    # Plotly config - 모바일 친화적 설정
+    config = {
+        'scrollZoom': False,  # 스크롤로 줌 비활성화 (모바일 스크롤 가능)
+        'displayModeBar': 'hover',  # 툴바는 호버/터치 시에만 표시
+        'doubleClick': 'reset',  # 더블클릭 시 차트 리셋
+        'modeBarButtonsToRemove': [
+            'pan2d',  # 패닝 도구 제거
+            'lasso2d',  # 올가미 선택 제거
+            'select2d'  # 박스 선택 제거
+        ],
+        'toImageButtonOptions': {
+            'format': 'png',
+            'filename': filename,
+            'height': chart_height,
+            'width': TA_CHART_WIDTH_PX,
+            'scale': 2
+        }
+    }
+
+    st.plotly_chart(fig, use_container_width=True, config=config)
+
+    # 메모 섹션 추가
+    _render_notes_section(ticker, name)
+
+
+def _data_signature(df) -> tuple:
+    """차트 캐시 키용 데이터 식별값 (TTL 내 데이터 갱신 감지)"""
+    return (len(df), df.index[-1].value, float(df['Close'].iloc[-1]))
+
+
+@st.cache_resource(show_spinner=False, ttl=300, max_entries=TA_FIGURE_CACHE_ENTRIES)
+@timed("chart.technical_analysis")
+def _build_chart_figure(
+    ticker: str,
+    period: str,
+    interval: str,
+    indicators: tuple,
+    max_points: int,
+    visible_range,
+    data_signature: tuple,
+    _df
+):
+    """
+    Technical Analysis 차트 Figure 생성 (캐시)
+
+    캐시 키는 (ticker, period, interval, indicators, 포인트 예산, 표시 구간, 데이터 식별값)이며
+    DataFrame 자체는 해싱하지 않는다. 반환된 Figure는 세션 간 공유되므로 수정하지 말 것.
+    캐시로 아끼는 것은 지표 계산/축약/trace 구성뿐이며, st.plotly_chart는 재실행마다
+    Figure를 직렬화해 브라우저로 다시 보낸다 (전송량은 포인트 예산으로 제한).
+
+    Args:
+        ticker: 티커 심볼
+        period: 데이터 기간
+        interval: 데이터 간격
+        indicators: 선택된 지표 이름 튜플
+        max_points: 포인트 예산
+        visible_range: (start, end) 표시 구간 또는 None
+        data_signature: _data_signature() 결과
+        _df: OHLCV DataFrame
+
+    Returns:
+        tuple: (Figure, chart_height)
+    """
+    df = _df
+
+    # 지표는 원본 데이터로 계산하고, 차트로 보낼 때만 축약
+    plot_df = decimate_ohlcv(df, max_points, visible_range)
+
+    def _line(series):
+        return decimate_line(series, max_points, visible_range)
+
     # 서브플롯 개수 및 높이 결정
     num_subplots = 2  # 캔들스틱 + 거래량 (기본)
     if "RSI" in indicators:
@@ -428,11 +561,11 @@ def _render_charts():
     # 1. 캔들스틱 차트
     fig.add_trace(
         go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
+            x=plot_df.index,
+            open=plot_df['Open'],
+            high=plot_df['High'],
+            low=plot_df['Low'],
+            close=plot_df['Close'],
             name="Price",
             increasing_line_color='#10B981',
             decreasing_line_color='#EF4444'
@@ -440,12 +573,13 @@ def _render_charts():
         row=1, col=1
     )
 
-    # 2. EMA (항상 표시)
+    # 2. EMA (항상 표시) - 라인 오버레이는 WebGL(Scattergl)로 렌더링
     ema_data = calculate_ema(df['Close'])
     for period, ema in ema_data.items():
+        ema = _line(ema)
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
+            go.Scattergl(
+                x=ema.index,
                 y=ema,
                 name=f"EMA {period}",
                 line=dict(width=1.5, color=TA_EMA_COLORS.get(period, '#888888'))
@@ -456,19 +590,21 @@ def _render_charts():
     # 3. 볼린저 밴드 (선택적)
     if "Bollinger Bands" in indicators:
         bb = calculate_bollinger_bands(df['Close'])
+        # 상단/하단을 같은 날짜로 축약해야 사이 영역(tonexty)이 어긋나지 않음
+        band = decimate_band(bb['upper'], bb['lower'], max_points, visible_range)
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=bb['upper'],
+            go.Scattergl(
+                x=band.index,
+                y=band['upper'],
                 name='BB Upper',
                 line=dict(width=1, color='#94A3B8', dash='dash')
             ),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=bb['lower'],
+            go.Scattergl(
+                x=band.index,
+                y=band['lower'],
                 name='BB Lower',
                 line=dict(width=1, color='#94A3B8', dash='dash'),
                 fill='tonexty',
@@ -479,10 +615,10 @@ def _render_charts():
 
     # 4. VWAP (선택적)
     if "VWAP" in indicators:
-        vwap = calculate_vwap(df)
+        vwap = _line(calculate_vwap(df))
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
+            go.Scattergl(
+                x=vwap.index,
                 y=vwap,
                 name='VWAP',
                 line=dict(width=2, color='#EC4899', dash='dot')
@@ -491,12 +627,13 @@ def _render_charts():
         )
 
     # 5. 거래량 바 차트
-    colors = ['#10B981' if c >= o else '#EF4444'
-              for c, o in zip(df['Close'], df['Open'])]
+    colors = np.where(
+        plot_df['Close'].to_numpy() >= plot_df['Open'].to_numpy(), '#10B981', '#EF4444'
+    )
     fig.add_trace(
         go.Bar(
-            x=df.index,
-            y=df['Volume'],
+            x=plot_df.index,
+            y=plot_df['Volume'],
             name='Volume',
             marker_color=colors,
             opacity=0.7
@@ -508,10 +645,10 @@ def _render_charts():
     # 6. RSI 서브플롯 (선택적)
     current_row = 3
     if "RSI" in indicators:
-        rsi = calculate_rsi(df['Close'])
+        rsi = _line(calculate_rsi(df['Close']))
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
+            go.Scattergl(
+                x=rsi.index,
                 y=rsi,
                 name='RSI',
                 line=dict(width=1.5, color='#8B5CF6')
@@ -528,10 +665,10 @@ def _render_charts():
 
     # 7. MACD 서브플롯 (선택적)
     if "MACD" in indicators:
-        macd = calculate_macd(df['Close'])
+        macd = {k: _line(v) for k, v in calculate_macd(df['Close']).items()}
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
+            go.Scattergl(
+                x=macd['macd'].index,
                 y=macd['macd'],
                 name='MACD',
                 line=dict(width=1.5, color='#3B82F6')
@@ -539,8 +676,8 @@ def _render_charts():
             row=current_row, col=1
         )
         fig.add_trace(
-            go.Scatter(
-                x=df.index,
+            go.Scattergl(
+                x=macd['signal'].index,
                 y=macd['signal'],
                 name='Signal',
                 line=dict(width=1.5, color='#F59E0B')
@@ -548,10 +685,10 @@ def _render_charts():
             row=current_row, col=1
         )
         # 히스토그램
-        hist_colors = ['#10B981' if v >= 0 else '#EF4444' for v in macd['histogram']]
+        hist_colors = np.where(macd['histogram'].to_numpy() >= 0, '#10B981', '#EF4444')
         fig.add_trace(
             go.Bar(
-                x=df.index,
+                x=macd['histogram'].index,
                 y=macd['histogram'],
                 name='Histogram',
                 marker_color=hist_colors,
@@ -584,39 +721,16 @@ def _render_charts():
     # x축 날짜 형식 설정
     fig.update_xaxes(type="date", row=1, col=1)
 
-    # 파일명 생성: {ticker}_{timeframe}_{YYYYMMDD}.png
-    current_interval = st.session_state.get('ta_interval', '1d')
-    timeframe_label = next((k for k, v in TA_TIMEFRAME_MAP.items() if v == current_interval), "Daily")
-    today = datetime.now().strftime("%Y%m%d")
-    filename = f"{ticker}_{timeframe_label}_{today}"
-
-    # Plotly config - 모바일 친화적 설정
-    config = {
-        'scrollZoom': False,  # 스크롤로 줌 비활성화 (모바일 스크롤 가능)
-        'displayModeBar': 'hover',  # 툴바는 호버/터치 시에만 표시
-        'doubleClick': 'reset',  # 더블클릭 시 차트 리셋
-        'modeBarButtonsToRemove': [
-            'pan2d',  # 패닝 도구 제거
-            'lasso2d',  # 올가미 선택 제거
-            'select2d'  # 박스 선택 제거
-        ],
-        'toImageButtonOptions': {
-            'format': 'png',
-            'filename': filename,
-            'height': chart_height,
-            'width': 1400,
-            'scale': 2
-        }
-    }
-
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    # 선택한 표시 구간으로 확대
+    if visible_range is not None:
+        fig.update_xaxes(range=list(visible_range))
 
-    # 메모 섹션 추가
-    _render_notes_section(ticker, name)
+    return fig, chart_height
 
 
+@st.fragment
 def _render_notes_section(ticker: str, name: str):
-    """메모 섹션 렌더링"""
+    """메모 섹션 렌더링 (fragment - 메모 편집 시 차트는 다시 그리지 않음)"""
     user = get_current_user()
     if not user:
         return
@@ -0,0 +1,326 @@
+"""백업 카탈로그 (BACKUP_DIR/catalog.db)
+
+백업 파일(.db)과 스냅샷(.snap)의 메타데이터를 SQLite 테이블 하나에 기록해서, 목록 조회와 보관 정책 적용을
+파일마다 stat/매니페스트를 읽지 않고 created_at 인덱스 쿼리 한 번으로 처리한다.
+카탈로그는 백업 디렉토리에 두므로 DB 복원과 무관하게 유지되며, backup.sh 등 다른 프로세스도 같은 파일에 기록한다.
+디렉토리와 어긋난 경우(이전 버전에서 만든 백업, 수동 삭제 등)는 sync_catalog()가 프로세스당 한 번 맞춘다.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.backup_store import SNAPSHOT_EXT, get_backup_dir, get_store_usage, read_manifest
+
+CATALOG_FILE = "catalog.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    filename TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT 'manual',
+    size INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'ok',
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_backups_created_at ON backups(created_at);
+CREATE INDEX IF NOT EXISTS idx_backups_source_created_at ON backups(source, created_at);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# 이전 카탈로그에 없던 컬럼 (연결 시 ALTER TABLE로 추가)
+_ADDED_COLUMNS = (
+    ("status", "TEXT NOT NULL DEFAULT 'ok'"),
+    ("sha256", "TEXT"),
+)
+
+# 백업 상태: 'ok' 정상, 'verifying' 무결성 검사 대기/진행 중, 'invalid' 검사 실패
+STATUS_OK = 'ok'
+STATUS_VERIFYING = 'verifying'
+STATUS_INVALID = 'invalid'
+
+_catalog_lock = threading.Lock()
+_prepared_dirs = set()
+_synced_dirs = set()
+
+
+def _connect() -> sqlite3.Connection:
+    """카탈로그 연결 (처음 연결할 때 디렉토리와 스키마 생성)"""
+    backup_dir = get_backup_dir()
+    key = os.path.abspath(backup_dir)
+    if key not in _prepared_dirs:
+        os.makedirs(backup_dir, exist_ok=True)
+
+    conn = sqlite3.connect(os.path.join(backup_dir, CATALOG_FILE), timeout=30)
+    conn.row_factory = sqlite3.Row
+
+    if key not in _prepared_dirs:
+        with _catalog_lock:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(backups)")}
+            for column, definition in _ADDED_COLUMNS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE backups ADD COLUMN {column} {definition}")
+            conn.commit()
+            _prepared_dirs.add(key)
+    return conn
+
+
+def _row_to_entry(backup_dir: str, row: sqlite3.Row) -> Dict[str, any]:
+    return {
+        'filename': row['filename'],
+        'filepath': os.path.join(backup_dir, row['filename']),
+        'kind': row['kind'],
+        'source': row['source'],
+        'size': row['size'],
+        'created_at': datetime.fromtimestamp(row['created_at']),
+        'created_timestamp': row['created_at'],
+        'description': row['description'],
+        'status': row['status'],
+        'sha256': row['sha256']
+    }
+
+
+# ==================================================
+# 기록 / 삭제
+# ==================================================
+
+def record_backup(filename: str, kind: str, size: int, created_at: datetime = None,
+                  description: str = "", source: str = "manual", status: str = STATUS_OK,
+                  sha256: str = None):
+    """
+    카탈로그에 백업 추가 (같은 파일명이 있으면 덮어씀)
+
+    Args:
+        filename: 백업 디렉토리 안의 파일명
+        kind: 'snapshot' 또는 'file'
+        size: DB 크기 (바이트)
+        created_at: 생성 시각 (기본: 현재)
+        description: 설명
+        source: 생성 경로 ('manual', 'schedule', 'safety', 'upload', 'cli')
+        status: 상태 (STATUS_OK, STATUS_VERIFYING, STATUS_INVALID)
+        sha256: 파일 해시 (선택)
+    """
+    created_at = created_at or datetime.now()
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO backups (filename, kind, source, size, created_at, description, status, sha256)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (filename, kind, source, size, created_at.timestamp(), description or "", status, sha256)
+            )
+    finally:
+        conn.close()
+
+
+def set_backup_status(filename: str, status: str):
+    """백업 상태 변경 (무결성 검사 결과 반영)"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("UPDATE backups SET status = ? WHERE filename = ?", (status, filename))
+    finally:
+        conn.close()
+
+
+def remove_backups(filenames: List[str]):
+    """카탈로그에서 백업 삭제 (여러 개를 한 트랜잭션으로)"""
+    if not filenames:
+        return
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany("DELETE FROM backups WHERE filename = ?", [(name,) for name in filenames])
+    finally:
+        conn.close()
+
+
+def adjust_store_usage(delta: int):
+    """
+    스냅샷 저장소 사용량(청크 + 매니페스트 바이트) 증감
+
+    backup_store가 청크/매니페스트를 쓰거나 지울 때 호출하므로 통계 조회 시 디렉토리를 훑지 않는다.
+    아직 한 번도 계산하지 않았으면(NULL) 그대로 두고 get_catalog_stats()에서 전체 계산한다.
+    """
+    if not delta:
+        return
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("UPDATE catalog_meta SET value = value + ? WHERE key = 'store_bytes'", (delta,))
+    finally:
+        conn.close()
+
+
+def _set_store_usage(conn: sqlite3.Connection, value: int):
+    conn.execute(
+        """INSERT INTO catalog_meta (key, value) VALUES ('store_bytes', ?)
+           ON CONFLICT(key) DO UPDATE SET value = excluded.value""",
+        (value,)
+    )
+
+
+# ==================================================
+# 조회
+# ==================================================
+
+def list_catalog(kind: str = None, source: str = None, before: datetime = None) -> List[Dict[str, any]]:
+    """
+    카탈로그 조회 (최신순)
+
+    Args:
+        kind: 'snapshot' / 'file'로 제한 (선택)
+        source: 생성 경로로 제한 (선택)
+        before: 이 시각보다 먼저 만든 백업만 (선택)
+
+    Returns:
+        list: [{'filename', 'filepath', 'kind', 'source', 'size', 'created_at'(datetime),
+                'created_timestamp', 'description', 'status', 'sha256'}, ...]
+    """
+    conditions = []
+    params = []
+    if kind is not None:
+        conditions.append("kind = ?")
+        params.append(kind)
+    if source is not None:
+        conditions.append("source = ?")
+        params.append(source)
+    if before is not None:
+        conditions.append("created_at < ?")
+        params.append(before.timestamp())
+
+    sql = "SELECT * FROM backups"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY created_at DESC"
+
+    backup_dir = get_backup_dir()
+    conn = _connect()
+    try:
+        return [_row_to_entry(backup_dir, row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def get_latest_backup_time(source: str = None) -> Optional[datetime]:
+    """가장 최근 백업 시각 (source로 제한 가능, 없으면 None)"""
+    conn = _connect()
+    try:
+        if source is None:
+            row = conn.execute("SELECT MAX(created_at) FROM backups").fetchone()
+        else:
+            row = conn.execute("SELECT MAX(created_at) FROM backups WHERE source = ?", (source,)).fetchone()
+    finally:
+        conn.close()
+    return datetime.fromtimestamp(row[0]) if row[0] is not None else None
+
+
+def get_catalog_stats() -> Dict[str, any]:
+    """
+    백업 통계 (집계 쿼리 1회)
+
+    Returns:
+        dict: {'count', 'latest_backup'(datetime or None), 'file_bytes', 'store_bytes'}
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            """SELECT COUNT(*), MAX(created_at),
+                      COALESCE(SUM(CASE WHEN kind = 'file' THEN size END), 0),
+                      (SELECT value FROM catalog_meta WHERE key = 'store_bytes')
+               FROM backups"""
+        ).fetchone()
+        store_bytes = row[3]
+        if store_bytes is None:
+            store_bytes = get_store_usage()
+            with conn:
+                _set_store_usage(conn, store_bytes)
+    finally:
+        conn.close()
+
+    return {
+        'count': row[0],
+        'latest_backup': datetime.fromtimestamp(row[1]) if row[1] is not None else None,
+        'file_bytes': row[2],
+        'store_bytes': store_bytes
+    }
+
+
+# ==================================================
+# 디렉토리와 동기화
+# ==================================================
+
+def sync_catalog(force: bool = False) -> Dict[str, int]:
+    """
+    백업 디렉토리와 카탈로그 맞추기 (프로세스당 디렉토리별 1회)
+
+    카탈로그에 없는 백업 파일/스냅샷은 추가하고(매니페스트는 새로 발견한 것만 읽음),
+    파일이 없어진 항목은 삭제한다. 저장소 사용량도 디렉토리 기준으로 다시 계산한다.
+
+    Args:
+        force: True면 이미 동기화한 디렉토리도 다시 수행
+
+    Returns:
+        dict: {'added', 'removed'}
+    """
+    backup_dir = get_backup_dir()
+    key = os.path.abspath(backup_dir)
+    if not force and key in _synced_dirs:
+        return {'added': 0, 'removed': 0}
+    if not os.path.isdir(backup_dir):
+        return {'added': 0, 'removed': 0}
+
+    conn = _connect()
+    try:
+        known = {row[0] for row in conn.execute("SELECT filename FROM backups")}
+        on_disk = set()
+        added = []
+
+        for entry in os.scandir(backup_dir):
+            name = entry.name
+            if name.endswith(SNAPSHOT_EXT):
+                kind = 'snapshot'
+            elif name.startswith('portfolios_') and name.endswith('.db'):
+                kind = 'file'
+            else:
+                continue
+            on_disk.add(name)
+            if name in known:
+                continue
+
+            try:
+                if kind == 'snapshot':
+                    manifest = read_manifest(name)
+                    added.append((
+                        name, kind, manifest.get('source', 'manual'), manifest['db_size'],
+                        datetime.fromisoformat(manifest['created_at']).timestamp(),
+                        manifest.get('description', '')
+                    ))
+                else:
+                    stat = entry.stat()
+                    source = 'upload' if name.startswith('portfolios_uploaded_') else 'manual'
+                    added.append((name, kind, source, stat.st_size, stat.st_mtime, ''))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        removed = known - on_disk
+        with conn:
+            conn.executemany(
+                """INSERT OR REPLACE INTO backups (filename, kind, source, size, created_at, description)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                added
+            )
+            conn.executemany("DELETE FROM backups WHERE filename = ?", [(name,) for name in removed])
+            _set_store_usage(conn, get_store_usage())
+    finally:
+        conn.close()
+
+    _synced_dirs.add(key)
+    return {'added': len(added), 'removed': len(removed)}
@@ -1,11 +1,28 @@
 """데이터베이스 백업 및 복원 관리"""
 
 import os
-import shutil
 import sqlite3
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+from utils.backup_store import (
+    SNAPSHOT_EXT, copy_database, create_snapshot, materialize_snapshot,
+    delete_snapshot
+)
+from utils.backup_catalog import (
+    STATUS_OK, STATUS_VERIFYING, STATUS_INVALID,
+    record_backup, set_backup_status, remove_backups, list_catalog, sync_catalog, get_catalog_stats
+)
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 업로드 백업에 있어야 하는 테이블 (빠른 스키마 검사)
+REQUIRED_TABLES = ('users', 'portfolios')
 
 
 # ==================================================
@@ -22,6 +39,16 @@ def get_backup_dir():
     return os.environ.get("BACKUP_DIR", "./backups")
 
 
+def get_backup_step_pages() -> int:
+    """백그라운드 백업에서 한 단계에 복사할 페이지 수"""
+    return max(1, int(os.environ.get("BACKUP_STEP_PAGES", "256")))
+
+
+def get_backup_step_sleep() -> float:
+    """백그라운드 백업 단계 사이 대기 시간 (초)"""
+    return max(0.0, float(os.environ.get("BACKUP_STEP_SLEEP", "0.01")))
+
+
 def ensure_backup_dir():
     """백업 디렉토리 생성 (없으면)"""
     backup_dir = get_backup_dir()
@@ -34,88 +61,201 @@ def ensure_backup_dir():
 # 백업 생성
 # ==================================================
 
-def create_backup(description: str = "") -> Dict[str, any]:
+def _check_disk_space(db_path: str) -> Optional[str]:
+    """
+    백업 전 DB 파일과 디스크 공간 확인
+
+    Returns:
+        str: 문제가 있으면 오류 메시지, 없으면 None
+    """
+    # DB 파일 존재 확인
+    if not os.path.exists(db_path):
+        return f"데이터베이스 파일을 찾을 수 없습니다: {db_path}"
+
+    # 백업 디렉토리 생성
+    backup_dir = ensure_backup_dir()
+
+    # 디스크 공간 확인 (임시 복사본을 만들 DB 크기의 2배 이상 필요)
+    db_size = os.path.getsize(db_path)
+    stat = os.statvfs(backup_dir)
+    free_space = stat.f_bavail * stat.f_frsize
+
+    if free_space < db_size * 2:
+        return f"디스크 공간이 부족합니다. (필요: {db_size * 2 / 1024:.1f} KB, 사용 가능: {free_space / 1024:.1f} KB)"
+
+    return None
+
+
+def _snapshot_backup(description: str, source: str = "manual", progress=None,
+                     pages: int = -1, step_sleep: float = 0.0) -> Dict[str, any]:
+    """스냅샷 백업 실행 후 create_backup 형식의 결과 반환"""
+    db_path = get_db_path()
+
+    error = _check_disk_space(db_path)
+    if error:
+        return {
+            'success': False,
+            'backup_file': None,
+            'message': error
+        }
+
+    # SQLite backup API로 만든 복사본을 검증한 뒤 증분 스냅샷으로 저장
+    # (바뀐 청크만 압축해 저장하고 나머지는 이전 스냅샷과 공유)
+    result = create_snapshot(db_path, description, validate=validate_backup,
+                             progress=progress, pages=pages, step_sleep=step_sleep, source=source)
+    if not result['success']:
+        return {
+            'success': False,
+            'backup_file': None,
+            'message': result['message']
+        }
+
+    return {
+        'success': True,
+        'backup_file': result['filename'],
+        'backup_path': result['filepath'],
+        'size': result['db_size'],
+        'stored_size': result['new_bytes'],
+        'message': (
+            f"백업이 성공적으로 생성되었습니다. ({result['db_size'] / 1024:.1f} KB, "
+            f"변경된 청크 {result['new_chunks']}/{result['chunk_count']}개 {result['new_bytes'] / 1024:.1f} KB 저장)"
+        )
+    }
+
+
+def create_backup(description: str = "", source: str = "manual") -> Dict[str, any]:
     """
-    데이터베이스 백업 생성
+    데이터베이스 백업 생성 (호출한 스레드에서 한 번에 복사)
 
     Args:
         description: 백업 설명 (선택)
+        source: 생성 경로 (카탈로그 기록용)
 
     Returns:
         dict: 백업 정보 (success, backup_file, message)
     """
     try:
-        db_path = get_db_path()
+        return _snapshot_backup(description, source)
 
-        # DB 파일 존재 확인
-        if not os.path.exists(db_path):
-            return {
-                'success': False,
-                'backup_file': None,
-                'message': f"데이터베이스 파일을 찾을 수 없습니다: {db_path}"
-            }
+    except Exception as e:
+        return {
+            'success': False,
+            'backup_file': None,
+            'message': f"백업 생성 중 오류 발생: {str(e)}"
+        }
 
-        # 백업 디렉토리 생성
-        backup_dir = ensure_backup_dir()
 
-        # 백업 파일명 생성 (타임스탬프)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"portfolios_{timestamp}.db"
-        backup_path = os.path.join(backup_dir, backup_filename)
+# ==================================================
+# 백그라운드 백업 작업
+# ==================================================
 
-        # 디스크 공간 확인 (DB 크기의 2배 이상 필요)
-        db_size = os.path.getsize(db_path)
-        stat = os.statvfs(backup_dir)
-        free_space = stat.f_bavail * stat.f_frsize
+# 진행 중이거나 마지막으로 끝난 백업 작업 상태 (프로세스 전체에서 하나만 실행)
+_job_lock = threading.Lock()
+_job: Optional[Dict[str, any]] = None
 
-        if free_space < db_size * 2:
-            return {
-                'success': False,
-                'backup_file': None,
-                'message': f"디스크 공간이 부족합니다. (필요: {db_size * 2 / 1024:.1f} KB, 사용 가능: {free_space / 1024:.1f} KB)"
-            }
+BACKUP_PHASE_LABELS = {
+    'pending': "대기 중",
+    'copy': "DB 복사 중",
+    'validate': "무결성 검사 중",
+    'store': "스냅샷 저장 중",
+}
 
-        # SQLite 백업 (안전한 방법)
-        # 파일 복사 대신 SQLite의 backup API 사용 (트랜잭션 안전)
-        source_conn = sqlite3.connect(db_path)
-        backup_conn = sqlite3.connect(backup_path)
 
-        with backup_conn:
-            source_conn.backup(backup_conn)
+def get_backup_job() -> Optional[Dict[str, any]]:
+    """
+    백그라운드 백업 작업 상태 조회
 
-        source_conn.close()
-        backup_conn.close()
+    Returns:
+        dict: 작업 상태 복사본 (job_id, status, phase, done, total, message,
+              started_at, finished_at, backup_file) - 실행한 적이 없으면 None
+    """
+    with _job_lock:
+        return dict(_job) if _job else None
 
-        # 백업 파일 검증
-        validation_result = validate_backup(backup_path)
-        if not validation_result['is_valid']:
-            # 검증 실패 시 백업 파일 삭제
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
+
+def _update_job(job_id: int, **fields):
+    """작업 상태 갱신 (다른 작업으로 바뀐 경우 무시)"""
+    with _job_lock:
+        if _job and _job['job_id'] == job_id:
+            _job.update(fields)
+
+
+def start_backup_job(description: str = "", source: str = "manual") -> Dict[str, any]:
+    """
+    백그라운드 스레드에서 백업 시작
+
+    DB를 페이지 단위로 나눠 복사하고(BACKUP_STEP_PAGES) 단계 사이에 쉬어서(BACKUP_STEP_SLEEP)
+    복사 중에도 사용자 쓰기가 계속 처리되게 한다. 검증과 스냅샷 저장도 같은 스레드에서 수행한다.
+
+    Args:
+        description: 백업 설명 (선택)
+        source: 생성 경로 ('manual', 'schedule')
+
+    Returns:
+        dict: {'success', 'message', 'job'} - 이미 실행 중이면 success False
+    """
+    global _job
+
+    with _job_lock:
+        if _job and _job['status'] == 'running':
             return {
                 'success': False,
-                'backup_file': None,
-                'message': f"백업 검증 실패: {validation_result['message']}"
+                'message': "이미 백업이 진행 중입니다.",
+                'job': dict(_job)
             }
 
-        # 백업 파일 크기 계산
-        backup_size = os.path.getsize(backup_path)
-
-        return {
-            'success': True,
-            'backup_file': backup_filename,
-            'backup_path': backup_path,
-            'size': backup_size,
-            'message': f"백업이 성공적으로 생성되었습니다. ({backup_size / 1024:.1f} KB)"
+        job_id = (_job['job_id'] + 1) if _job else 1
+        _job = {
+            'job_id': job_id,
+            'status': 'running',
+            'phase': 'pending',
+            'done': 0,
+            'total': 0,
+            'message': "",
+            'started_at': datetime.now(),
+            'finished_at': None,
+            'backup_file': None,
         }
+        job = dict(_job)
+
+    thread = threading.Thread(
+        target=_run_backup_job, args=(job_id, description, source),
+        name="backup-job", daemon=True
+    )
+    thread.start()
+
+    return {
+        'success': True,
+        'message': "백업을 시작했습니다.",
+        'job': job
+    }
 
+
+def _run_backup_job(job_id: int, description: str, source: str):
+    """백업 작업 스레드 본문"""
+    def progress(phase, done, total):
+        _update_job(job_id, phase=phase, done=done, total=total)
+
+    try:
+        result = _snapshot_backup(
+            description, source, progress=progress,
+            pages=get_backup_step_pages(), step_sleep=get_backup_step_sleep()
+        )
     except Exception as e:
-        return {
+        result = {
             'success': False,
             'backup_file': None,
             'message': f"백업 생성 중 오류 발생: {str(e)}"
         }
 
+    _update_job(
+        job_id,
+        status='done' if result['success'] else 'failed',
+        message=result['message'],
+        backup_file=result['backup_file'],
+        finished_at=datetime.now()
+    )
+
 
 # ==================================================
 # 백업 목록 조회
@@ -123,37 +263,23 @@ def create_backup(description: str = "") -> Dict[str, any]:
 
 def list_backups() -> List[Dict[str, any]]:
     """
-    백업 파일 목록 조회
+    백업 목록 조회 (카탈로그 쿼리 한 번)
 
     Returns:
-        list: 백업 파일 정보 목록 (파일명, 날짜, 크기 등)
+        list: 백업 정보 목록 (최신순, filename, filepath, kind, source, size, created_at, status 등)
     """
     try:
-        backup_dir = get_backup_dir()
-
-        if not os.path.exists(backup_dir):
+        if not os.path.exists(get_backup_dir()):
             return []
 
-        backups = []
-
-        # .db 파일만 필터링
-        for filename in os.listdir(backup_dir):
-            if filename.endswith('.db') and filename.startswith('portfolios_'):
-                filepath = os.path.join(backup_dir, filename)
-
-                # 파일 정보 수집
-                file_stat = os.stat(filepath)
-
-                backups.append({
-                    'filename': filename,
-                    'filepath': filepath,
-                    'size': file_stat.st_size,
-                    'created_at': datetime.fromtimestamp(file_stat.st_mtime),
-                    'created_timestamp': file_stat.st_mtime
-                })
+        # 이전 버전에서 만들었거나 밖에서 지운 파일은 프로세스당 한 번 카탈로그에 반영
+        sync_catalog()
+        backups = list_catalog()
 
-        # 최신순 정렬
-        backups.sort(key=lambda x: x['created_timestamp'], reverse=True)
+        # 검사가 끝나기 전에 프로세스가 재시작된 업로드는 다시 검사 예약
+        for backup in backups:
+            if backup['status'] == STATUS_VERIFYING:
+                _schedule_verification(backup['filename'])
 
         return backups
 
@@ -189,7 +315,36 @@ def restore_backup(backup_filename: str, create_safety_backup: bool = True) -> D
                 'message': f"백업 파일을 찾을 수 없습니다: {backup_filename}"
             }
 
-        # 백업 파일 검증
+        # 스냅샷은 임시 DB 파일로 복원한 뒤 같은 절차로 교체
+        if backup_filename.endswith(SNAPSHOT_EXT):
+            snapshot_path = os.path.join(backup_dir, f".restore_{os.path.splitext(backup_filename)[0]}.db")
+            try:
+                materialize_snapshot(backup_filename, snapshot_path)
+                result = _restore_from_file(snapshot_path, db_path, create_safety_backup)
+            finally:
+                if os.path.exists(snapshot_path):
+                    os.remove(snapshot_path)
+            return result
+
+        return _restore_from_file(backup_path, db_path, create_safety_backup)
+
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f"복원 중 오류 발생: {str(e)}"
+        }
+
+
+def _restore_from_file(backup_path: str, db_path: str, create_safety_backup: bool) -> Dict[str, any]:
+    """
+    백업 DB 파일의 내용을 현재 DB에 덮어쓰기
+
+    파일을 교체하지 않고 SQLite backup API로 열려 있는 DB에 페이지를 써 넣으므로, 복원은 한 트랜잭션으로
+    적용되고 실패하면 현재 DB가 그대로 남는다. 다른 세션의 연결은 잠금이 풀릴 때까지 기다렸다가
+    복원된 내용을 읽는다.
+    """
+    try:
+        # 백업 파일 검증 (복원 후에는 같은 내용이므로 다시 검사하지 않음)
         validation_result = validate_backup(backup_path)
         if not validation_result['is_valid']:
             return {
@@ -200,7 +355,7 @@ def restore_backup(backup_filename: str, create_safety_backup: bool = True) -> D
         # 안전 백업 생성 (복원 전 현재 DB 백업)
         safety_backup_info = None
         if create_safety_backup and os.path.exists(db_path):
-            safety_result = create_backup(description="복원 전 자동 백업")
+            safety_result = create_backup(description="복원 전 자동 백업", source='safety')
             if safety_result['success']:
                 safety_backup_info = safety_result['backup_file']
             else:
@@ -209,40 +364,22 @@ def restore_backup(backup_filename: str, create_safety_backup: bool = True) -> D
                     'message': f"안전 백업 생성 실패: {safety_result['message']}"
                 }
 
-        # 데이터베이스 복원 (파일 교체)
-        try:
-            # 기존 DB 파일 백업 (임시)
-            temp_db_path = db_path + ".temp"
-            if os.path.exists(db_path):
-                shutil.copy2(db_path, temp_db_path)
-
-            # 백업 파일로 복원
-            shutil.copy2(backup_path, db_path)
-
-            # 복원된 DB 검증
-            validation_result = validate_backup(db_path)
-            if not validation_result['is_valid']:
-                # 검증 실패 시 롤백
-                if os.path.exists(temp_db_path):
-                    shutil.copy2(temp_db_path, db_path)
-                raise Exception(f"복원된 DB 검증 실패: {validation_result['message']}")
-
-            # 임시 파일 삭제
-            if os.path.exists(temp_db_path):
-                os.remove(temp_db_path)
+        # 데이터베이스 복원 (backup API로 현재 DB에 기록)
+        copy_database(backup_path, db_path)
 
-            return {
-                'success': True,
-                'message': f"데이터베이스가 성공적으로 복원되었습니다.",
-                'safety_backup': safety_backup_info
-            }
+        # 복원된 DB에 누락된 마이그레이션 적용, 이전 DB 기준 세션/통계 캐시 비우기
+        from db.database import init_database
+        from auth.session_token import clear_session_cache
+        from utils.system_monitor import invalidate_stats_cache
+        init_database(force=True)
+        clear_session_cache()
+        invalidate_stats_cache()
 
-        except Exception as e:
-            # 복원 실패 시 롤백
-            if os.path.exists(temp_db_path):
-                shutil.copy2(temp_db_path, db_path)
-                os.remove(temp_db_path)
-            raise e
+        return {
+            'success': True,
+            'message': f"데이터베이스가 성공적으로 복원되었습니다.",
+            'safety_backup': safety_backup_info
+        }
 
     except Exception as e:
         return {
@@ -269,15 +406,20 @@ def delete_backup(backup_filename: str) -> Dict[str, any]:
         backup_dir = get_backup_dir()
         backup_path = os.path.join(backup_dir, backup_filename)
 
-        # 파일 존재 확인
+        # 파일 존재 확인 (이미 없으면 카탈로그에서만 제거)
         if not os.path.exists(backup_path):
+            remove_backups([backup_filename])
             return {
                 'success': False,
                 'message': f"백업 파일을 찾을 수 없습니다: {backup_filename}"
             }
 
-        # 파일 삭제
-        os.remove(backup_path)
+        # 파일 삭제 (스냅샷은 참조가 끊긴 청크도 정리, 카탈로그에서도 제거)
+        if backup_filename.endswith(SNAPSHOT_EXT):
+            delete_snapshot(backup_filename)
+        else:
+            os.remove(backup_path)
+            remove_backups([backup_filename])
 
         return {
             'success': True,
@@ -356,17 +498,106 @@ def validate_backup(backup_path: str) -> Dict[str, any]:
 # 백업 파일 업로드 및 저장
 # ==================================================
 
+# 업로드 파일 무결성 검사 (전체 integrity_check는 느리므로 업로드 요청과 분리해 하나씩 처리)
+_verify_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup-verify")
+_verify_lock = threading.Lock()
+_verifying = set()
+
+
+def quick_validate_backup(backup_path: str) -> Dict[str, any]:
+    """
+    백업 파일 빠른 검증 (SQLite 헤더와 필수 테이블만 확인, 전체 무결성 검사는 하지 않음)
+
+    Args:
+        backup_path: 검증할 백업 파일 경로
+
+    Returns:
+        dict: 검증 결과 (is_valid, message)
+    """
+    try:
+        with open(backup_path, 'rb') as f:
+            header = f.read(len(SQLITE_HEADER))
+        if header != SQLITE_HEADER:
+            return {
+                'is_valid': False,
+                'message': "SQLite 데이터베이스 파일이 아닙니다."
+            }
+
+        conn = sqlite3.connect(f"{Path(backup_path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+
+        missing = [table for table in REQUIRED_TABLES if table not in tables]
+        if missing:
+            return {
+                'is_valid': False,
+                'message': f"필수 테이블이 없습니다: {', '.join(missing)}"
+            }
+
+        return {
+            'is_valid': True,
+            'message': "백업 파일 형식이 정상입니다."
+        }
+
+    except sqlite3.DatabaseError as e:
+        return {
+            'is_valid': False,
+            'message': f"SQLite 오류: {str(e)}"
+        }
+    except Exception as e:
+        return {
+            'is_valid': False,
+            'message': f"검증 중 오류 발생: {str(e)}"
+        }
+
+
+def _schedule_verification(filename: str):
+    """업로드 백업 무결성 검사 예약 (이미 예약된 파일은 무시)"""
+    with _verify_lock:
+        if filename in _verifying:
+            return
+        _verifying.add(filename)
+    _verify_executor.submit(_verify_uploaded_backup, filename)
+
+
+def _verify_uploaded_backup(filename: str):
+    """백그라운드 무결성 검사 후 카탈로그 상태 갱신"""
+    try:
+        backup_path = os.path.join(get_backup_dir(), filename)
+        if not os.path.exists(backup_path):
+            remove_backups([filename])
+            return
+        result = validate_backup(backup_path)
+        set_backup_status(filename, STATUS_OK if result['is_valid'] else STATUS_INVALID)
+    except Exception as e:
+        print(f"백업 검사 중 오류: {str(e)}")
+        # verifying으로 남겨 두면 목록을 조회할 때마다 같은 검사가 다시 예약되므로 손상으로 표시
+        try:
+            set_backup_status(filename, STATUS_INVALID)
+        except Exception as status_error:
+            print(f"백업 상태 기록 중 오류: {str(status_error)}")
+    finally:
+        with _verify_lock:
+            _verifying.discard(filename)
+
+
 def save_uploaded_backup(uploaded_file, filename: str = None) -> Dict[str, any]:
     """
     업로드된 백업 파일 저장
 
+    업로드 내용을 청크 단위로 임시 파일에 쓰면서 SHA-256을 계산하고, 헤더와 스키마만 빠르게 확인한 뒤
+    저장한다. 전체 무결성 검사(integrity_check)는 백그라운드에서 수행하고 결과는 카탈로그 상태로 기록한다.
+
     Args:
-        uploaded_file: Streamlit UploadedFile 객체
+        uploaded_file: Streamlit UploadedFile 객체 (읽을 수 있는 바이너리 파일 객체)
         filename: 저장할 파일명 (None이면 타임스탬프 생성)
 
     Returns:
         dict: 저장 결과 (success, filename, message)
     """
+    temp_path = None
     try:
         backup_dir = ensure_backup_dir()
 
@@ -378,30 +609,52 @@ def save_uploaded_backup(uploaded_file, filename: str = None) -> Dict[str, any]:
         # 파일명 검증 (.db 확장자 강제)
         if not filename.endswith('.db'):
             filename += '.db'
+        filename = os.path.basename(filename)
 
         backup_path = os.path.join(backup_dir, filename)
 
-        # 파일 저장
-        with open(backup_path, 'wb') as f:
-            f.write(uploaded_file.getbuffer())
-
-        # 저장된 파일 검증
-        validation_result = validate_backup(backup_path)
+        # 임시 파일에 청크 단위로 저장 (전체 내용을 한 번 더 메모리에 올리지 않음)
+        fd, temp_path = tempfile.mkstemp(prefix=".upload_", suffix=".db", dir=backup_dir)
+        file_hash = hashlib.sha256()
+        size = 0
+        uploaded_file.seek(0)
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                data = uploaded_file.read(UPLOAD_CHUNK_SIZE)
+                if not data:
+                    break
+                if size == 0 and not data.startswith(SQLITE_HEADER):
+                    return {
+                        'success': False,
+                        'filename': None,
+                        'message': "업로드된 파일 검증 실패: SQLite 데이터베이스 파일이 아닙니다."
+                    }
+                file_hash.update(data)
+                f.write(data)
+                size += len(data)
+
+        # 빠른 검증 (헤더, 필수 테이블)
+        validation_result = quick_validate_backup(temp_path)
         if not validation_result['is_valid']:
-            # 검증 실패 시 파일 삭제
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
             return {
                 'success': False,
                 'filename': None,
                 'message': f"업로드된 파일 검증 실패: {validation_result['message']}"
             }
 
+        os.replace(temp_path, backup_path)
+        temp_path = None
+
+        record_backup(filename, 'file', size, source='upload',
+                      status=STATUS_VERIFYING, sha256=file_hash.hexdigest())
+        _schedule_verification(filename)
+
         return {
             'success': True,
             'filename': filename,
             'filepath': backup_path,
-            'message': f"백업 파일이 업로드되었습니다: {filename}"
+            'sha256': file_hash.hexdigest(),
+            'message': f"백업 파일이 업로드되었습니다: {filename} (무결성 검사는 백그라운드에서 진행됩니다)"
         }
 
     except Exception as e:
@@ -410,6 +663,9 @@ def save_uploaded_backup(uploaded_file, filename: str = None) -> Dict[str, any]:
             'filename': None,
             'message': f"파일 업로드 중 오류 발생: {str(e)}"
         }
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 # ==================================================
@@ -418,29 +674,37 @@ def save_uploaded_backup(uploaded_file, filename: str = None) -> Dict[str, any]:
 
 def get_backup_stats() -> Dict[str, any]:
     """
-    백업 통계 정보 반환
+    백업 통계 정보 반환 (카탈로그 집계 쿼리 1회)
 
     Returns:
         dict: 백업 통계 (총 개수, 총 크기, 가장 최근 백업 날짜)
     """
-    backups = list_backups()
+    try:
+        if not os.path.exists(get_backup_dir()):
+            return {
+                'count': 0,
+                'total_size': 0,
+                'latest_backup': None
+            }
+
+        sync_catalog()
+        stats = get_catalog_stats()
+
+        # 스냅샷은 청크를 공유하므로 실제 저장소 사용량으로 계산
+        return {
+            'count': stats['count'],
+            'total_size': stats['file_bytes'] + stats['store_bytes'],
+            'latest_backup': stats['latest_backup']
+        }
 
-    if not backups:
+    except Exception as e:
+        print(f"백업 통계 조회 중 오류: {str(e)}")
         return {
             'count': 0,
             'total_size': 0,
             'latest_backup': None
         }
 
-    total_size = sum(b['size'] for b in backups)
-    latest_backup = backups[0]['created_at'] if backups else None
-
-    return {
-        'count': len(backups),
-        'total_size': total_size,
-        'latest_backup': latest_backup
-    }
-
 
 def format_file_size(size_bytes: int) -> str:
     """
@@ -0,0 +1,243 @@
+"""프로세스 내 자동 백업 스케줄러와 GFS 보관 정책
+
+BACKUP_SCHEDULE(off/hourly/daily/weekly)에 따라 데몬 스레드가 백그라운드 백업 작업을 실행하고,
+끝나면 자동 백업 스냅샷에 GFS(grandfather-father-son) 보관 정책을 적용한다.
+다음 실행 시각은 카탈로그의 마지막 자동 백업 시각 기준이므로 앱을 재시작해도 백업이 몰리지 않는다.
+수동/안전/업로드 백업은 보관 정책 대상이 아니다.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from utils.backup_catalog import list_catalog, get_latest_backup_time, sync_catalog
+from utils.backup_manager import start_backup_job, get_backup_job
+from utils.backup_store import delete_snapshots
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_INTERVALS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+SCHEDULE_LABELS = {
+    'off': "사용 안 함",
+    'hourly': "매시간",
+    'daily': "매일",
+    'weekly': "매주",
+}
+
+# 자동 백업 실패(다른 백업 진행 중, 디스크 부족 등) 시 다시 시도하기까지 대기 시간
+RETRY_SECONDS = 300
+# 다른 프로세스의 백업이나 시계 변경을 반영하도록 최대 이 간격으로 일정을 다시 계산
+MAX_WAIT_SECONDS = 600
+
+_scheduler_lock = threading.Lock()
+_scheduler_thread = None
+_stop_event = threading.Event()
+
+
+# ==================================================
+# 설정
+# ==================================================
+
+def get_backup_schedule() -> str:
+    """자동 백업 주기 ('off', 'hourly', 'daily', 'weekly')"""
+    schedule = os.environ.get("BACKUP_SCHEDULE", "off").strip().lower()
+    return schedule if schedule in SCHEDULE_INTERVALS else 'off'
+
+
+def get_retention_policy() -> Dict[str, int]:
+    """GFS 보관 개수 (시간별/일별/주별/월별로 각 구간의 최신 스냅샷을 몇 개 남길지)"""
+    return {
+        'hourly': int(os.environ.get("BACKUP_KEEP_HOURLY", "24")),
+        'daily': int(os.environ.get("BACKUP_KEEP_DAILY", "7")),
+        'weekly': int(os.environ.get("BACKUP_KEEP_WEEKLY", "4")),
+        'monthly': int(os.environ.get("BACKUP_KEEP_MONTHLY", "12")),
+    }
+
+
+# ==================================================
+# GFS 보관 정책
+# ==================================================
+
+_GFS_BUCKETS = (
+    ('hourly', lambda t: (t.year, t.month, t.day, t.hour)),
+    ('daily', lambda t: (t.year, t.month, t.day)),
+    ('weekly', lambda t: t.isocalendar()[:2]),
+    ('monthly', lambda t: (t.year, t.month)),
+)
+
+
+def select_gfs_keep(entries: List[Dict[str, any]], policy: Dict[str, int]) -> Set[str]:
+    """
+    GFS 정책으로 남길 백업 선택
+
+    구간(시/일/주/월)마다 가장 최근 백업 하나씩을, 최근 구간부터 정책 개수만큼 남긴다.
+    한 백업이 여러 구간에서 선택될 수 있다.
+
+    Args:
+        entries: 최신순 백업 목록 ({'filename', 'created_at'})
+        policy: get_retention_policy() 형식
+
+    Returns:
+        set: 남길 파일명
+    """
+    keep = set()
+    for level, bucket_of in _GFS_BUCKETS:
+        limit = policy.get(level, 0)
+        if limit <= 0:
+            continue
+        buckets = set()
+        for entry in entries:
+            bucket = bucket_of(entry['created_at'])
+            if bucket in buckets:
+                continue
+            if len(buckets) >= limit:
+                break
+            buckets.add(bucket)
+            keep.add(entry['filename'])
+    return keep
+
+
+def apply_retention(policy: Dict[str, int] = None) -> List[str]:
+    """
+    자동 백업 스냅샷에 GFS 보관 정책 적용
+
+    카탈로그 조회 한 번으로 대상을 고르고, 매니페스트 삭제 후 청크 정리는 한 번만 수행한다.
+
+    Returns:
+        list: 삭제한 스냅샷 파일명
+    """
+    policy = policy or get_retention_policy()
+    sync_catalog()
+    entries = list_catalog(kind='snapshot', source='schedule')
+    keep = select_gfs_keep(entries, policy)
+    removed = [entry['filename'] for entry in entries if entry['filename'] not in keep]
+    if removed:
+        delete_snapshots(removed)
+    return removed
+
+
+# ==================================================
+# 스케줄러
+# ==================================================
+
+def get_next_run(schedule: str = None) -> Optional[datetime]:
+    """다음 자동 백업 예정 시각 (사용 안 함이면 None)"""
+    schedule = schedule or get_backup_schedule()
+    if schedule not in SCHEDULE_INTERVALS:
+        return None
+    last = get_latest_backup_time(source='schedule')
+    if last is None:
+        return datetime.now()
+    return last + SCHEDULE_INTERVALS[schedule]
+
+
+def run_scheduled_backup() -> Dict[str, any]:
+    """
+    자동 백업 1회 실행 (백그라운드 백업 작업이 끝날 때까지 대기 후 보관 정책 적용)
+
+    Returns:
+        dict: {'success', 'message', 'pruned'}
+    """
+    started = start_backup_job(description="자동 백업", source='schedule')
+    if not started['success']:
+        return {'success': False, 'message': started['message'], 'pruned': []}
+
+    job_id = started['job']['job_id']
+    while True:
+        job = get_backup_job()
+        if job is None or job['job_id'] != job_id or job['status'] != 'running':
+            break
+        time.sleep(1.0)
+
+    if not job or job['job_id'] != job_id or job['status'] != 'done':
+        return {'success': False, 'message': job['message'] if job else "", 'pruned': []}
+
+    pruned = apply_retention()
+    return {'success': True, 'message': job['message'], 'pruned': pruned}
+
+
+def _scheduler_loop(schedule: str):
+    """스케줄러 스레드 본문"""
+    while not _stop_event.is_set():
+        try:
+            wait = (get_next_run(schedule) - datetime.now()).total_seconds()
+        except Exception as e:
+            logger.warning(f"Backup schedule check failed: {e}")
+            wait = RETRY_SECONDS
+
+        if wait > 0:
+            _stop_event.wait(min(wait, MAX_WAIT_SECONDS))
+            continue
+
+        try:
+            result = run_scheduled_backup()
+        except Exception as e:
+            result = {'success': False, 'message': str(e), 'pruned': []}
+
+        if result['success']:
+            logger.info(f"Scheduled backup done: {result['message']} (pruned {len(result['pruned'])})")
+        else:
+            logger.warning(f"Scheduled backup failed: {result['message']}")
+            _stop_event.wait(RETRY_SECONDS)
+
+
+def start_backup_scheduler():
+    """
+    자동 백업 스케줄러 시작 (프로세스당 한 번, 이미 실행 중이면 기존 스레드 반환)
+
+    Returns:
+        threading.Thread or None: BACKUP_SCHEDULE이 off면 None
+    """
+    global _scheduler_thread
+
+    with _scheduler_lock:
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            return _scheduler_thread
+
+        schedule = get_backup_schedule()
+        if schedule == 'off':
+            return None
+
+        _stop_event.clear()
+        thread = threading.Thread(target=_scheduler_loop, args=(schedule,), name="backup-scheduler", daemon=True)
+        thread.start()
+        _scheduler_thread = thread
+        logger.info(f"Backup scheduler started ({schedule})")
+        return thread
+
+
+def stop_backup_scheduler(timeout: float = None):
+    """스케줄러 중지 (진행 중인 백업 작업은 끝까지 실행됨)"""
+    global _scheduler_thread
+
+    with _scheduler_lock:
+        thread = _scheduler_thread
+        _scheduler_thread = None
+    _stop_event.set()
+    if thread is not None:
+        thread.join(timeout)
+
+
+def get_scheduler_status() -> Dict[str, any]:
+    """
+    Admin Panel 표시용 스케줄러 상태
+
+    Returns:
+        dict: {'schedule', 'label', 'running', 'last_run', 'next_run', 'policy'}
+    """
+    schedule = get_backup_schedule()
+    return {
+        'schedule': schedule,
+        'label': SCHEDULE_LABELS[schedule],
+        'running': _scheduler_thread is not None and _scheduler_thread.is_alive(),
+        'last_run': get_latest_backup_time(source='schedule'),
+        'next_run': get_next_run(schedule),
+        'policy': get_retention_policy(),
+    }
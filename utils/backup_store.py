@@ -0,0 +1,634 @@
+"""증분 백업 저장소 (내용 주소 방식 청크 + 스냅샷 매니페스트)
+
+DB 파일을 페이지 경계에 맞춘 청크로 나누고, 청크는 SHA-256 해시를 이름으로 압축해 한 번만 저장한다.
+스냅샷(.snap)은 청크 해시 목록을 담은 JSON 매니페스트이므로 바뀌지 않은 페이지는 스냅샷끼리 공유되고,
+새 백업의 저장 용량과 압축 시간은 바뀐 데이터 양에 비례한다.
+
+저장 구조 (BACKUP_DIR):
+    portfolios_YYYYmmdd_HHMMSS.snap     스냅샷 매니페스트
+    chunks/ab/abcdef....zst (.gz)      압축된 청크 (zstandard가 없으면 gzip)
+
+명령행 (backup.sh에서 사용):
+    python -m utils.backup_store create [--db PATH] [--description TEXT]
+    python -m utils.backup_store list
+    python -m utils.backup_store restore NAME --output PATH
+    python -m utils.backup_store prune --days 30
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안에서만 직렬화
+    fcntl = None
+
+SNAPSHOT_EXT = ".snap"
+CHUNK_DIR = "chunks"
+MANIFEST_FORMAT = 1
+CODEC_EXTENSIONS = {'zstd': ".zst", 'gzip': ".gz"}
+
+# 참조되지 않은 청크라도 이 시간 안에 쓰이거나 재사용된 것은 주기 정리에서 제외한다
+# (청크 기록과 정리는 저장소 잠금으로 직렬화되며, 유예 시간은 잠금을 쓰지 않는 도구에 대한 안전장치)
+GC_GRACE_SECONDS = 3600
+# 청크 기록(스냅샷 저장)과 정리를 프로세스 사이에서도 직렬화하는 잠금 파일 (앱과 backup.sh CLI가 함께 사용)
+STORE_LOCK_FILE = ".store.lock"
+
+_store_lock = threading.Lock()
+
+
+# ==================================================
+# 설정
+# ==================================================
+
+def get_db_path():
+    """데이터베이스 파일 경로 반환"""
+    return os.environ.get("DATABASE_PATH", "./data/portfolios.db")
+
+
+def get_backup_dir():
+    """백업 디렉토리 경로 반환"""
+    return os.environ.get("BACKUP_DIR", "./backups")
+
+
+def get_chunk_size() -> int:
+    """청크 크기 (바이트, 실제로는 DB 페이지 크기의 배수로 맞춤)"""
+    return int(os.environ.get("BACKUP_CHUNK_SIZE", 64 * 1024))
+
+
+def get_codec() -> str:
+    """
+    청크 압축 방식
+
+    BACKUP_COMPRESSION이 'gzip'이거나 zstandard 패키지가 없으면 gzip, 아니면 zstd.
+    """
+    preferred = os.environ.get("BACKUP_COMPRESSION", "auto").lower()
+    if preferred == "gzip":
+        return "gzip"
+    try:
+        import zstandard  # noqa: F401
+        return "zstd"
+    except ImportError:
+        return "gzip"
+
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress
+    return lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+# ==================================================
+# 청크
+# ==================================================
+
+@contextmanager
+def _store_guard(backup_dir: str):
+    """
+    저장소 잠금 (스레드는 _store_lock, 프로세스는 BACKUP_DIR/.store.lock flock)
+
+    스냅샷 저장은 청크를 쓰고 매니페스트를 기록할 때까지 잠금을 유지하므로,
+    정리(collect_garbage)가 아직 매니페스트에 없는 새 청크를 지우지 않는다.
+    """
+    with _store_lock:
+        os.makedirs(backup_dir, exist_ok=True)
+        with open(os.path.join(backup_dir, STORE_LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _chunk_path(backup_dir: str, digest: str, codec: str) -> str:
+    return os.path.join(backup_dir, CHUNK_DIR, digest[:2], digest + CODEC_EXTENSIONS[codec])
+
+
+def _find_chunk(backup_dir: str, digest: str):
+    """저장된 청크 (경로, 압축 방식) - 없으면 (None, None)"""
+    for codec in CODEC_EXTENSIONS:
+        path = _chunk_path(backup_dir, digest, codec)
+        if os.path.exists(path):
+            return path, codec
+    return None, None
+
+
+def _store_chunk(backup_dir: str, digest: str, data: bytes, codec: str, compress) -> int:
+    """
+    청크 저장 (이미 있으면 수정 시각만 갱신)
+
+    Returns:
+        int: 새로 기록한 바이트 수 (이미 있으면 0)
+    """
+    existing, _ = _find_chunk(backup_dir, digest)
+    if existing:
+        os.utime(existing)  # 정리 유예 시간 갱신
+        return 0
+
+    path = _chunk_path(backup_dir, digest, codec)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = compress(data)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+
+def _read_page_size(path: str) -> int:
+    """SQLite 헤더의 페이지 크기 (헤더가 아니면 4096)"""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+        return 4096
+    page_size = int.from_bytes(header[16:18], "big")
+    return 65536 if page_size == 1 else page_size
+
+
+# ==================================================
+# 스냅샷
+# ==================================================
+
+def _manifest_path(backup_dir: str, name: str) -> str:
+    if not name.endswith(SNAPSHOT_EXT):
+        name += SNAPSHOT_EXT
+    return os.path.join(backup_dir, os.path.basename(name))
+
+
+def store_snapshot(source_path: str, name: str, description: str = "", progress=None,
+                   source: str = "manual") -> Dict[str, any]:
+    """
+    일관된 DB 파일(백업 API로 만든 복사본 등)을 스냅샷으로 저장
+
+    Args:
+        source_path: 저장할 DB 파일 (저장 중 변경되지 않아야 함)
+        name: 스냅샷 이름 (확장자 제외)
+        description: 설명
+        progress: 진행 콜백 (done_bytes, total_bytes)
+        source: 생성 경로 (카탈로그 기록용, 'manual', 'schedule', 'safety', 'cli')
+
+    Returns:
+        dict: {'filename', 'filepath', 'db_size', 'chunk_count', 'new_chunks', 'new_bytes'}
+    """
+    backup_dir = get_backup_dir()
+    os.makedirs(os.path.join(backup_dir, CHUNK_DIR), exist_ok=True)
+
+    page_size = _read_page_size(source_path)
+    chunk_size = max(page_size, get_chunk_size() // page_size * page_size)
+    codec = get_codec()
+    compress = _compressor(codec)
+
+    digests = []
+    db_size = 0
+    new_chunks = 0
+    new_bytes = 0
+    file_hash = hashlib.sha256()
+    total_size = os.path.getsize(source_path)
+
+    with _store_guard(backup_dir), open(source_path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            db_size += len(data)
+            file_hash.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            written = _store_chunk(backup_dir, digest, data, codec, compress)
+            if written:
+                new_chunks += 1
+                new_bytes += written
+            digests.append(digest)
+            if progress:
+                progress(db_size, total_size)
+
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'name': name,
+            'created_at': datetime.now().isoformat(timespec="seconds"),
+            'description': description,
+            'source': source,
+            'db_size': db_size,
+            'page_size': page_size,
+            'chunk_size': chunk_size,
+            'codec': codec,
+            'sha256': file_hash.hexdigest(),
+            'chunks': digests
+        }
+        path = _manifest_path(backup_dir, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as mf:
+            json.dump(manifest, mf)
+        os.replace(tmp_path, path)
+
+    from utils.backup_catalog import record_backup, adjust_store_usage
+    record_backup(os.path.basename(path), 'snapshot', db_size,
+                  datetime.fromisoformat(manifest['created_at']), description, source)
+    adjust_store_usage(new_bytes + os.path.getsize(path))
+
+    return {
+        'filename': os.path.basename(path),
+        'filepath': path,
+        'db_size': manifest['db_size'],
+        'chunk_count': len(digests),
+        'new_chunks': new_chunks,
+        'new_bytes': new_bytes
+    }
+
+
+class _TooManyRestarts(Exception):
+    """단계 복사가 원본 변경으로 계속 처음부터 다시 시작되는 경우"""
+
+
+def copy_database(source_path: str, dest_path: str, pages: int = -1, progress=None,
+                  step_sleep: float = 0.0, max_restarts: int = 3):
+    """
+    SQLite 백업 API로 일관된 DB 복사본 생성
+
+    pages > 0이면 pages 페이지씩 나눠 복사하고 단계 사이에 step_sleep초 쉬어
+    다른 연결의 쓰기가 계속 진행되게 한다. 복사 중 다른 연결이 원본을 바꾸면 SQLite가 처음부터
+    다시 복사하므로, max_restarts번 넘게 다시 시작되면 남은 복사는 한 번에 끝낸다.
+
+    Args:
+        source_path: 원본 DB
+        dest_path: 복사본 경로
+        pages: 단계당 복사할 페이지 수 (-1이면 한 번에)
+        progress: 진행 콜백 (done_pages, total_pages)
+        step_sleep: 단계 사이 대기 시간 (초)
+        max_restarts: 단계 복사 재시작 허용 횟수
+    """
+    state = {'remaining': None, 'restarts': 0}
+
+    def on_step(status, remaining, total):
+        # 남은 페이지가 줄지 않았으면 원본이 바뀌어 처음부터 다시 복사한 것
+        if state['remaining'] is not None and remaining >= state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise _TooManyRestarts()
+        state['remaining'] = remaining
+        if progress:
+            progress(total - remaining, total)
+        if step_sleep and remaining:
+            time.sleep(step_sleep)
+
+    source_conn = sqlite3.connect(source_path, timeout=30)
+    backup_conn = sqlite3.connect(dest_path)
+    try:
+        try:
+            with backup_conn:
+                source_conn.backup(backup_conn, pages=pages,
+                                   progress=on_step if (pages > 0 or progress) else None)
+        except _TooManyRestarts:
+            with backup_conn:
+                source_conn.backup(backup_conn)
+            if progress:
+                progress(1, 1)
+    finally:
+        source_conn.close()
+        backup_conn.close()
+
+
+def create_snapshot(db_path: str = None, description: str = "", validate=None,
+                    progress=None, pages: int = -1, step_sleep: float = 0.0,
+                    source: str = "manual") -> Dict[str, any]:
+    """
+    현재 DB의 스냅샷 생성
+
+    백업 API로 임시 복사본을 만든 뒤(라이브 DB 파일을 직접 읽으면 SQLite 잠금이 풀릴 수 있음)
+    청크로 나눠 저장하고 임시 파일은 삭제한다.
+
+    Args:
+        db_path: 원본 DB (기본: DATABASE_PATH)
+        description: 설명
+        validate: 임시 복사본 검증 함수 (path -> {'is_valid', 'message'}), None이면 생략
+        progress: 진행 콜백 (phase, done, total) - phase는 'copy', 'validate', 'store'
+        pages, step_sleep: copy_database 단계 복사 설정
+        source: 생성 경로 (카탈로그 기록용)
+
+    Returns:
+        dict: store_snapshot 결과 + 'success', 'message'
+    """
+    db_path = db_path or get_db_path()
+    if not os.path.exists(db_path):
+        return {'success': False, 'message': f"데이터베이스 파일을 찾을 수 없습니다: {db_path}"}
+
+    backup_dir = get_backup_dir()
+    os.makedirs(backup_dir, exist_ok=True)
+
+    name = f"portfolios_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if os.path.exists(_manifest_path(backup_dir, name)):
+        name += f"_{int(time.time() * 1000) % 1000:03d}"
+
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot_", suffix=".db", dir=backup_dir)
+    os.close(fd)
+    try:
+        copy_database(db_path, temp_path, pages=pages, step_sleep=step_sleep,
+                      progress=(lambda done, total: progress('copy', done, total)) if progress else None)
+
+        if validate is not None:
+            if progress:
+                progress('validate', 0, 1)
+            validation = validate(temp_path)
+            if not validation['is_valid']:
+                return {'success': False, 'message': f"백업 검증 실패: {validation['message']}"}
+
+        result = store_snapshot(temp_path, name, description,
+                                progress=(lambda done, total: progress('store', done, total)) if progress else None,
+                                source=source)
+        result['success'] = True
+        result['message'] = (
+            f"스냅샷이 생성되었습니다. (DB {result['db_size'] / 1024:.1f} KB, "
+            f"새 청크 {result['new_chunks']}/{result['chunk_count']}개, {result['new_bytes'] / 1024:.1f} KB 저장)"
+        )
+        return result
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def read_manifest(name: str) -> Dict[str, any]:
+    """스냅샷 매니페스트 읽기 (없으면 FileNotFoundError)"""
+    with open(_manifest_path(get_backup_dir(), name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_snapshots() -> List[Dict[str, any]]:
+    """
+    스냅샷 목록 (최신순)
+
+    Returns:
+        list: [{'filename', 'filepath', 'db_size', 'created_at'(datetime), 'description'}, ...]
+    """
+    backup_dir = get_backup_dir()
+    if not os.path.isdir(backup_dir):
+        return []
+
+    snapshots = []
+    for entry in os.scandir(backup_dir):
+        if not entry.name.endswith(SNAPSHOT_EXT):
+            continue
+        try:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            snapshots.append({
+                'filename': entry.name,
+                'filepath': entry.path,
+                'db_size': manifest['db_size'],
+                'created_at': datetime.fromisoformat(manifest['created_at']),
+                'description': manifest.get('description', '')
+            })
+        except (OSError, ValueError, KeyError):
+            continue
+
+    snapshots.sort(key=lambda s: s['created_at'], reverse=True)
+    return snapshots
+
+
+def iter_snapshot_chunks(name: str):
+    """
+    스냅샷 내용을 청크 단위로 반환 (청크 해시 검증 포함)
+
+    Raises:
+        ValueError: 청크가 없거나 손상된 경우
+    """
+    backup_dir = get_backup_dir()
+    manifest = read_manifest(name)
+    for digest in manifest['chunks']:
+        path, codec = _find_chunk(backup_dir, digest)
+        if path is None:
+            raise ValueError(f"청크가 없습니다: {digest[:12]}")
+        with open(path, "rb") as f:
+            try:
+                data = _decompress(codec, f.read())
+            except Exception:
+                raise ValueError(f"청크가 손상되었습니다: {digest[:12]}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"청크가 손상되었습니다: {digest[:12]}")
+        yield data
+
+
+def materialize_snapshot(name: str, dest_path: str) -> str:
+    """
+    스냅샷을 DB 파일로 복원해 dest_path에 기록
+
+    Returns:
+        str: dest_path
+
+    Raises:
+        ValueError: 청크 누락/손상 또는 전체 해시 불일치
+    """
+    manifest = read_manifest(name)
+    file_hash = hashlib.sha256()
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for data in iter_snapshot_chunks(name):
+                file_hash.update(data)
+                f.write(data)
+        if file_hash.hexdigest() != manifest['sha256']:
+            raise ValueError("스냅샷 전체 해시가 일치하지 않습니다.")
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dest_path
+
+
+def read_snapshot_bytes(name: str) -> bytes:
+    """스냅샷을 DB 파일 내용(bytes)으로 반환 (다운로드용)"""
+    return b"".join(iter_snapshot_chunks(name))
+
+
+def collect_garbage(grace_seconds: int = GC_GRACE_SECONDS) -> Dict[str, int]:
+    """
+    어떤 스냅샷도 참조하지 않는 청크 삭제
+
+    저장소 잠금 안에서 수행하므로 다른 스레드/프로세스가 저장 중인 스냅샷의 청크는 지우지 않는다.
+
+    Args:
+        grace_seconds: 이 시간 안에 쓰이거나 재사용된 청크는 남김 (스냅샷 삭제 직후에는 0)
+
+    Returns:
+        dict: {'removed', 'freed_bytes'}
+    """
+    backup_dir = get_backup_dir()
+    chunk_root = os.path.join(backup_dir, CHUNK_DIR)
+    removed = 0
+    freed = 0
+    if not os.path.isdir(chunk_root):
+        return {'removed': 0, 'freed_bytes': 0}
+
+    with _store_guard(backup_dir):
+        referenced = set()
+        for entry in os.scandir(backup_dir):
+            if entry.name.endswith(SNAPSHOT_EXT):
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        referenced.update(json.load(f)['chunks'])
+                except (OSError, ValueError, KeyError):
+                    # 읽을 수 없는 매니페스트가 있으면 잘못 지우지 않도록 중단
+                    return {'removed': 0, 'freed_bytes': 0}
+
+        cutoff = time.time() - grace_seconds
+        for prefix in os.scandir(chunk_root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                digest = entry.name.split(".", 1)[0]
+                try:
+                    stat = entry.stat()
+                    if digest in referenced or stat.st_mtime > cutoff:
+                        continue
+                    os.remove(entry.path)
+                    removed += 1
+                    freed += stat.st_size
+                except OSError:
+                    continue
+
+    from utils.backup_catalog import adjust_store_usage
+    adjust_store_usage(-freed)
+    return {'removed': removed, 'freed_bytes': freed}
+
+
+def delete_snapshots(names: List[str], collect: bool = True) -> Dict[str, any]:
+    """
+    여러 스냅샷 삭제 (매니페스트 삭제, 카탈로그 반영과 청크 정리는 한 번씩)
+
+    Returns:
+        dict: {'removed', 'freed_bytes'} (collect=False면 0)
+    """
+    from utils.backup_catalog import remove_backups, adjust_store_usage
+
+    backup_dir = get_backup_dir()
+    freed = 0
+    for name in names:
+        path = _manifest_path(backup_dir, name)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            pass
+    remove_backups([os.path.basename(_manifest_path(backup_dir, name)) for name in names])
+    adjust_store_usage(-freed)
+
+    if collect and names:
+        return collect_garbage(grace_seconds=0)
+    return {'removed': 0, 'freed_bytes': 0}
+
+
+def delete_snapshot(name: str, collect: bool = True) -> Dict[str, any]:
+    """
+    스냅샷 삭제 (매니페스트 삭제 후 참조가 끊긴 청크 정리)
+
+    Returns:
+        dict: {'removed', 'freed_bytes'} (collect=False면 0)
+    """
+    path = _manifest_path(get_backup_dir(), name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return delete_snapshots([name], collect=collect)
+
+
+def get_store_usage() -> int:
+    """스냅샷 저장소가 실제로 차지하는 바이트 수 (청크 + 매니페스트)"""
+    backup_dir = get_backup_dir()
+    total = 0
+    if not os.path.isdir(backup_dir):
+        return 0
+    for entry in os.scandir(backup_dir):
+        if entry.name.endswith(SNAPSHOT_EXT):
+            total += entry.stat().st_size
+    chunk_root = os.path.join(backup_dir, CHUNK_DIR)
+    if os.path.isdir(chunk_root):
+        for prefix in os.scandir(chunk_root):
+            if prefix.is_dir():
+                total += sum(e.stat().st_size for e in os.scandir(prefix.path))
+    return total
+
+
+def prune_snapshots(days: int) -> List[str]:
+    """
+    days일보다 오래된 스냅샷 삭제 (카탈로그 조회 한 번, 청크 정리 한 번)
+
+    Returns:
+        list: 삭제한 스냅샷 파일명
+    """
+    from utils.backup_catalog import sync_catalog, list_catalog
+
+    sync_catalog()
+    cutoff = datetime.now() - timedelta(days=days)
+    removed = [entry['filename'] for entry in list_catalog(kind='snapshot', before=cutoff)]
+    delete_snapshots(removed)
+    return removed
+
+
+# ==================================================
+# 명령행
+# ==================================================
+
+def main():
+    """백업 스크립트용 명령행"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Invest Lab 증분 백업")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    create = sub.add_parser("create", help="스냅샷 생성")
+    create.add_argument("--db", help="DB 경로 (기본: DATABASE_PATH)")
+    create.add_argument("--description", default="", help="설명")
+
+    sub.add_parser("list", help="스냅샷 목록")
+
+    restore = sub.add_parser("restore", help="스냅샷을 DB 파일로 복원")
+    restore.add_argument("name", help="스냅샷 파일명")
+    restore.add_argument("--output", required=True, help="출력 DB 경로 (실행 중인 DB가 아닌 경로)")
+
+    prune = sub.add_parser("prune", help="오래된 스냅샷 삭제 및 청크 정리")
+    prune.add_argument("--days", type=int, default=30, help="보관 기간 (일)")
+
+    args = parser.parse_args()
+
+    if args.command == "create":
+        result = create_snapshot(args.db, args.description, source='cli')
+        if not result['success']:
+            print(f"[ERROR] {result['message']}")
+            sys.exit(1)
+        print(f"[SUCCESS] {result['filename']}: {result['message']}")
+
+    elif args.command == "list":
+        for snapshot in list_snapshots():
+            print(f"   {snapshot['filename']}  {snapshot['created_at']:%Y-%m-%d %H:%M}  "
+                  f"{snapshot['db_size'] / 1024:.1f} KB")
+        print(f"[INFO] 저장소 사용량: {get_store_usage() / 1024:.1f} KB")
+
+    elif args.command == "restore":
+        materialize_snapshot(args.name, args.output)
+        print(f"[SUCCESS] {args.output}")
+
+    elif args.command == "prune":
+        removed = prune_snapshots(args.days)
+        print(f"[INFO] {len(removed)}개의 오래된 스냅샷 삭제됨")
+
+
+if __name__ == "__main__":
+    main()
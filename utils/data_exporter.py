@@ -1,260 +1,280 @@
 """데이터 내보내기 및 가져오기"""
 
+import os
 import json
 import csv
 import io
+import time
 import zipfile
+import tempfile
+from itertools import islice
 from datetime import datetime
 from typing import Dict, List, Optional
-from db.models import (
-    db_query, db_transaction,
-    get_all_users, get_all_portfolios,
-    save_portfolio, add_to_watchlist, save_stock_note
-)
+from config import IMPORT_BATCH_SIZE, EXPORT_FILE_TTL
+from db.database import portfolio_asset_to_row
+from db.models import db_transaction, db_iter, get_all_users, iter_all_portfolios_with_data
 
 
 # ==================================================
 # 데이터 내보내기
 # ==================================================
 
-def export_portfolios_to_json() -> Dict[str, any]:
-    """
-    모든 포트폴리오를 JSON 형식으로 내보내기
+# 내보내기 파일은 임시 폴더에 쓰고 (st.download_button에 파일로 전달) EXPORT_FILE_TTL 후 정리한다
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "invest_lab_exports")
 
-    Returns:
-        dict: 내보내기 결과 (success, data, message)
-    """
-    try:
-        portfolios = get_all_portfolios()
-
-        # 포트폴리오 데이터 구조화
-        export_data = []
-        for portfolio in portfolios:
-            export_data.append({
-                'username': portfolio['username'],
-                'portfolio_name': portfolio['portfolio_name'],
-                'portfolio_data': portfolio.get('portfolio_data', ''),
-                'created_at': portfolio.get('created_at', ''),
-                'updated_at': portfolio.get('updated_at', '')
-            })
-
-        # JSON 문자열 생성
-        json_string = json.dumps(export_data, ensure_ascii=False, indent=2)
+PORTFOLIO_HEADERS = ['username', 'portfolio_name', 'portfolio_data', 'created_at', 'updated_at']
+WATCHLIST_HEADERS = ['username', 'ticker', 'name', 'currency', 'created_at']
+STOCK_NOTES_HEADERS = ['username', 'ticker', 'name', 'note_content', 'created_at', 'updated_at']
 
-        return {
-            'success': True,
-            'data': json_string,
-            'filename': f"portfolios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            'count': len(export_data),
-            'message': f"{len(export_data)}개의 포트폴리오를 내보냈습니다."
-        }
 
-    except Exception as e:
-        return {
-            'success': False,
-            'data': None,
-            'message': f"내보내기 중 오류 발생: {str(e)}"
-        }
+def iter_portfolio_rows():
+    """포트폴리오 CSV 행 제너레이터"""
+    for p in iter_all_portfolios_with_data():
+        yield (p['username'], p['portfolio_name'], p['portfolio_data'], p['created_at'], p['updated_at'])
 
 
-def export_portfolios_to_csv() -> Dict[str, any]:
+def iter_watchlist_rows():
+    """관심종목 CSV 행 제너레이터"""
+    return db_iter("""
+        SELECT u.username, w.ticker, w.name, w.currency, w.created_at
+        FROM watchlist w
+        JOIN users u ON w.user_id = u.user_id
+        ORDER BY u.username, w.ticker
+    """)
+
+
+def iter_stock_note_rows():
+    """종목 메모 CSV 행 제너레이터"""
+    return db_iter("""
+        SELECT u.username, sn.ticker, sn.name, sn.note_content,
+               sn.created_at, sn.updated_at
+        FROM stock_notes sn
+        JOIN users u ON sn.user_id = u.user_id
+        ORDER BY u.username, sn.ticker
+    """)
+
+
+def write_csv(output, headers: List[str], rows) -> int:
     """
-    모든 포트폴리오를 CSV 형식으로 내보내기
+    행 제너레이터를 CSV로 기록
+
+    Args:
+        output: 텍스트 파일 객체 (newline='')
+        headers: 헤더
+        rows: 행 iterable
 
     Returns:
-        dict: 내보내기 결과 (success, data, message)
+        int: 기록한 행 수 (헤더 제외)
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT u.username, p.portfolio_name, p.portfolio_data,
-                       p.created_at, p.updated_at
-                FROM portfolios p
-                JOIN users u ON p.user_id = u.user_id
-                ORDER BY u.username, p.portfolio_name
-            """)
-            rows = cursor.fetchall()
+    writer = csv.writer(output)
+    writer.writerow(headers)
+    count = 0
+    for row in rows:
+        writer.writerow(tuple(row))
+        count += 1
+    return count
 
-        # CSV 문자열 생성
-        output = io.StringIO()
-        writer = csv.writer(output)
 
-        # 헤더 작성
-        writer.writerow(['username', 'portfolio_name', 'portfolio_data', 'created_at', 'updated_at'])
-
-        # 데이터 작성
-        for row in rows:
-            writer.writerow(row)
+def cleanup_export_files(max_age: int = EXPORT_FILE_TTL) -> int:
+    """
+    오래된 내보내기 임시 파일 삭제
 
-        csv_string = output.getvalue()
-        output.close()
+    Returns:
+        int: 삭제한 파일 수
+    """
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+
+    removed = 0
+    cutoff = time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _export_path(filename: str) -> str:
+    """내보내기 임시 파일 경로 (이전 임시 파일 정리 포함)"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cleanup_export_files()
+    fd, path = tempfile.mkstemp(prefix=os.path.splitext(filename)[0] + "_",
+                                suffix=os.path.splitext(filename)[1], dir=EXPORT_DIR)
+    os.close(fd)
+    return path
+
+
+def _remove_quietly(path: Optional[str]):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _export_csv_file(prefix: str, headers: List[str], rows, label: str) -> Dict[str, any]:
+    """CSV 내보내기 공통 처리 (행 제너레이터 -> 임시 파일)"""
+    filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filepath = None
+    try:
+        filepath = _export_path(filename)
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            count = write_csv(f, headers, rows)
 
         return {
             'success': True,
-            'data': csv_string,
-            'filename': f"portfolios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            'count': len(rows),
-            'message': f"{len(rows)}개의 포트폴리오를 내보냈습니다."
+            'filepath': filepath,
+            'filename': filename,
+            'count': count,
+            'message': f"{count}개의 {label} 내보냈습니다."
         }
 
     except Exception as e:
+        _remove_quietly(filepath)
         return {
             'success': False,
-            'data': None,
+            'filepath': None,
             'message': f"내보내기 중 오류 발생: {str(e)}"
         }
 
 
-def export_watchlist_to_csv() -> Dict[str, any]:
+_encode_scalar = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _encode_flat_object(obj: dict) -> str:
     """
-    모든 관심종목을 CSV 형식으로 내보내기
+    값이 모두 스칼라인 dict를 배열 항목 위치(들여쓰기 2)의 indent=2 JSON으로 변환
 
-    Returns:
-        dict: 내보내기 결과 (success, data, message)
+    json.dumps(indent=...)는 순수 파이썬 인코더를 쓰므로 항목마다 호출하면 느리다.
+    스칼라 값은 C 인코더로 변환하고 줄바꿈/들여쓰기만 직접 붙인다.
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT u.username, w.ticker, w.name, w.currency, w.created_at
-                FROM watchlist w
-                JOIN users u ON w.user_id = u.user_id
-                ORDER BY u.username, w.ticker
-            """)
-            rows = cursor.fetchall()
+    fields = ",\n    ".join(
+        f"{_encode_scalar(key)}: {_encode_scalar(value)}" for key, value in obj.items()
+    )
+    return "{\n    " + fields + "\n  }"
 
-        # CSV 문자열 생성
-        output = io.StringIO()
-        writer = csv.writer(output)
 
-        # 헤더 작성
-        writer.writerow(['username', 'ticker', 'name', 'currency', 'created_at'])
+def export_portfolios_to_json() -> Dict[str, any]:
+    """
+    모든 포트폴리오를 JSON 형식으로 내보내기
 
-        # 데이터 작성
-        for row in rows:
-            writer.writerow(row)
+    포트폴리오를 한 건씩 임시 파일에 기록한다. (json.dumps(list, indent=2)와 같은 형식)
 
-        csv_string = output.getvalue()
-        output.close()
+    Returns:
+        dict: 내보내기 결과 (success, filepath, filename, count, message)
+    """
+    filename = f"portfolios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    filepath = None
+    try:
+        filepath = _export_path(filename)
+        count = 0
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write("[")
+            for portfolio in iter_all_portfolios_with_data():
+                item = _encode_flat_object({
+                    'username': portfolio['username'],
+                    'portfolio_name': portfolio['portfolio_name'],
+                    'portfolio_data': portfolio['portfolio_data'],
+                    'created_at': portfolio.get('created_at', ''),
+                    'updated_at': portfolio.get('updated_at', '')
+                })
+                f.write(("," if count else "") + "\n  " + item)
+                count += 1
+            f.write("\n]" if count else "]")
 
         return {
             'success': True,
-            'data': csv_string,
-            'filename': f"watchlist_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            'count': len(rows),
-            'message': f"{len(rows)}개의 관심종목을 내보냈습니다."
+            'filepath': filepath,
+            'filename': filename,
+            'count': count,
+            'message': f"{count}개의 포트폴리오를 내보냈습니다."
         }
 
     except Exception as e:
+        _remove_quietly(filepath)
         return {
             'success': False,
-            'data': None,
+            'filepath': None,
             'message': f"내보내기 중 오류 발생: {str(e)}"
         }
 
 
-def export_stock_notes_to_csv() -> Dict[str, any]:
+def export_portfolios_to_csv() -> Dict[str, any]:
     """
-    모든 종목 메모를 CSV 형식으로 내보내기
+    모든 포트폴리오를 CSV 형식으로 내보내기
 
     Returns:
-        dict: 내보내기 결과 (success, data, message)
+        dict: 내보내기 결과 (success, filepath, filename, count, message)
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT u.username, sn.ticker, sn.name, sn.note_content,
-                       sn.created_at, sn.updated_at
-                FROM stock_notes sn
-                JOIN users u ON sn.user_id = u.user_id
-                ORDER BY u.username, sn.ticker
-            """)
-            rows = cursor.fetchall()
+    return _export_csv_file("portfolios", PORTFOLIO_HEADERS, iter_portfolio_rows(), "포트폴리오를")
 
-        # CSV 문자열 생성
-        output = io.StringIO()
-        writer = csv.writer(output)
 
-        # 헤더 작성
-        writer.writerow(['username', 'ticker', 'name', 'note_content', 'created_at', 'updated_at'])
+def export_watchlist_to_csv() -> Dict[str, any]:
+    """
+    모든 관심종목을 CSV 형식으로 내보내기
 
-        # 데이터 작성
-        for row in rows:
-            writer.writerow(row)
+    Returns:
+        dict: 내보내기 결과 (success, filepath, filename, count, message)
+    """
+    return _export_csv_file("watchlist", WATCHLIST_HEADERS, iter_watchlist_rows(), "관심종목을")
 
-        csv_string = output.getvalue()
-        output.close()
 
-        return {
-            'success': True,
-            'data': csv_string,
-            'filename': f"stock_notes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            'count': len(rows),
-            'message': f"{len(rows)}개의 종목 메모를 내보냈습니다."
-        }
+def export_stock_notes_to_csv() -> Dict[str, any]:
+    """
+    모든 종목 메모를 CSV 형식으로 내보내기
 
-    except Exception as e:
-        return {
-            'success': False,
-            'data': None,
-            'message': f"내보내기 중 오류 발생: {str(e)}"
-        }
+    Returns:
+        dict: 내보내기 결과 (success, filepath, filename, count, message)
+    """
+    return _export_csv_file("stock_notes", STOCK_NOTES_HEADERS, iter_stock_note_rows(), "종목 메모를")
 
 
 def export_all_data_to_zip() -> Dict[str, any]:
     """
     모든 데이터를 ZIP 파일로 내보내기
 
+    각 CSV를 중간 문자열 없이 ZIP 항목에 바로 기록한다.
+
     Returns:
-        dict: 내보내기 결과 (success, data, message)
+        dict: 내보내기 결과 (success, filepath, filename, message)
     """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"invest_lab_data_{timestamp}.zip"
+    filepath = None
     try:
-        # 각 테이블 데이터 내보내기
-        portfolios_csv = export_portfolios_to_csv()
-        watchlist_csv = export_watchlist_to_csv()
-        notes_csv = export_stock_notes_to_csv()
-
-        # ZIP 파일 생성
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # 포트폴리오
-            if portfolios_csv['success']:
-                zip_file.writestr(portfolios_csv['filename'], portfolios_csv['data'])
-
-            # 관심종목
-            if watchlist_csv['success']:
-                zip_file.writestr(watchlist_csv['filename'], watchlist_csv['data'])
-
-            # 종목 메모
-            if notes_csv['success']:
-                zip_file.writestr(notes_csv['filename'], notes_csv['data'])
+        filepath = _export_path(filename)
+        counts = {}
+
+        with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for key, prefix, headers, rows in (
+                ('portfolios_count', 'portfolios', PORTFOLIO_HEADERS, iter_portfolio_rows()),
+                ('watchlist_count', 'watchlist', WATCHLIST_HEADERS, iter_watchlist_rows()),
+                ('notes_count', 'stock_notes', STOCK_NOTES_HEADERS, iter_stock_note_rows()),
+            ):
+                with zip_file.open(f"{prefix}_{timestamp}.csv", 'w', force_zip64=True) as entry:
+                    with io.TextIOWrapper(entry, encoding='utf-8', newline='') as output:
+                        counts[key] = write_csv(output, headers, rows)
 
             # 메타데이터 추가
-            metadata = {
-                'export_date': datetime.now().isoformat(),
-                'portfolios_count': portfolios_csv.get('count', 0),
-                'watchlist_count': watchlist_csv.get('count', 0),
-                'notes_count': notes_csv.get('count', 0)
-            }
+            metadata = {'export_date': datetime.now().isoformat()}
+            metadata.update(counts)
             zip_file.writestr('metadata.json', json.dumps(metadata, ensure_ascii=False, indent=2))
 
-        zip_data = zip_buffer.getvalue()
-        zip_buffer.close()
-
         return {
             'success': True,
-            'data': zip_data,
-            'filename': f"invest_lab_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+            'filepath': filepath,
+            'filename': filename,
             'message': "모든 데이터를 ZIP 파일로 내보냈습니다."
         }
 
     except Exception as e:
+        _remove_quietly(filepath)
         return {
             'success': False,
-            'data': None,
+            'filepath': None,
             'message': f"내보내기 중 오류 발생: {str(e)}"
         }
 
@@ -263,324 +283,344 @@ def export_all_data_to_zip() -> Dict[str, any]:
 # 데이터 가져오기
 # ==================================================
 
-def import_portfolios_from_csv(csv_data: str, duplicate_mode: str = 'skip') -> Dict[str, any]:
+# 종목 메모 병합(merge) 시 기존 내용과 가져온 내용 사이에 넣는 구분선
+MERGE_SEPARATOR = "\n\n--- 가져온 내용 ---\n"
+
+
+def _open_csv(csv_data):
+    """CSV 문자열 또는 텍스트 파일 객체 -> 읽기용 파일 객체"""
+    if isinstance(csv_data, str):
+        return io.StringIO(csv_data)
+    return csv_data
+
+
+def _iter_batches(reader, size: int = IMPORT_BATCH_SIZE):
+    """CSV 행을 size개씩 묶어 반환 (전체 파일을 메모리에 올리지 않음)"""
+    while True:
+        batch = list(islice(reader, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _load_user_ids(cursor) -> Dict[str, int]:
+    """사용자명 -> user_id 매핑"""
+    cursor.execute("SELECT user_id, username FROM users")
+    return {row[1]: row[0] for row in cursor.fetchall()}
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _import_result(imported_count: int, skipped_count: int, error_count: int) -> Dict[str, any]:
+    return {
+        'success': True,
+        'imported_count': imported_count,
+        'skipped_count': skipped_count,
+        'error_count': error_count,
+        'message': f"{imported_count}개 가져오기 완료, {skipped_count}개 건너뜀, {error_count}개 오류"
+    }
+
+
+def _import_error(e: Exception) -> Dict[str, any]:
+    return {
+        'success': False,
+        'imported_count': 0,
+        'skipped_count': 0,
+        'error_count': 0,
+        'message': f"가져오기 중 오류 발생: {str(e)}"
+    }
+
+
+def import_portfolios_from_csv(csv_data, duplicate_mode: str = 'skip') -> Dict[str, any]:
     """
     CSV 데이터로부터 포트폴리오 가져오기
 
+    CSV를 IMPORT_BATCH_SIZE 행씩 읽어 executemany로 기록하며, 전체가 하나의 트랜잭션이다.
+    (중간에 실패하면 아무것도 반영되지 않음)
+
     Args:
-        csv_data: CSV 문자열
-        duplicate_mode: 중복 처리 방식 ('skip', 'replace', 'merge')
+        csv_data: CSV 문자열 또는 텍스트 파일 객체
+        duplicate_mode: 중복 처리 방식 ('skip', 'replace', 'merge' - merge는 replace와 동일)
 
     Returns:
         dict: 가져오기 결과 (success, imported_count, skipped_count, message)
     """
+    if duplicate_mode == 'skip':
+        on_conflict = "DO NOTHING"
+    else:
+        on_conflict = "DO UPDATE SET updated_at = CURRENT_TIMESTAMP"
+
     try:
-        # CSV 파싱
-        csv_file = io.StringIO(csv_data)
-        reader = csv.DictReader(csv_file)
+        reader = csv.DictReader(_open_csv(csv_data))
 
         imported_count = 0
         skipped_count = 0
         error_count = 0
 
-        # 사용자명 -> user_id 매핑
-        username_to_id = {}
-        with db_query() as conn:
+        with db_transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT user_id, username FROM users")
-            for row in cursor.fetchall():
-                username_to_id[row[1]] = row[0]
-
-        # 각 행 처리
-        for row in reader:
-            username = row.get('username', '').strip()
-            portfolio_name = row.get('portfolio_name', '').strip()
-            portfolio_data = row.get('portfolio_data', '').strip()
-
-            # 유효성 검사
-            if not username or not portfolio_name or not portfolio_data:
-                skipped_count += 1
-                continue
-
-            # 사용자 ID 찾기
-            user_id = username_to_id.get(username)
-            if not user_id:
-                skipped_count += 1
-                continue
-
-            # 중복 확인
-            with db_query() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT portfolio_id FROM portfolios
-                    WHERE user_id = ? AND portfolio_name = ?
-                """, (user_id, portfolio_name))
-                existing = cursor.fetchone()
-
-            # 중복 처리
-            if existing:
-                if duplicate_mode == 'skip':
-                    skipped_count += 1
-                    continue
-                elif duplicate_mode == 'replace':
-                    # 기존 포트폴리오 업데이트
-                    try:
-                        save_portfolio(user_id, portfolio_name, portfolio_data)
-                        imported_count += 1
-                    except:
-                        error_count += 1
-                else:  # merge는 replace와 동일하게 처리
+            username_to_id = _load_user_ids(cursor)
+
+            # (user_id, portfolio_name) -> portfolio_id
+            cursor.execute("SELECT portfolio_id, user_id, portfolio_name FROM portfolios")
+            portfolio_ids = {(row[1], row[2]): row[0] for row in cursor.fetchall()}
+
+            for batch in _iter_batches(reader):
+                # 같은 배치 안에서 같은 포트폴리오가 여러 번 나오면 마지막 행이 남는다
+                pending = {}
+                for row in batch:
+                    username = (row.get('username') or '').strip()
+                    portfolio_name = (row.get('portfolio_name') or '').strip()
+                    portfolio_data = (row.get('portfolio_data') or '').strip()
+
+                    # 유효성 검사
+                    if not username or not portfolio_name or not portfolio_data:
+                        skipped_count += 1
+                        continue
+
+                    # 사용자 ID 찾기
+                    user_id = username_to_id.get(username)
+                    if not user_id:
+                        skipped_count += 1
+                        continue
+
+                    # 중복 확인
+                    key = (user_id, portfolio_name)
+                    if duplicate_mode == 'skip' and (key in portfolio_ids or key in pending):
+                        skipped_count += 1
+                        continue
+
                     try:
-                        save_portfolio(user_id, portfolio_name, portfolio_data)
+                        pending[key] = [
+                            portfolio_asset_to_row(asset)
+                            for asset in json.loads(portfolio_data)
+                            if isinstance(asset, dict) and asset.get('ticker')
+                        ]
                         imported_count += 1
-                    except:
+                    except (TypeError, ValueError):
                         error_count += 1
-            else:
-                # 새 포트폴리오 생성
-                try:
-                    save_portfolio(user_id, portfolio_name, portfolio_data)
-                    imported_count += 1
-                except:
-                    error_count += 1
 
-        csv_file.close()
+                if not pending:
+                    continue
 
-        return {
-            'success': True,
-            'imported_count': imported_count,
-            'skipped_count': skipped_count,
-            'error_count': error_count,
-            'message': f"{imported_count}개 가져오기 완료, {skipped_count}개 건너뜀, {error_count}개 오류"
-        }
+                replaced_ids = [(portfolio_ids[key],) for key in pending if key in portfolio_ids]
+
+                # 새로 생긴 portfolio_id는 AUTOINCREMENT이므로 배치 전 최대값 이후만 다시 읽는다
+                cursor.execute("SELECT COALESCE(MAX(portfolio_id), 0) FROM portfolios")
+                last_id = cursor.fetchone()[0]
+                cursor.executemany(f"""
+                    INSERT INTO portfolios (user_id, portfolio_name)
+                    VALUES (?, ?)
+                    ON CONFLICT (user_id, portfolio_name) {on_conflict}
+                """, list(pending))
+                cursor.execute("""
+                    SELECT portfolio_id, user_id, portfolio_name FROM portfolios
+                    WHERE portfolio_id > ?
+                """, (last_id,))
+                portfolio_ids.update({(row[1], row[2]): row[0] for row in cursor.fetchall()})
+
+                # 기존 포트폴리오의 자산 목록은 통째로 교체
+                cursor.executemany("DELETE FROM portfolio_assets WHERE portfolio_id = ?", replaced_ids)
+                cursor.executemany("""
+                    INSERT INTO portfolio_assets (portfolio_id, position, ticker, name, weight, asset_type, currency)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (portfolio_ids[key], position) + asset_row
+                    for key, asset_rows in pending.items()
+                    for position, asset_row in enumerate(asset_rows)
+                ])
+
+        return _import_result(imported_count, skipped_count, error_count)
 
     except Exception as e:
-        return {
-            'success': False,
-            'imported_count': 0,
-            'skipped_count': 0,
-            'error_count': 0,
-            'message': f"가져오기 중 오류 발생: {str(e)}"
-        }
+        return _import_error(e)
 
 
-def import_watchlist_from_csv(csv_data: str, duplicate_mode: str = 'skip') -> Dict[str, any]:
+def import_watchlist_from_csv(csv_data, duplicate_mode: str = 'skip') -> Dict[str, any]:
     """
     CSV 데이터로부터 관심종목 가져오기
 
+    CSV를 IMPORT_BATCH_SIZE 행씩 읽어 executemany로 기록하며, 전체가 하나의 트랜잭션이다.
+
     Args:
-        csv_data: CSV 문자열
-        duplicate_mode: 중복 처리 방식 ('skip', 'replace')
+        csv_data: CSV 문자열 또는 텍스트 파일 객체
+        duplicate_mode: 중복 처리 방식
+            - 'skip': 이미 있는 종목은 건너뜀
+            - 'replace': 종목명/통화를 가져온 값으로 교체
+            - 'merge': 비어 있는 종목명만 가져온 값으로 채움
 
     Returns:
         dict: 가져오기 결과 (success, imported_count, skipped_count, message)
     """
+    if duplicate_mode == 'skip':
+        on_conflict = "DO NOTHING"
+    elif duplicate_mode == 'replace':
+        on_conflict = "DO UPDATE SET name = excluded.name, currency = excluded.currency"
+    else:
+        on_conflict = "DO UPDATE SET name = COALESCE(NULLIF(watchlist.name, ''), excluded.name)"
+
     try:
-        # CSV 파싱
-        csv_file = io.StringIO(csv_data)
-        reader = csv.DictReader(csv_file)
+        reader = csv.DictReader(_open_csv(csv_data))
 
         imported_count = 0
         skipped_count = 0
         error_count = 0
 
-        # 사용자명 -> user_id 매핑
-        username_to_id = {}
-        with db_query() as conn:
+        with db_transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT user_id, username FROM users")
-            for row in cursor.fetchall():
-                username_to_id[row[1]] = row[0]
-
-        # 각 행 처리
-        for row in reader:
-            username = row.get('username', '').strip()
-            ticker = row.get('ticker', '').strip()
-            name = row.get('name', '').strip()
-            currency = row.get('currency', 'USD').strip()
-
-            # 유효성 검사
-            if not username or not ticker:
-                skipped_count += 1
-                continue
-
-            # 사용자 ID 찾기
-            user_id = username_to_id.get(username)
-            if not user_id:
-                skipped_count += 1
-                continue
-
-            # 중복 확인
-            with db_query() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT watchlist_id FROM watchlist
-                    WHERE user_id = ? AND ticker = ?
-                """, (user_id, ticker))
-                existing = cursor.fetchone()
-
-            # 중복 처리
-            if existing:
-                if duplicate_mode == 'skip':
-                    skipped_count += 1
-                    continue
-                # replace는 skip과 동일 (watchlist는 업데이트 기능 없음)
-                else:
-                    skipped_count += 1
-                    continue
-            else:
-                # 새 관심종목 추가
-                try:
-                    add_to_watchlist(user_id, ticker, name, currency)
+            username_to_id = _load_user_ids(cursor)
+
+            cursor.execute("SELECT user_id, ticker FROM watchlist")
+            existing = {(row[0], row[1]) for row in cursor.fetchall()}
+
+            for batch in _iter_batches(reader):
+                rows = []
+                for row in batch:
+                    username = (row.get('username') or '').strip()
+                    ticker = (row.get('ticker') or '').strip()
+                    name = (row.get('name') or '').strip()
+                    currency = (row.get('currency') or 'USD').strip()
+
+                    # 유효성 검사
+                    if not username or not ticker:
+                        skipped_count += 1
+                        continue
+
+                    # 사용자 ID 찾기
+                    user_id = username_to_id.get(username)
+                    if not user_id:
+                        skipped_count += 1
+                        continue
+
+                    # 중복 확인
+                    key = (user_id, ticker)
+                    if key in existing and duplicate_mode == 'skip':
+                        skipped_count += 1
+                        continue
+                    existing.add(key)
+
+                    rows.append((user_id, ticker, name, currency))
                     imported_count += 1
-                except:
-                    error_count += 1
 
-        csv_file.close()
+                cursor.executemany(f"""
+                    INSERT INTO watchlist (user_id, ticker, name, currency)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (user_id, ticker) {on_conflict}
+                """, rows)
 
-        return {
-            'success': True,
-            'imported_count': imported_count,
-            'skipped_count': skipped_count,
-            'error_count': error_count,
-            'message': f"{imported_count}개 가져오기 완료, {skipped_count}개 건너뜀, {error_count}개 오류"
-        }
+        return _import_result(imported_count, skipped_count, error_count)
 
     except Exception as e:
-        return {
-            'success': False,
-            'imported_count': 0,
-            'skipped_count': 0,
-            'error_count': 0,
-            'message': f"가져오기 중 오류 발생: {str(e)}"
-        }
+        return _import_error(e)
 
 
-def import_stock_notes_from_csv(csv_data: str, duplicate_mode: str = 'skip') -> Dict[str, any]:
+def import_stock_notes_from_csv(csv_data, duplicate_mode: str = 'skip') -> Dict[str, any]:
     """
     CSV 데이터로부터 종목 메모 가져오기
 
+    CSV를 IMPORT_BATCH_SIZE 행씩 읽어 executemany로 기록하며, 전체가 하나의 트랜잭션이다.
+    병합(merge)은 SQL 안에서 기존 내용 뒤에 MERGE_SEPARATOR와 가져온 내용을 붙인다.
+
     Args:
-        csv_data: CSV 문자열
+        csv_data: CSV 문자열 또는 텍스트 파일 객체
         duplicate_mode: 중복 처리 방식 ('skip', 'replace', 'merge')
 
     Returns:
         dict: 가져오기 결과 (success, imported_count, skipped_count, message)
     """
+    if duplicate_mode == 'skip':
+        on_conflict = "DO NOTHING"
+    elif duplicate_mode == 'replace':
+        on_conflict = """DO UPDATE SET
+            note_content = excluded.note_content,
+            name = excluded.name,
+            updated_at = CURRENT_TIMESTAMP"""
+    else:
+        on_conflict = f"""DO UPDATE SET
+            note_content = COALESCE(stock_notes.note_content, '') || {_sql_literal(MERGE_SEPARATOR)} || excluded.note_content,
+            name = excluded.name,
+            updated_at = CURRENT_TIMESTAMP"""
+
     try:
-        # CSV 파싱
-        csv_file = io.StringIO(csv_data)
-        reader = csv.DictReader(csv_file)
+        reader = csv.DictReader(_open_csv(csv_data))
 
         imported_count = 0
         skipped_count = 0
         error_count = 0
 
-        # 사용자명 -> user_id 매핑
-        username_to_id = {}
-        with db_query() as conn:
+        with db_transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT user_id, username FROM users")
-            for row in cursor.fetchall():
-                username_to_id[row[1]] = row[0]
-
-        # 각 행 처리
-        for row in reader:
-            username = row.get('username', '').strip()
-            ticker = row.get('ticker', '').strip()
-            name = row.get('name', '').strip()
-            note_content = row.get('note_content', '').strip()
-
-            # 유효성 검사
-            if not username or not ticker:
-                skipped_count += 1
-                continue
-
-            # 사용자 ID 찾기
-            user_id = username_to_id.get(username)
-            if not user_id:
-                skipped_count += 1
-                continue
-
-            # 중복 확인
-            with db_query() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT note_id, note_content FROM stock_notes
-                    WHERE user_id = ? AND ticker = ?
-                """, (user_id, ticker))
-                existing = cursor.fetchone()
-
-            # 중복 처리
-            if existing:
-                if duplicate_mode == 'skip':
-                    skipped_count += 1
-                    continue
-                elif duplicate_mode == 'replace':
-                    # 기존 메모 교체
-                    try:
-                        save_stock_note(user_id, ticker, name, note_content)
-                        imported_count += 1
-                    except:
-                        error_count += 1
-                else:  # merge
-                    # 기존 메모에 새 내용 추가
-                    try:
-                        existing_content = existing[1] if existing[1] else ''
-                        merged_content = f"{existing_content}\n\n--- 가져온 내용 ---\n{note_content}"
-                        save_stock_note(user_id, ticker, name, merged_content)
-                        imported_count += 1
-                    except:
-                        error_count += 1
-            else:
-                # 새 메모 생성
-                try:
-                    save_stock_note(user_id, ticker, name, note_content)
+            username_to_id = _load_user_ids(cursor)
+
+            cursor.execute("SELECT user_id, ticker FROM stock_notes")
+            existing = {(row[0], row[1]) for row in cursor.fetchall()}
+
+            for batch in _iter_batches(reader):
+                rows = []
+                for row in batch:
+                    username = (row.get('username') or '').strip()
+                    ticker = (row.get('ticker') or '').strip()
+                    name = (row.get('name') or '').strip()
+                    note_content = (row.get('note_content') or '').strip()
+
+                    # 유효성 검사
+                    if not username or not ticker:
+                        skipped_count += 1
+                        continue
+
+                    # 사용자 ID 찾기
+                    user_id = username_to_id.get(username)
+                    if not user_id:
+                        skipped_count += 1
+                        continue
+
+                    # 중복 확인
+                    key = (user_id, ticker)
+                    if key in existing and duplicate_mode == 'skip':
+                        skipped_count += 1
+                        continue
+                    existing.add(key)
+
+                    rows.append((user_id, ticker, name, note_content))
                     imported_count += 1
-                except:
-                    error_count += 1
 
-        csv_file.close()
+                cursor.executemany(f"""
+                    INSERT INTO stock_notes (user_id, ticker, name, note_content)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (user_id, ticker) {on_conflict}
+                """, rows)
 
-        return {
-            'success': True,
-            'imported_count': imported_count,
-            'skipped_count': skipped_count,
-            'error_count': error_count,
-            'message': f"{imported_count}개 가져오기 완료, {skipped_count}개 건너뜀, {error_count}개 오류"
-        }
+        return _import_result(imported_count, skipped_count, error_count)
 
     except Exception as e:
-        return {
-            'success': False,
-            'imported_count': 0,
-            'skipped_count': 0,
-            'error_count': 0,
-            'message': f"가져오기 중 오류 발생: {str(e)}"
-        }
+        return _import_error(e)
 
 
 # ==================================================
 # 유틸리티 함수
 # ==================================================
 
-def validate_csv_format(csv_data: str, expected_headers: List[str]) -> Dict[str, any]:
+def validate_csv_format(csv_data, expected_headers: List[str]) -> Dict[str, any]:
     """
     CSV 형식 유효성 검사
 
     Args:
-        csv_data: CSV 문자열
+        csv_data: CSV 문자열 또는 텍스트 파일 객체 (파일은 헤더만 읽고 원래 위치로 되돌림)
         expected_headers: 예상되는 헤더 리스트
 
     Returns:
         dict: 검증 결과 (is_valid, message)
     """
     try:
-        csv_file = io.StringIO(csv_data)
+        csv_file = _open_csv(csv_data)
+        position = csv_file.tell()
         reader = csv.DictReader(csv_file)
 
         # 헤더 확인
         headers = reader.fieldnames
-        csv_file.close()
+        csv_file.seek(position)
 
         if not headers:
             return {
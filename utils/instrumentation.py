@@ -0,0 +1,228 @@
+"""핫패스 성능 계측 모듈
+
+span()/timed()로 구간 실행 시간을 측정해 지연 시간 히스토그램에 누적한다.
+- 전역 히스토그램: 프로세스 전체 (Admin Panel, 메트릭 엔드포인트에서 조회)
+- 세션 히스토그램: Streamlit 세션별 (최근 METRICS_SESSION_LIMIT개 세션만 유지)
+- collect_timings(): 한 요청(예: 백테스트 1회) 안에서 발생한 구간별 소요 시간 수집
+
+측정은 perf_counter 호출과 잠금 1회로 끝나므로 핫패스에 그대로 둬도 부담이 작다.
+"""
+
+import time
+import bisect
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+from config import METRICS_HISTOGRAM_BUCKETS_MS, METRICS_SESSION_LIMIT, METRICS_SAMPLE_SIZE
+
+_lock = threading.Lock()
+_global_histograms: Dict[str, "LatencyHistogram"] = {}
+_session_histograms: "OrderedDict[str, Dict[str, LatencyHistogram]]" = OrderedDict()
+_counters: Dict[str, float] = {}
+_local = threading.local()
+
+# span()이 기록하는 오류 카운터 이름 접두사 (다른 모듈의 '*.errors' 카운터와 구분)
+SPAN_ERROR_PREFIX = "span_errors."
+
+
+class LatencyHistogram:
+    """
+    지연 시간 히스토그램 (밀리초)
+
+    고정 버킷 누적 개수(Prometheus 형식)와 백분위 계산용 최근 샘플을 함께 유지한다.
+    호출하는 쪽에서 모듈 잠금을 잡은 상태로 사용한다.
+    """
+
+    def __init__(self, buckets=METRICS_HISTOGRAM_BUCKETS_MS, sample_size=METRICS_SAMPLE_SIZE):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def observe(self, value_ms: float):
+        """측정값 추가"""
+        self.bucket_counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+        self.samples.append(value_ms)
+
+    def percentile(self, q: float) -> float:
+        """최근 샘플 기준 백분위 (q: 0~100)"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> dict:
+        """조회용 요약"""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'max_ms': round(self.max, 3),
+            'buckets': list(zip(self.buckets + (float('inf'),), self.bucket_counts))
+        }
+
+
+def get_session_id() -> Optional[str]:
+    """현재 Streamlit 세션 ID (스크립트 실행 스레드가 아니면 None)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+
+def record(name: str, elapsed_ms: float, session_id: Optional[str] = None):
+    """
+    측정값 기록
+
+    Args:
+        name: 구간 이름 (예: 'backtest.calculate_portfolio')
+        elapsed_ms: 소요 시간 (밀리초)
+        session_id: 세션 ID (None이면 현재 세션)
+    """
+    if session_id is None:
+        session_id = get_session_id()
+
+    with _lock:
+        hist = _global_histograms.get(name)
+        if hist is None:
+            hist = _global_histograms[name] = LatencyHistogram()
+        hist.observe(elapsed_ms)
+
+        if session_id:
+            session = _session_histograms.get(session_id)
+            if session is None:
+                session = _session_histograms[session_id] = {}
+                while len(_session_histograms) > METRICS_SESSION_LIMIT:
+                    _session_histograms.popitem(last=False)
+            else:
+                _session_histograms.move_to_end(session_id)
+            hist = session.get(name)
+            if hist is None:
+                hist = session[name] = LatencyHistogram()
+            hist.observe(elapsed_ms)
+
+    # 현재 스레드에서 수집 중인 요청별 타이밍에 누적
+    for collector in getattr(_local, 'collectors', ()):
+        collector[name] = collector.get(name, 0.0) + elapsed_ms
+
+
+@contextmanager
+def span(name: str):
+    """
+    구간 실행 시간 측정 컨텍스트 매니저
+
+    예외가 발생해도 소요 시간은 기록하며, 오류 횟수는 'span_errors.<name>' 카운터에 누적한다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        increment(f"{SPAN_ERROR_PREFIX}{name}")
+        raise
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name: str):
+    """함수 실행 시간 측정 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_timings():
+    """
+    현재 스레드에서 실행되는 span의 구간별 누적 시간 수집
+
+    Yields:
+        dict: {구간 이름: 누적 소요 시간(ms)} - 블록 종료 후 채워진 상태로 사용
+    """
+    collectors = getattr(_local, 'collectors', None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    timings = {}
+    collectors.append(timings)
+    try:
+        yield timings
+    finally:
+        collectors.remove(timings)
+
+
+def increment(name: str, value: float = 1):
+    """카운터 증가"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+# ==================================================
+# 조회
+# ==================================================
+
+def get_counters() -> Dict[str, float]:
+    """전체 카운터 값"""
+    with _lock:
+        return dict(_counters)
+
+
+def get_histograms(session_id: Optional[str] = None) -> Dict[str, dict]:
+    """
+    히스토그램 요약 조회
+
+    Args:
+        session_id: None이면 전역, 지정하면 해당 세션 히스토그램
+
+    Returns:
+        dict: {구간 이름: snapshot}
+    """
+    with _lock:
+        source = _global_histograms if session_id is None else _session_histograms.get(session_id, {})
+        return {name: hist.snapshot() for name, hist in sorted(source.items())}
+
+
+def get_session_count() -> int:
+    """계측 기록이 있는 세션 수"""
+    with _lock:
+        return len(_session_histograms)
+
+
+def reset_metrics():
+    """모든 히스토그램과 카운터 초기화"""
+    with _lock:
+        _global_histograms.clear()
+        _session_histograms.clear()
+        _counters.clear()
+
+
+def summarize_histograms(histograms: Dict[str, dict]) -> List[dict]:
+    """Admin Panel 표 표시용 행 목록으로 변환"""
+    return [
+        {
+            '구간': name,
+            '호출 수': snap['count'],
+            '평균 (ms)': snap['mean_ms'],
+            'p50 (ms)': snap['p50_ms'],
+            'p95 (ms)': snap['p95_ms'],
+            '최대 (ms)': snap['max_ms'],
+            '누적 (ms)': snap['total_ms']
+        }
+        for name, snap in histograms.items()
+    ]
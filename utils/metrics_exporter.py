@@ -0,0 +1,224 @@
+"""Prometheus 형식 메트릭 엔드포인트
+
+컨테이너 안에서 Streamlit과 함께 도는 경량 HTTP 스레드로 /metrics를 제공한다.
+utils.instrumentation에 누적된 카운터/히스토그램과 프로세스 상태(메모리, 활성 세션)를
+Prometheus 텍스트 형식(0.0.4)으로 내보낸다. 프로세스 리소스 값은 utils.resource_telemetry의 샘플을 사용한다.
+
+로컬 확인:
+    python -m utils.metrics_exporter                 # 임시 포트로 서버를 띄워 자기 자신을 스크레이프
+    python -m utils.metrics_exporter --scrape http://localhost:9464/metrics
+"""
+
+import os
+import sys
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 프로젝트 루트 디렉토리를 경로에 추가 (python -m 으로 직접 실행 시)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import METRICS_ENABLED, METRICS_HOST, METRICS_PORT
+from utils.instrumentation import SPAN_ERROR_PREFIX, get_counters, get_histograms
+from utils.resource_telemetry import sample_resources
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "investlab"
+
+_server_lock = threading.Lock()
+_server = None
+
+
+# ==================================================
+# 수집
+# ==================================================
+
+def get_active_sessions() -> int:
+    """Streamlit 런타임의 활성 세션 수 (런타임 밖이면 0)"""
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return 0
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return 0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if bound == float('inf') else repr(bound / 1000)
+
+
+def render_metrics() -> str:
+    """
+    Prometheus 텍스트 형식 메트릭 생성
+
+    Returns:
+        str: 노출 포맷 본문
+    """
+    counters = get_counters()
+    histograms = get_histograms()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{PREFIX}_{name}{labels} {value}")
+
+    # 백테스트 / 캐시
+    metric("backtests_total", "counter", "Backtests run.",
+           [("", int(counters.get('backtest.runs', 0)))])
+
+    from core.price_cache import get_price_cache_stats
+    price_cache = get_price_cache_stats()
+    requests = price_cache['hits'] + price_cache['partial_hits'] + price_cache['misses']
+    metric("price_cache_requests_total", "counter", "Per-ticker price cache lookups.",
+           [("", requests)])
+    metric("price_cache_misses_total", "counter", "Per-ticker price cache lookups that fetched data.",
+           [('{kind="partial"}', price_cache['partial_hits']), ('{kind="full"}', price_cache['misses'])])
+    metric("price_cache_hit_ratio", "gauge", "Price data cache hit ratio since start.",
+           [("", round(price_cache['hits'] / requests, 6) if requests else 0)])
+    metric("price_cache_evictions_total", "counter", "Price cache entries evicted for the byte budget.",
+           [("", price_cache['evictions'])])
+    metric("price_cache_max_bytes", "gauge", "Price cache byte budget.",
+           [("", price_cache['max_bytes'])])
+
+    # yfinance
+    metric("yfinance_errors_total", "counter", "Failed yfinance fetches.",
+           [("", int(counters.get('yfinance.errors', 0)))])
+
+    # 구간별 지연 시간 (yfinance.history, db.query, db.transaction 등 포함)
+    lines.append(f"# HELP {PREFIX}_span_duration_seconds Instrumented span latency.")
+    lines.append(f"# TYPE {PREFIX}_span_duration_seconds histogram")
+    for name, snap in histograms.items():
+        label = _escape_label(name)
+        cumulative = 0
+        for bound, count in snap['buckets']:
+            cumulative += count
+            lines.append(f'{PREFIX}_span_duration_seconds_bucket{{span="{label}",le="{_format_le(bound)}"}} {cumulative}')
+        lines.append(f'{PREFIX}_span_duration_seconds_sum{{span="{label}"}} {snap["total_ms"] / 1000}')
+        lines.append(f'{PREFIX}_span_duration_seconds_count{{span="{label}"}} {snap["count"]}')
+
+    metric("span_errors_total", "counter", "Instrumented spans that raised.",
+           [(f'{{span="{_escape_label(name[len(SPAN_ERROR_PREFIX):])}"}}', int(value))
+            for name, value in sorted(counters.items()) if name.startswith(SPAN_ERROR_PREFIX)])
+
+    # 프로세스 상태
+    metric("active_sessions", "gauge", "Active Streamlit sessions.",
+           [("", get_active_sessions())])
+    resources = sample_resources()
+    metric("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+           [("", resources['rss_bytes'])])
+    metric("process_virtual_memory_bytes", "gauge", "Virtual memory size in bytes.",
+           [("", resources['vms_bytes'])])
+    metric("process_cpu_seconds_total", "counter", "User and system CPU time spent in seconds.",
+           [("", round(resources['cpu_seconds'], 3))])
+    metric("process_threads", "gauge", "OS threads in the process.",
+           [("", resources['threads'])])
+    metric("process_open_fds", "gauge", "Open file descriptors.",
+           [("", resources['open_fds'])])
+    metric("db_open_connections", "gauge", "Open SQLite connections to the application database.",
+           [("", resources['db_connections'])])
+
+    caches = sorted(resources['caches'].items())
+    metric("cache_entries", "gauge", "Entries held by in-process caches.",
+           [(f'{{cache="{_escape_label(name)}"}}', stats['entries']) for name, stats in caches if stats['entries'] is not None])
+    metric("cache_bytes", "gauge", "Approximate bytes held by in-process caches.",
+           [(f'{{cache="{_escape_label(name)}"}}', stats['bytes']) for name, stats in caches])
+
+    return "\n".join(lines) + "\n"
+
+
+# ==================================================
+# HTTP 서버
+# ==================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics 핸들러"""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics().encode("utf-8")
+        except Exception as e:
+            logger.error(f"Failed to render metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크레이프마다 stderr에 접근 로그가 쌓이지 않도록 비활성화
+        pass
+
+
+def start_metrics_server(port: int = None, host: str = None):
+    """
+    메트릭 서버 시작 (프로세스당 한 번, 이미 실행 중이면 기존 서버 반환)
+
+    Args:
+        port: 포트 (기본: METRICS_PORT, 0이면 임의 포트)
+        host: 바인딩 주소 (기본: METRICS_HOST)
+
+    Returns:
+        ThreadingHTTPServer or None: 비활성화되었거나 포트를 열 수 없으면 None
+    """
+    global _server
+
+    with _server_lock:
+        if _server is not None:
+            return _server
+        if not METRICS_ENABLED:
+            return None
+
+        try:
+            server = ThreadingHTTPServer(
+                (host if host is not None else METRICS_HOST, METRICS_PORT if port is None else port),
+                _MetricsHandler
+            )
+        except OSError as e:
+            logger.warning(f"Metrics server not started: {e}")
+            return None
+
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True)
+        thread.start()
+        _server = server
+        logger.info(f"Metrics server listening on {server.server_address[0]}:{server.server_address[1]}")
+        return server
+
+
+def main():
+    """로컬 스크레이프 (서버를 띄우거나 지정한 URL을 조회해 출력)"""
+    import argparse
+    from urllib.request import urlopen
+
+    parser = argparse.ArgumentParser(description="Invest Lab 메트릭 스크레이프")
+    parser.add_argument("--scrape", metavar="URL", help="실행 중인 엔드포인트 URL")
+    args = parser.parse_args()
+
+    url = args.scrape
+    if not url:
+        server = start_metrics_server(port=0, host="127.0.0.1")
+        if server is None:
+            print("[ERROR] 메트릭 서버를 시작할 수 없습니다. (METRICS_ENABLED 확인)")
+            sys.exit(1)
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+
+    with urlopen(url, timeout=5) as response:
+        print(response.read().decode("utf-8"), end="")
+
+
+if __name__ == "__main__":
+    main()
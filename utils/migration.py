@@ -102,7 +102,7 @@ def migrate_json_to_db():
 
     for portfolio_name, portfolio_data in portfolios.items():
         try:
-            save_portfolio(user_id, portfolio_name, json.dumps(portfolio_data))
+            save_portfolio(user_id, portfolio_name, portfolio_data)
             print(f"  [SUCCESS] '{portfolio_name}' 마이그레이션 완료")
             success_count += 1
         except Exception as e:
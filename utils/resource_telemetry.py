@@ -0,0 +1,237 @@
+"""프로세스 리소스 텔레메트리
+
+RSS/가상 메모리, CPU 시간, 스레드 수, 열린 파일/DB 연결 수(/proc/self)와 캐시별 항목 수/바이트를
+주기적으로 샘플링해 링 버퍼(최근 TELEMETRY_HISTORY_SIZE개)에 보관한다. Admin Panel은 이 시계열로
+차트를 그리고, 메트릭 엔드포인트(utils.metrics_exporter)는 같은 샘플 함수로 게이지를 내보낸다.
+
+캐시 크기는 st.cache_data 함수별 통계와 register_cache_provider()로 등록한 캐시를 합쳐 보고한다.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config import TELEMETRY_INTERVAL, TELEMETRY_HISTORY_SIZE
+
+logger = logging.getLogger(__name__)
+
+_history = deque(maxlen=TELEMETRY_HISTORY_SIZE)
+_history_lock = threading.Lock()
+_cache_providers: Dict[str, Callable[[], Dict[str, int]]] = {}
+_sampler_lock = threading.Lock()
+_sampler_thread = None
+
+
+# ==================================================
+# /proc 수집
+# ==================================================
+
+def get_memory_usage() -> dict:
+    """
+    프로세스 메모리 사용량 (/proc/self/status, 없으면 getrusage 최대값)
+
+    Returns:
+        dict: {'rss_bytes', 'vms_bytes'} (알 수 없으면 0)
+    """
+    usage = {'rss_bytes': 0, 'vms_bytes': 0}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    usage['rss_bytes'] = int(line.split()[1]) * 1024
+                elif line.startswith("VmSize:"):
+                    usage['vms_bytes'] = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            usage['rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            pass
+    return usage
+
+
+def get_thread_count() -> int:
+    """프로세스 스레드 수 (/proc/self/status, 없으면 파이썬 스레드 수)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+def get_open_files(db_path: str = None) -> Dict[str, int]:
+    """
+    열린 파일 디스크립터 수와 그중 DB 파일을 연 연결 수 (/proc/self/fd)
+
+    SQLite 연결은 DB 파일을 하나씩 열고 있으므로 DB 파일을 가리키는 fd 수가 열린 연결 수다.
+
+    Args:
+        db_path: DB 경로 (기본: DATABASE_PATH)
+
+    Returns:
+        dict: {'open_fds', 'db_connections'} (/proc이 없으면 0)
+    """
+    if db_path is None:
+        from db.database import get_db_path
+        db_path = get_db_path()
+    db_real_path = os.path.realpath(db_path)
+
+    open_fds = 0
+    db_connections = 0
+    try:
+        fd_dir = "/proc/self/fd"
+        for fd in os.listdir(fd_dir):
+            open_fds += 1
+            try:
+                if os.readlink(os.path.join(fd_dir, fd)) == db_real_path:
+                    db_connections += 1
+            except OSError:
+                continue
+    except OSError:
+        pass
+    return {'open_fds': open_fds, 'db_connections': db_connections}
+
+
+# ==================================================
+# 캐시 크기
+# ==================================================
+
+def register_cache_provider(name: str, provider: Callable[[], Dict[str, int]]):
+    """
+    캐시 크기 제공 함수 등록 (같은 이름이면 교체)
+
+    Args:
+        name: 캐시 이름 (차트/메트릭 레이블)
+        provider: {'entries', 'bytes'}를 반환하는 함수 (바이트를 모르면 'bytes': 0, 항목 수를 모르면 'entries': None)
+    """
+    _cache_providers[name] = provider
+
+
+def _streamlit_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    st.cache_data 함수별 바이트 (Streamlit 캐시 통계, 함수 이름 기준)
+
+    Streamlit 통계는 함수별로 합산된 바이트만 제공하므로 항목 수는 None이다.
+    """
+    stats = {}
+    try:
+        from streamlit.runtime.caching.cache_data_api import _data_caches
+
+        for family in _data_caches.get_stats().values():
+            for stat in family:
+                name = stat.cache_name.rsplit(".", 1)[-1]
+                entry = stats.setdefault(name, {'entries': None, 'bytes': 0})
+                entry['bytes'] += stat.byte_length
+    except Exception as e:
+        logger.debug(f"Streamlit cache stats failed: {e}")
+    return stats
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    캐시별 항목 수와 바이트
+
+    Returns:
+        dict: {캐시 이름: {'entries', 'bytes'}} (항목 수를 모르는 캐시는 'entries': None)
+    """
+    stats = _streamlit_cache_stats()
+    for name, provider in list(_cache_providers.items()):
+        try:
+            stats[name] = provider()
+        except Exception as e:
+            logger.debug(f"Cache provider {name} failed: {e}")
+    return stats
+
+
+# ==================================================
+# 샘플링
+# ==================================================
+
+def sample_resources() -> Dict[str, any]:
+    """
+    현재 리소스 사용량 샘플 (기록하지 않음)
+
+    Returns:
+        dict: {'timestamp', 'rss_bytes', 'vms_bytes', 'cpu_seconds', 'threads',
+               'open_fds', 'db_connections', 'caches'}
+    """
+    times = os.times()
+    sample = {
+        'timestamp': datetime.now(),
+        'monotonic': time.monotonic(),
+        'cpu_seconds': times.user + times.system,
+        'threads': get_thread_count(),
+        'caches': get_cache_stats()
+    }
+    sample.update(get_memory_usage())
+    sample.update(get_open_files())
+    return sample
+
+
+def record_sample() -> Dict[str, any]:
+    """
+    샘플을 찍어 링 버퍼에 추가 (직전 샘플 대비 CPU 사용률 'cpu_percent' 포함)
+
+    Returns:
+        dict: 기록한 샘플
+    """
+    sample = sample_resources()
+    with _history_lock:
+        previous = _history[-1] if _history else None
+        if previous:
+            elapsed = sample['monotonic'] - previous['monotonic']
+            cpu = sample['cpu_seconds'] - previous['cpu_seconds']
+            sample['cpu_percent'] = round(cpu / elapsed * 100, 1) if elapsed > 0 else 0.0
+        else:
+            sample['cpu_percent'] = 0.0
+        _history.append(sample)
+    return sample
+
+
+def get_resource_history() -> List[Dict[str, any]]:
+    """링 버퍼의 샘플 목록 (오래된 순)"""
+    with _history_lock:
+        return list(_history)
+
+
+def get_latest_sample() -> Optional[Dict[str, any]]:
+    """가장 최근 기록한 샘플 (없으면 None)"""
+    with _history_lock:
+        return _history[-1] if _history else None
+
+
+def _sampler_loop(interval: float):
+    while True:
+        try:
+            record_sample()
+        except Exception as e:
+            logger.warning(f"Resource sampling failed: {e}")
+        time.sleep(interval)
+
+
+def start_telemetry_sampler():
+    """
+    샘플링 스레드 시작 (프로세스당 한 번, 이미 실행 중이면 기존 스레드 반환)
+
+    Returns:
+        threading.Thread or None: TELEMETRY_INTERVAL이 0이면 None
+    """
+    global _sampler_thread
+
+    with _sampler_lock:
+        if _sampler_thread is not None:
+            return _sampler_thread
+        if TELEMETRY_INTERVAL <= 0:
+            return None
+
+        thread = threading.Thread(target=_sampler_loop, args=(TELEMETRY_INTERVAL,), name="resource-telemetry", daemon=True)
+        thread.start()
+        _sampler_thread = thread
+        return thread
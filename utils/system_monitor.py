@@ -1,81 +1,196 @@
-"""시스템 상태 모니터링"""
+"""시스템 상태 모니터링
+
+대시보드 통계는 트리거로 유지되는 집계 테이블을 한 번의 쿼리로 읽고, 결과를 STATS_CACHE_TTL 동안
+프로세스 전체(모든 관리자 세션)에서 공유한다. 관리자가 데이터를 바꾼 경우(삭제, 가져오기, 복원)는
+invalidate_stats_cache()로 바로 다시 읽는다.
+"""
 
 import os
+import copy
+import json
+import time
+import threading
 from datetime import datetime
 from typing import Dict
+from config import STATS_CACHE_TTL
 from db.models import db_query
 from utils.backup_manager import get_backup_stats, get_db_path
 
+_stats_lock = threading.Lock()
+_stats_cache = {}  # {top_n: (cached_at, stats)}
+
 
 # ==================================================
-# 데이터베이스 통계
+# 통합 통계 (관리자 대시보드)
 # ==================================================
 
-def get_database_stats() -> Dict[str, any]:
-    """
-    데이터베이스 통계 정보 반환
+# 한 번의 SELECT로 대시보드 값을 모두 읽는다.
+# 개수는 stats_counters(트리거로 유지), 최근 항목은 updated_at/created_at 인덱스,
+# 인기 종목은 ticker_stats 순위 인덱스를 사용하므로 테이블 크기와 무관하다.
+_DASHBOARD_QUERY = """
+    SELECT
+        (SELECT json_group_object(key, value) FROM stats_counters) AS counters,
+        (SELECT json_object('username', username, 'created_at', created_at)
+         FROM users ORDER BY created_at DESC LIMIT 1) AS latest_user,
+        (SELECT json_object('username', username, 'last_login', last_login)
+         FROM users WHERE last_login IS NOT NULL ORDER BY last_login DESC LIMIT 1) AS latest_login,
+        (SELECT json_object('name', p.portfolio_name, 'updated_at', p.updated_at, 'username', u.username)
+         FROM portfolios p JOIN users u ON p.user_id = u.user_id
+         ORDER BY p.updated_at DESC LIMIT 1) AS latest_portfolio,
+        (SELECT json_object('ticker', ticker, 'name', name, 'updated_at', updated_at)
+         FROM stock_notes ORDER BY updated_at DESC LIMIT 1) AS latest_note,
+        (SELECT json_group_array(json_object('ticker', ticker, 'name', name, 'count', ref_count,
+                                             'avg_weight', weight_sum / ref_count))
+         FROM (SELECT * FROM ticker_stats WHERE source = 'portfolio'
+               ORDER BY ref_count DESC, ticker LIMIT :top_n)) AS portfolio_tickers,
+        (SELECT json_group_array(json_object('ticker', ticker, 'name', name, 'count', ref_count))
+         FROM (SELECT * FROM ticker_stats WHERE source = 'watchlist'
+               ORDER BY ref_count DESC, ticker LIMIT :top_n)) AS watchlist_tickers
+"""
+
+
+def _average(total: int, owners: int) -> float:
+    return round(total / owners, 1) if owners > 0 else 0
+
+
+def _build_dashboard_stats(db_path: str, db_size: int, counters: dict, latest: dict,
+                           portfolio_tickers: list, watchlist_tickers: list) -> Dict[str, any]:
+    """집계 값으로 섹션별 통계 dict 구성 (기존 get_*_stats 반환 형식과 동일)"""
+    users = counters.get('users', 0)
+    admins = counters.get('admins', 0)
+    portfolios = counters.get('portfolios', 0)
+    watchlist = counters.get('watchlist', 0)
+    notes = counters.get('stock_notes', 0)
+
+    latest_user = latest.get('user') or {}
+    latest_login = latest.get('login') or {}
+    latest_portfolio = latest.get('portfolio') or {}
+    latest_note = latest.get('note') or {}
+
+    return {
+        'database': {
+            'db_size': db_size,
+            'db_path': db_path,
+            'tables': {
+                'users': users,
+                'portfolios': portfolios,
+                'watchlist': watchlist,
+                'stock_notes': notes
+            },
+            'total_records': users + portfolios + watchlist + notes
+        },
+        'users': {
+            'total_users': users,
+            'admin_count': admins,
+            'regular_users': users - admins,
+            'latest_user': {
+                'username': latest_user.get('username'),
+                'created_at': latest_user.get('created_at')
+            },
+            'latest_login': {
+                'username': latest_login.get('username'),
+                'last_login': latest_login.get('last_login')
+            }
+        },
+        'portfolios': {
+            'total_portfolios': portfolios,
+            'users_with_portfolios': counters.get('portfolio_owners', 0),
+            'avg_per_user': _average(portfolios, counters.get('portfolio_owners', 0)),
+            'latest_portfolio': {
+                'name': latest_portfolio.get('name'),
+                'updated_at': latest_portfolio.get('updated_at'),
+                'username': latest_portfolio.get('username')
+            },
+            'popular_tickers': portfolio_tickers
+        },
+        'watchlist': {
+            'total_watchlist': watchlist,
+            'users_with_watchlist': counters.get('watchlist_owners', 0),
+            'avg_per_user': _average(watchlist, counters.get('watchlist_owners', 0)),
+            'popular_tickers': watchlist_tickers
+        },
+        'stock_notes': {
+            'total_notes': notes,
+            'users_with_notes': counters.get('stock_notes_owners', 0),
+            'avg_per_user': _average(notes, counters.get('stock_notes_owners', 0)),
+            'latest_note': {
+                'ticker': latest_note.get('ticker'),
+                'name': latest_note.get('name'),
+                'updated_at': latest_note.get('updated_at')
+            }
+        }
+    }
 
-    Returns:
-        dict: DB 크기, 테이블별 레코드 수
+
+def invalidate_stats_cache():
+    """대시보드 통계 캐시 비우기 (다음 조회 시 DB에서 다시 읽음)"""
+    with _stats_lock:
+        _stats_cache.clear()
+
+
+def get_dashboard_stats(top_n: int = 5) -> Dict[str, any]:
     """
-    try:
-        db_path = get_db_path()
+    관리자 대시보드 통계 (STATS_CACHE_TTL 동안 캐시, 만료 시 DB 왕복 1회)
 
-        # DB 파일 크기
-        db_size = 0
-        if os.path.exists(db_path):
-            db_size = os.path.getsize(db_path)
+    Args:
+        top_n: 인기 종목 개수
 
-        # 테이블별 레코드 수 조회
-        with db_query() as conn:
-            cursor = conn.cursor()
+    Returns:
+        dict: {'database', 'users', 'portfolios', 'watchlist', 'stock_notes'}
+              각 섹션은 get_database_stats() 등 개별 함수의 반환 형식과 같다.
+              실패 시 모든 값이 0/None이고 각 섹션에 'error'가 포함된다. (실패 결과는 캐시하지 않음)
+    """
+    with _stats_lock:
+        entry = _stats_cache.get(top_n)
+        if entry and time.monotonic() - entry[0] < STATS_CACHE_TTL:
+            return copy.deepcopy(entry[1])
 
-            # users 테이블
-            cursor.execute("SELECT COUNT(*) FROM users")
-            user_count = cursor.fetchone()[0]
+    stats = _load_dashboard_stats(top_n)
+    if 'error' not in stats['database']:
+        with _stats_lock:
+            _stats_cache[top_n] = (time.monotonic(), copy.deepcopy(stats))
+    return stats
 
-            # portfolios 테이블
-            cursor.execute("SELECT COUNT(*) FROM portfolios")
-            portfolio_count = cursor.fetchone()[0]
 
-            # watchlist 테이블
-            cursor.execute("SELECT COUNT(*) FROM watchlist")
-            watchlist_count = cursor.fetchone()[0]
+def _load_dashboard_stats(top_n: int) -> Dict[str, any]:
+    """대시보드 통계 조회 (캐시 없이)"""
+    db_path = get_db_path()
+    db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
 
-            # stock_notes 테이블
-            cursor.execute("SELECT COUNT(*) FROM stock_notes")
-            stock_notes_count = cursor.fetchone()[0]
+    try:
+        with db_query() as conn:
+            row = conn.execute(_DASHBOARD_QUERY, {'top_n': top_n}).fetchone()
 
-        return {
-            'db_size': db_size,
-            'db_path': db_path,
-            'tables': {
-                'users': user_count,
-                'portfolios': portfolio_count,
-                'watchlist': watchlist_count,
-                'stock_notes': stock_notes_count
-            },
-            'total_records': user_count + portfolio_count + watchlist_count + stock_notes_count
+        latest = {
+            'user': json.loads(row['latest_user']) if row['latest_user'] else None,
+            'login': json.loads(row['latest_login']) if row['latest_login'] else None,
+            'portfolio': json.loads(row['latest_portfolio']) if row['latest_portfolio'] else None,
+            'note': json.loads(row['latest_note']) if row['latest_note'] else None
         }
+        return _build_dashboard_stats(
+            db_path, db_size,
+            json.loads(row['counters'] or '{}'),
+            latest,
+            json.loads(row['portfolio_tickers'] or '[]'),
+            json.loads(row['watchlist_tickers'] or '[]')
+        )
 
     except Exception as e:
-        return {
-            'db_size': 0,
-            'db_path': get_db_path(),
-            'tables': {
-                'users': 0,
-                'portfolios': 0,
-                'watchlist': 0,
-                'stock_notes': 0
-            },
-            'total_records': 0,
-            'error': str(e)
-        }
+        stats = _build_dashboard_stats(db_path, 0, {}, {}, [], [])
+        for section in stats.values():
+            section['error'] = str(e)
+        return stats
 
 
-# ==================================================
-# 사용자 통계
-# ==================================================
+def get_database_stats() -> Dict[str, any]:
+    """
+    데이터베이스 통계 정보 반환
+
+    Returns:
+        dict: DB 크기, 테이블별 레코드 수
+    """
+    return get_dashboard_stats()['database']
+
 
 def get_user_stats() -> Dict[str, any]:
     """
@@ -84,234 +199,37 @@ def get_user_stats() -> Dict[str, any]:
     Returns:
         dict: 총 사용자 수, 관리자 수, 일반 사용자 수, 최근 가입일
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-
-            # 총 사용자 수
-            cursor.execute("SELECT COUNT(*) FROM users")
-            total_users = cursor.fetchone()[0]
-
-            # 관리자 수
-            cursor.execute("SELECT COUNT(*) FROM users WHERE is_admin = 1")
-            admin_count = cursor.fetchone()[0]
-
-            # 최근 가입자
-            cursor.execute("""
-                SELECT username, created_at
-                FROM users
-                ORDER BY created_at DESC
-                LIMIT 1
-            """)
-            latest_user = cursor.fetchone()
-
-            # 최근 로그인
-            cursor.execute("""
-                SELECT username, last_login
-                FROM users
-                WHERE last_login IS NOT NULL
-                ORDER BY last_login DESC
-                LIMIT 1
-            """)
-            latest_login = cursor.fetchone()
+    return get_dashboard_stats()['users']
 
-        return {
-            'total_users': total_users,
-            'admin_count': admin_count,
-            'regular_users': total_users - admin_count,
-            'latest_user': {
-                'username': latest_user[0] if latest_user else None,
-                'created_at': latest_user[1] if latest_user else None
-            },
-            'latest_login': {
-                'username': latest_login[0] if latest_login else None,
-                'last_login': latest_login[1] if latest_login else None
-            }
-        }
-
-    except Exception as e:
-        return {
-            'total_users': 0,
-            'admin_count': 0,
-            'regular_users': 0,
-            'latest_user': {'username': None, 'created_at': None},
-            'latest_login': {'username': None, 'last_login': None},
-            'error': str(e)
-        }
-
-
-# ==================================================
-# 포트폴리오 통계
-# ==================================================
 
 def get_portfolio_stats() -> Dict[str, any]:
     """
     포트폴리오 통계 정보 반환
 
     Returns:
-        dict: 총 포트폴리오 수, 사용자별 평균, 최근 수정일
+        dict: 총 포트폴리오 수, 사용자별 평균, 최근 수정일, 많이 담긴 종목
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-
-            # 총 포트폴리오 수
-            cursor.execute("SELECT COUNT(*) FROM portfolios")
-            total_portfolios = cursor.fetchone()[0]
-
-            # 사용자별 평균 포트폴리오 수
-            cursor.execute("""
-                SELECT COUNT(DISTINCT user_id) FROM portfolios
-            """)
-            users_with_portfolios = cursor.fetchone()[0]
-
-            avg_portfolios_per_user = 0
-            if users_with_portfolios > 0:
-                avg_portfolios_per_user = total_portfolios / users_with_portfolios
-
-            # 최근 수정된 포트폴리오
-            cursor.execute("""
-                SELECT p.portfolio_name, p.updated_at, u.username
-                FROM portfolios p
-                JOIN users u ON p.user_id = u.user_id
-                ORDER BY p.updated_at DESC
-                LIMIT 1
-            """)
-            latest_portfolio = cursor.fetchone()
+    return get_dashboard_stats()['portfolios']
 
-        return {
-            'total_portfolios': total_portfolios,
-            'users_with_portfolios': users_with_portfolios,
-            'avg_per_user': round(avg_portfolios_per_user, 1),
-            'latest_portfolio': {
-                'name': latest_portfolio[0] if latest_portfolio else None,
-                'updated_at': latest_portfolio[1] if latest_portfolio else None,
-                'username': latest_portfolio[2] if latest_portfolio else None
-            }
-        }
-
-    except Exception as e:
-        return {
-            'total_portfolios': 0,
-            'users_with_portfolios': 0,
-            'avg_per_user': 0,
-            'latest_portfolio': {'name': None, 'updated_at': None, 'username': None},
-            'error': str(e)
-        }
-
-
-# ==================================================
-# 관심종목 통계
-# ==================================================
 
 def get_watchlist_stats() -> Dict[str, any]:
     """
     관심종목 통계 정보 반환
 
     Returns:
-        dict: 총 관심종목 수, 사용자별 평균
+        dict: 총 관심종목 수, 사용자별 평균, 많이 추가된 종목
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-
-            # 총 관심종목 수
-            cursor.execute("SELECT COUNT(*) FROM watchlist")
-            total_watchlist = cursor.fetchone()[0]
-
-            # 사용자별 평균
-            cursor.execute("SELECT COUNT(DISTINCT user_id) FROM watchlist")
-            users_with_watchlist = cursor.fetchone()[0]
-
-            avg_per_user = 0
-            if users_with_watchlist > 0:
-                avg_per_user = total_watchlist / users_with_watchlist
-
-            # 가장 많이 추가된 종목 (상위 5개)
-            cursor.execute("""
-                SELECT ticker, name, COUNT(*) as count
-                FROM watchlist
-                GROUP BY ticker
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            popular_tickers = cursor.fetchall()
+    return get_dashboard_stats()['watchlist']
 
-        return {
-            'total_watchlist': total_watchlist,
-            'users_with_watchlist': users_with_watchlist,
-            'avg_per_user': round(avg_per_user, 1),
-            'popular_tickers': [
-                {'ticker': row[0], 'name': row[1], 'count': row[2]}
-                for row in popular_tickers
-            ]
-        }
-
-    except Exception as e:
-        return {
-            'total_watchlist': 0,
-            'users_with_watchlist': 0,
-            'avg_per_user': 0,
-            'popular_tickers': [],
-            'error': str(e)
-        }
-
-
-# ==================================================
-# 종목 메모 통계
-# ==================================================
 
 def get_stock_notes_stats() -> Dict[str, any]:
     """
     종목 메모 통계 정보 반환
 
     Returns:
-        dict: 총 메모 수, 사용자별 평균
+        dict: 총 메모 수, 사용자별 평균, 최근 작성 메모
     """
-    try:
-        with db_query() as conn:
-            cursor = conn.cursor()
-
-            # 총 메모 수
-            cursor.execute("SELECT COUNT(*) FROM stock_notes")
-            total_notes = cursor.fetchone()[0]
-
-            # 사용자별 평균
-            cursor.execute("SELECT COUNT(DISTINCT user_id) FROM stock_notes")
-            users_with_notes = cursor.fetchone()[0]
-
-            avg_per_user = 0
-            if users_with_notes > 0:
-                avg_per_user = total_notes / users_with_notes
-
-            # 최근 작성된 메모
-            cursor.execute("""
-                SELECT ticker, name, updated_at
-                FROM stock_notes
-                ORDER BY updated_at DESC
-                LIMIT 1
-            """)
-            latest_note = cursor.fetchone()
-
-        return {
-            'total_notes': total_notes,
-            'users_with_notes': users_with_notes,
-            'avg_per_user': round(avg_per_user, 1),
-            'latest_note': {
-                'ticker': latest_note[0] if latest_note else None,
-                'name': latest_note[1] if latest_note else None,
-                'updated_at': latest_note[2] if latest_note else None
-            }
-        }
-
-    except Exception as e:
-        return {
-            'total_notes': 0,
-            'users_with_notes': 0,
-            'avg_per_user': 0,
-            'latest_note': {'ticker': None, 'name': None, 'updated_at': None},
-            'error': str(e)
-        }
+    return get_dashboard_stats()['stock_notes']
 
 
 # ==================================================
@@ -327,22 +245,10 @@ def get_system_overview() -> Dict[str, any]:
     """
     try:
         # 각 통계 수집
-        db_stats = get_database_stats()
-        user_stats = get_user_stats()
-        portfolio_stats = get_portfolio_stats()
-        watchlist_stats = get_watchlist_stats()
-        notes_stats = get_stock_notes_stats()
-        backup_stats = get_backup_stats()
-
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'database': db_stats,
-            'users': user_stats,
-            'portfolios': portfolio_stats,
-            'watchlist': watchlist_stats,
-            'stock_notes': notes_stats,
-            'backups': backup_stats
-        }
+        overview = {'timestamp': datetime.now().isoformat()}
+        overview.update(get_dashboard_stats())
+        overview['backups'] = get_backup_stats()
+        return overview
 
     except Exception as e:
         return {